@@ -2,10 +2,14 @@ import sys
 import os
 import json
 import argparse
-from google import genai
 from pydantic import BaseModel, Field
 from typing import Literal
 
+import model_routing
+import results_store
+import screening_rules
+from common import AgentError, ModelRequest, agenerate, generate, load_prompt
+
 # The schema for the AI's response per question
 class ScreeningResult(BaseModel):
     category: str
@@ -14,75 +18,94 @@ class ScreeningResult(BaseModel):
     evidence: str = Field(description="Direct quote or specific observation from the posting.")
     risk_level: str
 
-def main():
-    parser = argparse.ArgumentParser(description="Screen a job posting for red flags.")
-    parser.add_argument("posting_directory")
-    args = parser.parse_args()
-
+def prepare(posting_directory, local_rules=True, stream=False):
     # Path Setup
-    posting_path = os.path.join(args.posting_directory, "posting.txt")
+    posting_path = os.path.join(posting_directory, "posting.txt")
     base_dir = os.path.dirname(posting_path)
     output_path = os.path.join(base_dir, "screening_report.json")
 
-    # --- SKIP LOGIC ---
-    if os.path.exists(output_path):
-        print(f"Agent 0_1: Skip - {output_path} already exists.")
-        return 
-    # ------------------
-
-    client = genai.Client()
-
-    # Assume prompts directory is in the current working directory
-    prompts_dir = os.path.join(os.getcwd(), "prompts")
-    master_questions_path = os.path.join(prompts_dir, "screening_questions_master.json")
-    prompt_template_path = os.path.join(prompts_dir, "job-screening-prompt.txt")
-
     # Load All Inputs
     try:
-        with open(master_questions_path, "r") as f:
-            master_questions = f.read()
-        with open(prompt_template_path, "r") as f:
-            prompt_template = f.read()
+        master_questions = json.loads(load_prompt("screening_questions_master.json"))
+        prompt_template = load_prompt("job-screening-prompt.txt")
         with open(posting_path, "r") as f:
             posting_content = f.read()
     except FileNotFoundError as e:
-        print(f"Error: Required file not found: {e}")
-        sys.exit(1)
+        raise AgentError(f"Error: Required file not found: {e}")
 
     print(f"Agent 0_1: Screening {posting_path} using master criteria...")
 
+    # Word counts, salary figures, deadlines etc. are answered locally;
+    # only the questions that need judgement go to the model
+    local_results, remaining = [], master_questions
+    if local_rules:
+        local_results, remaining = screening_rules.evaluate(master_questions, posting_content)
+        print(f"Agent 0_1: {len(local_results)} of {len(master_questions)} questions answered by local rules.")
+
     # Construct the request with the JSON questions injected
     full_request = (
         f"{prompt_template}\n\n"
-        f"### MASTER SCREENING QUESTIONS (JSON):\n{master_questions}\n\n"
+        f"### MASTER SCREENING QUESTIONS (JSON):\n{json.dumps(remaining, indent=2)}\n\n"
         f"### JOB POSTING TO ANALYZE:\n{posting_content}"
     )
 
+    return ModelRequest(
+        agent="agent0_1",
+        model=model_routing.model_for("agent0_1"),
+        contents=full_request,
+        schema=list[ScreeningResult],
+        output_path=output_path,
+        stream=stream,
+        state={"master": master_questions, "local": local_results, "remaining": remaining,
+               "posting": base_dir}
+    )
+
+def merge_results(master_questions, local_results, model_results):
+    """Combine local and model answers into one report in master-list order."""
+    by_question = {r['question']: r for r in local_results}
+    for r in model_results:
+        # A question already answered locally keeps the local answer; the first model answer wins otherwise
+        by_question.setdefault(r['question'], r)
+    merged = [by_question.pop(q['question']) for q in master_questions if q['question'] in by_question]
+    # Anything the model rephrased keeps its place at the end rather than being dropped
+    return merged + list(by_question.values())
+
+def save(request, model_results):
+    results = merge_results(request.state["master"], request.state["local"], model_results)
+    results = [ScreeningResult(**r).model_dump() for r in results]
+
+    # Save output in the SAME directory as the posting.txt
+    with open(request.output_path, "w") as f:
+        json.dump(results, f, indent=4)
+    results_store.record_screening(request.state["posting"], results)
+
+    # Quick summary for the console
+    red_flags = len([q for q in results if q['answer'] == 'Yes'])
+    print(f"Success! {red_flags} potential red flags identified.")
+    print(f"Report written to: {request.output_path}")
+
+def run(posting_directory, local_rules=True, stream=False):
+    request = prepare(posting_directory, local_rules, stream)
+    save(request, generate(request) if request.state["remaining"] else [])
+
+async def run_async(posting_directory, local_rules=True, stream=False):
+    request = prepare(posting_directory, local_rules, stream)
+    save(request, await agenerate(request) if request.state["remaining"] else [])
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen a job posting for red flags.")
+    parser.add_argument("posting_directory")
+    parser.add_argument("--no-local-rules", action="store_true",
+                        help="Send every master question to the model instead of answering some locally")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream the response and write each item to <output>.partial.jsonl as it arrives")
+    args = parser.parse_args()
+
     try:
-        response = client.models.generate_content(
-            #model="gemini-2.5-flash",
-            model="gemini-3-flash-preview",
-            contents=full_request,
-            config={
-                'response_mime_type': 'application/json',
-                'response_schema': list[ScreeningResult]
-            }
-        )
-        
-        results = json.loads(response.text)
-        
-        # Save output in the SAME directory as the posting.txt
-        with open(output_path, "w") as f:
-            json.dump(results, f, indent=4)
-
-        # Quick summary for the console
-        red_flags = len([q for q in results if q['answer'] == 'Yes'])
-        print(f"Success! {red_flags} potential red flags identified.")
-        print(f"Report written to: {output_path}")
-
-    except Exception as e:
-        print(f"Error during API call: {e}")
+        run(args.posting_directory, local_rules=not args.no_local_rules, stream=args.stream)
+    except AgentError as e:
+        print(e)
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,50 +1,34 @@
 import sys
 import os
-import json
 import argparse
-from google import genai
 from pydantic import BaseModel, Field
 from typing import Literal
 
+import model_routing
+from common import AgentError, ModelRequest, agenerate, generate, load_prompt
+
 class ScreeningSummary(BaseModel):
     futility_score: float
     verdict: Literal["GO", "CAUTION", "NO-GO"]
     markdown_content: str = Field(description="The full summary in Markdown format.")
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("posting_directory")
-    args = parser.parse_args()
-
+def prepare(posting_directory):
     # Path Setup
-    posting_path = os.path.join(args.posting_directory, "posting.txt")
+    posting_path = os.path.join(posting_directory, "posting.txt")
     base_dir = os.path.dirname(posting_path)
     output_path = os.path.join(base_dir, "screening_summary.md")
 
-    # --- SKIP LOGIC ---
-    if os.path.exists(output_path):
-        print(f"Agent 0_2: Skip - {output_path} already exists.")
-        return 
-    # ------------------
-
-    client = genai.Client()
-
     report_path = os.path.join(base_dir, "screening_report.json")
-    prompts_dir = os.path.join(os.getcwd(), "prompts")
-    prompt_template_path = os.path.join(prompts_dir, "screening-summary-prompt.txt")
 
     if not os.path.exists(report_path):
-        print(f"Error: {report_path} not found. Run Agent 0_1 first.")
-        sys.exit(1)
+        raise AgentError(f"Error: {report_path} not found. Run Agent 0_1 first.")
 
     try:
         with open(report_path, "r") as f:
             report_data = f.read()
-        with open(prompt_template_path, "r") as f:
-            prompt_template = f.read()
+        prompt_template = load_prompt("screening-summary-prompt.txt")
     except FileNotFoundError as e:
-        print(f"Error: Required file not found: {e}")
-        sys.exit(1)
+        raise AgentError(f"Error: Required file not found: {e}")
 
     print(f"Agent 0_2: Summarizing screening for {base_dir}...")
 
@@ -53,27 +37,39 @@ def main():
         f"### SCREENING DATA:\n{report_data}"
     )
 
+    return ModelRequest(
+        agent="agent0_2",
+        model=model_routing.model_for("agent0_2"),
+        contents=full_request,
+        schema=ScreeningSummary,
+        output_path=output_path,
+        state={"posting": base_dir}
+    )
+
+def save(request, result):
+    with open(request.output_path, "w") as f:
+        f.write(result['markdown_content'])
+
+    print(f"Success! Markdown verdict saved to: {request.output_path}")
+
+def run(posting_directory):
+    request = prepare(posting_directory)
+    save(request, generate(request))
+
+async def run_async(posting_directory):
+    request = prepare(posting_directory)
+    save(request, await agenerate(request))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("posting_directory")
+    args = parser.parse_args()
+
     try:
-        response = client.models.generate_content(
-            #model="gemini-2.5-flash",
-            model="gemini-3-flash-preview",
-            contents=full_request,
-            config={
-                'response_mime_type': 'application/json',
-                'response_schema': ScreeningSummary
-            }
-        )
-        
-        result = json.loads(response.text)
-        
-        with open(output_path, "w") as f:
-            f.write(result['markdown_content'])
-
-        print(f"Success! Markdown verdict saved to: {output_path}")
-
-    except Exception as e:
-        print(f"Error during API call: {e}")
+        run(args.posting_directory)
+    except AgentError as e:
+        print(e)
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -2,9 +2,11 @@ import sys
 import os
 import json
 import argparse
-from google import genai
 from pydantic import BaseModel, Field
 
+import model_routing
+from common import AgentError, ModelRequest, agenerate, generate, load_prompt
+
 # Schema for the product profile
 class ProductProfile(BaseModel):
     product_name: str
@@ -14,25 +16,13 @@ class ProductProfile(BaseModel):
     product_maturity: str = Field(description="e.g., MVP, Scaling, Legacy, R&D")
     markdown_summary: str = Field(description="A concise 2-paragraph description of the product.")
 
-def main():
-    parser = argparse.ArgumentParser(description="Agent 0_3: Product Profiler")
-    parser.add_argument("posting_directory")
-    args = parser.parse_args()
-
+def prepare(posting_directory):
     # Path Setup
-    base_dir = os.path.abspath(args.posting_directory)
+    base_dir = os.path.abspath(posting_directory)
     posting_path = os.path.join(base_dir, "posting.txt")
     context_path = os.path.join(base_dir, "product_info.txt") # Optional user-provided context
     output_path = os.path.join(base_dir, "product_profile.json")
 
-    # --- SKIP LOGIC ---
-    if os.path.exists(output_path):
-        print(f"Agent 0_3: Skip - {output_path} already exists.")
-        return 
-    # ------------------
-
-    client = genai.Client()
-
     # Load All Inputs
     try:
         with open(posting_path, "r") as f:
@@ -45,11 +35,9 @@ def main():
                 extra_context = f.read()
                 print(f"Agent 0_3: Found additional product context at {context_path}")
 
-        with open("prompts/product-profiler-prompt.txt", "r") as f:
-            prompt_template = f.read()
+        prompt_template = load_prompt("product-profiler-prompt.txt")
     except FileNotFoundError as e:
-        print(f"Error: Required file not found: {e}")
-        sys.exit(1)
+        raise AgentError(f"Error: Required file not found: {e}")
 
     print(f"Agent 0_3: Profiling product for {base_dir}...")
 
@@ -60,27 +48,39 @@ def main():
         "INSTRUCTION: Use ONLY the provided Job Posting and Product Context. If details are missing, state 'Not specified' rather than hallucinating."
     )
 
-    try:
-        response = client.models.generate_content(
-            #model="gemini-2.5-flash",
-            model="gemini-3-flash-preview",
-            contents=full_request,
-            config={
-                'response_mime_type': 'application/json',
-                'response_schema': ProductProfile
-            }
-        )
-        
-        result = json.loads(response.text)
-        
-        with open(output_path, "w") as f:
-            json.dump(result, f, indent=4)
+    return ModelRequest(
+        agent="agent0_3",
+        model=model_routing.model_for("agent0_3"),
+        contents=full_request,
+        schema=ProductProfile,
+        output_path=output_path,
+        state={"posting": base_dir}
+    )
+
+def save(request, result):
+    with open(request.output_path, "w") as f:
+        json.dump(result, f, indent=4)
 
-        print(f"Success! Product profile saved to: {output_path}")
+    print(f"Success! Product profile saved to: {request.output_path}")
 
-    except Exception as e:
-        print(f"Error during API call: {e}")
+def run(posting_directory):
+    request = prepare(posting_directory)
+    save(request, generate(request))
+
+async def run_async(posting_directory):
+    request = prepare(posting_directory)
+    save(request, await agenerate(request))
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent 0_3: Product Profiler")
+    parser.add_argument("posting_directory")
+    args = parser.parse_args()
+
+    try:
+        run(args.posting_directory)
+    except AgentError as e:
+        print(e)
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -2,53 +2,70 @@ import sys
 import os
 import json
 import argparse
-from google import genai
 from pydantic import BaseModel, Field
 from typing import Literal
 
+import model_routing
+from common import AgentError, ModelRequest, agenerate, generate, load_prompt
+
 class BinaryRequirement(BaseModel):
     question: str = Field(description="Yes/No question for the skill.")
     requirement: str = Field(description="Original snippet from the job posting.")
     priority: Literal["Core", "Preferred"]
     answer: str = "No"
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("posting_directory")
-    args = parser.parse_args()
-
-    client = genai.Client()
-    #questions_path = os.path.join(directory, "questions.json")
-    posting_path = os.path.join(args.posting_directory, "posting.txt")
+def prepare(posting_directory, stream=False):
+    posting_path = os.path.join(posting_directory, "posting.txt")
 
-    # Define output path for the skip check
+    # Define output path
     output_directory = os.path.dirname(os.path.abspath(posting_path))
     output_path = os.path.join(output_directory, "questions.json")
 
-    # --- SKIP LOGIC ---
-    if os.path.exists(output_path):
-        print(f"Agent 1_1: Skip - {output_path} already exists.")
-        return 
-    # ------------------
-
-    with open("prompts/job-requirement-analyzer-prompt.txt", "r") as f:
-        prompt = f.read()
-    with open(posting_path, "r") as f:
-        posting = f.read()
+    try:
+        prompt = load_prompt("job-requirement-analyzer-prompt.txt")
+        with open(posting_path, "r") as f:
+            posting = f.read()
+    except FileNotFoundError as e:
+        raise AgentError(f"Error: Required file not found: {e}")
 
     print(f"Agent 1: Extracting requirements from {posting_path}...")
-    
-    response = client.models.generate_content(
-        #model="gemini-2.5-flash",
-        model="gemini-3-flash-preview",
+
+    return ModelRequest(
+        agent="agent1_1",
+        model=model_routing.model_for("agent1_1"),
         contents=f"{prompt}\n\n[JOB POSTING]:\n{posting}",
-        config={'response_mime_type': 'application/json', 'response_schema': list[BinaryRequirement]}
+        schema=list[BinaryRequirement],
+        output_path=output_path,
+        stream=stream,
+        state={"posting": output_directory}
     )
 
-    with open(output_path, "w") as f:
-        json.dump(json.loads(response.text), f, indent=4)
+def save(request, result):
+    with open(request.output_path, "w") as f:
+        json.dump(result, f, indent=4)
+
+    print(f"Success! Created: {request.output_path}")
+
+def run(posting_directory, stream=False):
+    request = prepare(posting_directory, stream)
+    save(request, generate(request))
+
+async def run_async(posting_directory, stream=False):
+    request = prepare(posting_directory, stream)
+    save(request, await agenerate(request))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("posting_directory")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream the response and write each item to <output>.partial.jsonl as it arrives")
+    args = parser.parse_args()
 
-    print(f"Success! Created: {output_path}")
+    try:
+        run(args.posting_directory, stream=args.stream)
+    except AgentError as e:
+        print(e)
+        sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,11 +1,18 @@
 import sys
 import os
 import json
+import asyncio
 import argparse
-from google import genai
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
 from pydantic import BaseModel, Field
 from typing import Literal
 
+import model_routing
+import requirement_memo
+import results_store
+from common import PROMPTS_DIR, AgentError, ModelRequest, agenerate, generate, load_prompt, read_json, read_text
+
 class Evaluation(BaseModel):
     question: str
     requirement: str
@@ -14,83 +21,272 @@ class Evaluation(BaseModel):
     evidence_strength: Literal["Strong", "Moderate", "Weak", "None"]
     justification: str
 
-def main():
-    parser = argparse.ArgumentParser(description="Agent 2: Candidate Evaluator")
-    parser.add_argument("posting_directory", help="Directory containing posting.txt")
-    parser.add_argument("candidate_directory", help="Directory containing resume.md")
-    args = parser.parse_args()
+def build_contents(prompt_template, questions_json, resume_text, posting_text, shared_prefix, all_questions=None):
+    """Return (prefix, contents) for one evaluation call.
 
+    questions_json holds the requirements to evaluate. With shared_prefix, the prefix always
+    carries the posting's full list (all_questions) so every candidate shares one context
+    cache, and a smaller selection (memo misses, a shard) is named in the contents instead."""
+    if shared_prefix:
+        all_questions = questions_json if all_questions is None else all_questions
+        # Everything identical across candidates goes first so it can be cached once per posting
+        prefix = (
+            f"{prompt_template}\n\n"
+            f"### REQUIREMENTS:\n{all_questions}\n\n"
+            f"### POSTING CONTEXT:\n{posting_text}"
+        )
+        contents = f"### RESUME:\n{resume_text}"
+        if questions_json != all_questions:
+            contents += ("\n\n### EVALUATE ONLY THESE REQUIREMENTS:\n"
+                         "Return verdicts for the requirements below and no others.\n"
+                         f"{questions_json}")
+        return prefix, contents
+    return None, (
+        f"{prompt_template}\n\n"
+        f"### REQUIREMENTS:\n{questions_json}\n\n"
+        f"### RESUME:\n{resume_text}\n\n"
+        f"### POSTING CONTEXT:\n{posting_text}"
+    )
+
+def prepare(posting_directory, candidate_directory, shared_prefix=False, memoize=False, stream=False,
+            shard_size=None, cascade=False):
     # Absolute paths for reliability
-    base_posting_dir = os.path.abspath(args.posting_directory)
-    base_candidate_dir = os.path.abspath(args.candidate_directory)
+    base_posting_dir = os.path.abspath(posting_directory)
+    base_candidate_dir = os.path.abspath(candidate_directory)
 
-    # Define unique output path for skip check
+    # Define unique output path
     candidate_name = os.path.basename(base_candidate_dir)
     eval_output_dir = os.path.join(base_posting_dir, "evaluations")
     final_filename = f"{candidate_name}_evaluation.json"
     final_path = os.path.join(eval_output_dir, final_filename)
 
-    # --- SKIP LOGIC ---
-    if os.path.exists(final_path):
-        print(f"Agent 1_2: Skip - {final_path} already exists.")
-        return 
-    # ------------------
-
-    client = genai.Client()
-    
     # Define file paths
     questions_path = os.path.join(base_posting_dir, "questions.json")
     posting_path = os.path.join(base_posting_dir, "posting.txt")
     resume_path = os.path.join(base_candidate_dir, "resume.md")
-    prompt_path = "prompts/candidate-evaluator-prompt.txt"
+    prompt_path = os.path.join(PROMPTS_DIR, "candidate-evaluator-prompt.txt")
 
     # Validation: Ensure required files exist
     for p in [questions_path, posting_path, resume_path, prompt_path]:
         if not os.path.exists(p):
-            print(f"Error: Required file not found: {p}")
-            sys.exit(1)
+            raise AgentError(f"Error: Required file not found: {p}")
 
     # Load All Inputs
-    with open(questions_path, "r") as f: questions_json = f.read()
+    questions_json = all_questions = read_text(questions_path)
     with open(resume_path, "r") as f: resume_text = f.read()
-    with open(posting_path, "r") as f: posting_text = f.read()
-    with open(prompt_path, "r") as f: prompt_template = f.read()
+    posting_text = read_text(posting_path)
+    prompt_template = load_prompt("candidate-evaluator-prompt.txt")
 
     print(f"Agent 1_2: Auditing resume at {resume_path} against {base_posting_dir}...")
 
-    full_request = (
-        f"{prompt_template}\n\n"
-        f"### REQUIREMENTS:\n{questions_json}\n\n"
-        f"### RESUME:\n{resume_text}\n\n"
-        f"### POSTING CONTEXT:\n{posting_text}"
+    requirements = read_json(questions_path)
+    cached, missing = {}, requirements
+    if cascade:
+        # The cheap model answers first; escalate() re-asks the uncertain verdicts
+        model = model_routing.cascade()["cheap"]
+        model_key = f"cascade:{model}>{model_routing.cascade()['strong']}"
+    else:
+        model = model_key = model_routing.model_for("agent1_2")
+    memo_context = requirement_memo.text_hash(f"{model_key}\n{prompt_template}")
+    if memoize:
+        # Requirements this resume was already judged on (in any posting) are not asked again
+        cached, missing = requirement_memo.lookup(resume_text, requirements, memo_context)
+        questions_json = json.dumps(missing, indent=4)
+        print(f"Agent 1_2: {len(cached)} of {len(requirements)} requirements answered from memo; "
+              f"{len(missing)} sent to the model.")
+
+    prefix, full_request = build_contents(prompt_template, questions_json, resume_text, posting_text, shared_prefix,
+                                          all_questions)
+
+    return ModelRequest(
+        agent="agent1_2",
+        model=model,
+        contents=full_request,
+        schema=list[Evaluation],
+        output_path=final_path,
+        prefix=prefix,
+        stream=stream,
+        state={"requirements": requirements, "cached": cached, "missing": missing,
+               "memoize": memoize, "memo_context": memo_context, "resume_text": resume_text,
+               "posting": base_posting_dir, "candidate": base_candidate_dir,
+               "prompt_template": prompt_template, "posting_text": posting_text,
+               "shared_prefix": shared_prefix, "all_questions": all_questions, "shard_size": shard_size,
+               "cascade": cascade}
     )
 
-    try:
-        response = client.models.generate_content(
-            #model="gemini-2.5-flash",
-            model="gemini-3-flash-preview",
-            contents=full_request,
-            config={
-                'response_mime_type': 'application/json', 
-                'response_schema': list[Evaluation]
-            }
-        )
+# --- SHARDED EVALUATION ---
+# Output generation is serial per call, so a 40-requirement list[Evaluation] is
+# slow even when the prompt is not. With shard_size set, the requirements still
+# missing a verdict are split into shards that are evaluated concurrently against
+# the same resume; reconcile() then merges them back into posting order.
 
-        # Ensure the sub-directory exists before saving
-        os.makedirs(eval_output_dir, exist_ok=True)
-        
-        with open(final_path, "w") as f:
-            json.dump(json.loads(response.text), f, indent=4)
+def shard_requests(request, requirements=None, suffix="shard"):
+    """One ModelRequest per shard of requirements (default: the request's missing ones)."""
+    state = request.state
+    requirements = state["missing"] if requirements is None else requirements
+    size = state["shard_size"] or len(requirements) or 1
+    shards = []
+    for start in range(0, len(requirements), size):
+        chunk = requirements[start:start + size]
+        prefix, contents = build_contents(state["prompt_template"], json.dumps(chunk, indent=4),
+                                          state["resume_text"], state["posting_text"], state["shared_prefix"],
+                                          state["all_questions"])
+        shards.append(dataclasses.replace(request, prefix=prefix, contents=contents,
+                                          output_path=f"{request.output_path}.{suffix}{len(shards)}"))
+    return shards
 
-        print(f"Success! Evaluation complete: {final_path}")
+def unanswered(request, fresh):
+    """Requirements in state["missing"] that no entry of fresh answers."""
+    aligned = requirement_memo.align(request.state["missing"], fresh)
+    return [req for req, e in zip(request.state["missing"], aligned) if e is None]
 
-        # List siblings alphabetically
-        all_evals = sorted([f for f in os.listdir(eval_output_dir) if f.endswith("_evaluation.json")])
-        print(f"All evaluations in {eval_output_dir}: {all_evals}")
+def first_pass(request):
+    """The model's evaluations for state["missing"], sharded when shard_size asks for it."""
+    if not request.state["missing"]:
+        return []
+    if not request.state["shard_size"] or len(request.state["missing"]) <= request.state["shard_size"]:
+        return generate(request)
+    shards = shard_requests(request)
+    print(f"Agent 1_2: Evaluating {len(request.state['missing'])} requirements in {len(shards)} parallel shards...")
+    with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+        fresh = [e for result in pool.map(generate, shards) for e in result]
+    dropped = unanswered(request, fresh)
+    if dropped:
+        # One more round for whatever a shard skipped; anything still missing is reported by reconcile()
+        print(f"Agent 1_2: Re-asking {len(dropped)} requirements the shards left unanswered...")
+        fresh += generate(shard_requests(request, dropped)[0])
+    return fresh
 
-    except Exception as e:
-        print(f"Error during API generation: {e}")
+async def afirst_pass(request):
+    """Async twin of first_pass(); shards run concurrently on the event loop."""
+    if not request.state["missing"]:
+        return []
+    if not request.state["shard_size"] or len(request.state["missing"]) <= request.state["shard_size"]:
+        return await agenerate(request)
+    shards = shard_requests(request)
+    print(f"Agent 1_2: Evaluating {len(request.state['missing'])} requirements in {len(shards)} parallel shards...")
+    results = await asyncio.gather(*(agenerate(shard) for shard in shards))
+    fresh = [e for result in results for e in result]
+    dropped = unanswered(request, fresh)
+    if dropped:
+        print(f"Agent 1_2: Re-asking {len(dropped)} requirements the shards left unanswered...")
+        fresh += await agenerate(shard_requests(request, dropped)[0])
+    return fresh
+
+# --- MODEL CASCADE ---
+# With cascade set, the first pass runs on the cheap model from models.json and
+# only the verdicts model_routing flags as uncertain are asked again of the
+# strong model, in shards like the first pass.
+
+def escalation_requests(request, fresh):
+    """(strong-model requests, escalated indexes into state["missing"]) for the cheap pass fresh."""
+    missing = request.state["missing"]
+    escalated = model_routing.escalations(missing, fresh)
+    if not escalated:
+        return [], []
+    strong = model_routing.cascade()["strong"]
+    print(f"Agent 1_2: Escalating {len(escalated)} of {len(missing)} verdicts to {strong}...")
+    return shard_requests(dataclasses.replace(request, model=strong),
+                          [missing[i] for i in escalated], suffix="escalation"), escalated
+
+def evaluate(request):
+    """first_pass(), then the strong model for uncertain verdicts when cascading."""
+    fresh = first_pass(request)
+    if not request.state["cascade"]:
+        return fresh
+    requests, escalated = escalation_requests(request, fresh)
+    if not requests:
+        return fresh
+    with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        strong = [e for result in pool.map(generate, requests) for e in result]
+    return model_routing.merge(request.state["missing"], fresh, escalated, strong)
+
+async def aevaluate(request):
+    """Async twin of evaluate()."""
+    fresh = await afirst_pass(request)
+    if not request.state["cascade"]:
+        return fresh
+    requests, escalated = escalation_requests(request, fresh)
+    if not requests:
+        return fresh
+    results = await asyncio.gather(*(agenerate(r) for r in requests))
+    strong = [e for result in results for e in result]
+    return model_routing.merge(request.state["missing"], fresh, escalated, strong)
+
+def reconcile(request, fresh):
+    """Combine memoized verdicts with the model's answers for the missing requirements, in posting order.
+
+    Duplicate answers are dropped and requirements nobody answered are reported.
+
+    Returns (merged, new): the full evaluation list and the entries that came from the model.
+    """
+    state = request.state
+    aligned = iter(requirement_memo.align(state["missing"], fresh))
+    merged, new = [], []
+    for i, req in enumerate(state["requirements"]):
+        if i in state["cached"]:
+            merged.append(state["cached"][i])
+            continue
+        evaluation = next(aligned)
+        if evaluation is None:
+            print(f"Warning: the model returned no verdict for: {req['question']}")
+            continue
+        evaluation = {**evaluation, "question": req["question"], "requirement": req["requirement"],
+                      "priority": req["priority"]}
+        merged.append(evaluation)
+        new.append(evaluation)
+    return merged, new
+
+def save(request, result):
+    if request.state["memoize"] or request.state["shard_size"] or request.state["cascade"]:
+        result, new = reconcile(request, result)
+    if request.state["memoize"]:
+        requirement_memo.store(request.state["resume_text"], new, request.state["memo_context"])
+
+    # Ensure the sub-directory exists before saving
+    eval_output_dir = os.path.dirname(request.output_path)
+    os.makedirs(eval_output_dir, exist_ok=True)
+    
+    with open(request.output_path, "w") as f:
+        json.dump(result, f, indent=4)
+    results_store.record_evaluations(request.state["posting"], request.state["candidate"], result)
+
+    print(f"Success! Evaluation complete: {request.output_path}")
+
+    # List siblings alphabetically
+    all_evals = sorted([f for f in os.listdir(eval_output_dir) if f.endswith("_evaluation.json")])
+    print(f"All evaluations in {eval_output_dir}: {all_evals}")
+
+def run(posting_directory, candidate_directory, shared_prefix=False, memoize=False, stream=False, shard_size=None,
+        cascade=False):
+    request = prepare(posting_directory, candidate_directory, shared_prefix, memoize, stream, shard_size, cascade)
+    save(request, evaluate(request))
+
+async def run_async(posting_directory, candidate_directory, shared_prefix=False, memoize=False, stream=False,
+                    shard_size=None, cascade=False):
+    request = prepare(posting_directory, candidate_directory, shared_prefix, memoize, stream, shard_size, cascade)
+    save(request, await aevaluate(request))
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent 2: Candidate Evaluator")
+    parser.add_argument("posting_directory", help="Directory containing posting.txt")
+    parser.add_argument("candidate_directory", help="Directory containing resume.md")
+    parser.add_argument("--memoize", action="store_true",
+                        help="Reuse verdicts for requirements this resume was already judged on in other postings")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream the response and write each item to <output>.partial.jsonl as it arrives")
+    parser.add_argument("--shard-size", type=int, default=None,
+                        help="Evaluate requirements in parallel shards of this many items")
+    parser.add_argument("--cascade", action="store_true",
+                        help="Evaluate with the cheap model and re-ask only uncertain verdicts of the strong one")
+    args = parser.parse_args()
+
+    try:
+        run(args.posting_directory, args.candidate_directory, memoize=args.memoize, stream=args.stream,
+            shard_size=args.shard_size, cascade=args.cascade)
+    except AgentError as e:
+        print(e)
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
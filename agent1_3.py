@@ -2,102 +2,140 @@ import sys
 import os
 import json
 import argparse
-from google import genai
 from pydantic import BaseModel, Field
 from typing import Literal
 
+import model_routing
+import results_store
+import scoring
+from common import PROMPTS_DIR, AgentError, ModelRequest, agenerate, generate, generate_stream, load_prompt
+
 # Schema for the Agent 3 result
 class FitnessSummary(BaseModel):
     fit_percentage: float
     recommendation: Literal["Strong Fit", "Potential Fit", "Not a Match"]
     markdown_content: str = Field(description="The full executive summary in Markdown format.")
 
-def main():
-    parser = argparse.ArgumentParser(description="Agent 1_3: Synthesize Executive Summary")
-    parser.add_argument("posting_directory", help="Directory containing the job posting details")
-    parser.add_argument(
-        "candidate_directory", 
-        help="Directory containing the candidate's original resume/context"
-    )
-    args = parser.parse_args()
-
+def prepare(posting_directory, candidate_directory, narrative=True, weights_path=None):
     # Using abspath for reliability
-    base_posting_dir = os.path.abspath(args.posting_directory)
-    base_candidate_dir = os.path.abspath(args.candidate_directory)
+    base_posting_dir = os.path.abspath(posting_directory)
+    base_candidate_dir = os.path.abspath(candidate_directory)
     
     # Get candidate name from the folder name
     candidate_name = os.path.basename(base_candidate_dir)
 
-    # Output path setup for skip check
+    # Output path setup
     summary_output_dir = os.path.join(base_posting_dir, "summaries")
     final_filename = f"{candidate_name}_summary.md"
     output_path = os.path.join(summary_output_dir, final_filename)
+    score_path = os.path.join(summary_output_dir, f"{candidate_name}_score.json")
 
-    # --- SKIP LOGIC ---
-    if os.path.exists(output_path):
-        print(f"Agent 1_3: Skip - {output_path} already exists.")
-        return 
-    # ------------------
-
-    client = genai.Client()
-    
     # Input logic: Look in posting_dir/evaluations/candidate_name_evaluation.json
     evaluation_path = os.path.join(base_posting_dir, "evaluations", f"{candidate_name}_evaluation.json")
-    prompt_path = "prompts/executive-summary-prompt.txt"
+    prompt_path = os.path.join(PROMPTS_DIR, "executive-summary-prompt.txt")
 
     # Load Inputs
     if not os.path.exists(evaluation_path):
-        print(f"Error: {evaluation_path} not found. Ensure Agent 1_2 has run.")
-        sys.exit(1)
+        raise AgentError(f"Error: {evaluation_path} not found. Ensure Agent 1_2 has run.")
 
     with open(evaluation_path, "r") as f: 
         eval_data = f.read()
     
     if not os.path.exists(prompt_path):
-        print(f"Error: Prompt template not found at {prompt_path}")
-        sys.exit(1)
+        raise AgentError(f"Error: Prompt template not found at {prompt_path}")
         
-    with open(prompt_path, "r") as f: 
-        prompt_template = f.read()
+    prompt_template = load_prompt("executive-summary-prompt.txt")
+
+    # Fit percentage and recommendation are computed locally; the model only writes prose
+    try:
+        scores = scoring.score(json.loads(eval_data), scoring.load_weights(weights_path))
+    except (KeyError, ValueError) as e:
+        raise AgentError(f"Error: Could not score {evaluation_path}: {e}")
 
-    print(f"Agent 1_3: Synthesizing Markdown summary for {candidate_name}...")
+    if narrative:
+        print(f"Agent 1_3: Synthesizing Markdown summary for {candidate_name}...")
+    else:
+        print(f"Agent 1_3: Scoring {candidate_name} locally (no narrative requested)...")
 
     full_request = (
         f"{prompt_template}\n\n"
+        f"### PRE-COMPUTED SCORES (authoritative, do not recalculate):\n{json.dumps(scores, indent=4)}\n\n"
         f"### CANDIDATE EVALUATION DATA:\n{eval_data}"
     )
 
-    try:
-        response = client.models.generate_content(
-            #model="gemini-2.5-flash",
-            model="gemini-3-flash-preview",
-            contents=full_request,
-            config={
-                'response_mime_type': 'application/json', 
-                'response_schema': FitnessSummary
-            }
-        )
-        
-        # Parse result
-        result = json.loads(response.text)
-        
-        # Ensure the output sub-directory exists
-        os.makedirs(summary_output_dir, exist_ok=True)
+    return ModelRequest(
+        agent="agent1_3",
+        model=model_routing.model_for("agent1_3"),
+        contents=full_request,
+        schema=None,
+        output_path=output_path,
+        state={"scores": scores, "score_path": score_path,
+               "posting": base_posting_dir, "candidate": base_candidate_dir}
+    )
 
-        # Save as Markdown file in the summaries directory with unique name
-        with open(output_path, "w") as f:
-            f.write(result['markdown_content'])
+def save(request, markdown_content=None):
+    """Write the score file, plus the Markdown summary when a narrative was generated."""
+    scores = request.state["scores"]
+
+    # Ensure the output sub-directory exists
+    summary_output_dir = os.path.dirname(request.output_path)
+    os.makedirs(summary_output_dir, exist_ok=True)
 
-        print(f"Success! Executive summary written to: {output_path}")
-        print(f"Result: {result['recommendation']} ({result['fit_percentage']}%)")
+    with open(request.state["score_path"], "w") as f:
+        json.dump(scores, f, indent=4)
 
-        # List all summaries alphabetically
-        all_summaries = sorted([f for f in os.listdir(summary_output_dir) if f.endswith("_summary.md")])
-        print(f"All summaries in {summary_output_dir}: {all_summaries}")
+    if markdown_content is not None:
+        result = FitnessSummary(fit_percentage=scores["fit_percentage"], recommendation=scores["recommendation"],
+                                markdown_content=markdown_content)
 
-    except Exception as e:
-        print(f"Error calling Gemini API: {e}")
+        # Save as Markdown file in the summaries directory with unique name
+        with open(request.output_path, "w") as f:
+            f.write(result.markdown_content)
+
+        print(f"Success! Executive summary written to: {request.output_path}")
+    else:
+        print(f"Success! Scores written to: {request.state['score_path']}")
+    results_store.record_score(request.state["posting"], request.state["candidate"], scores, markdown_content)
+    print(f"Result: {scores['recommendation']} ({scores['fit_percentage']}%)")
+
+    # List all summaries alphabetically
+    all_summaries = sorted([f for f in os.listdir(summary_output_dir) if f.endswith("_summary.md")])
+    print(f"All summaries in {summary_output_dir}: {all_summaries}")
+
+def run(posting_directory, candidate_directory, narrative=True, stream=False, weights_path=None):
+    request = prepare(posting_directory, candidate_directory, narrative, weights_path)
+    if not narrative:
+        save(request)
+    elif stream:
+        markdown_content = generate_stream(request, lambda text: print(text, end="", flush=True))
+        print()
+        save(request, markdown_content)
+    else:
+        save(request, generate(request))
+
+async def run_async(posting_directory, candidate_directory, narrative=True, weights_path=None):
+    request = prepare(posting_directory, candidate_directory, narrative, weights_path)
+    save(request, await agenerate(request) if narrative else None)
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent 1_3: Synthesize Executive Summary")
+    parser.add_argument("posting_directory", help="Directory containing the job posting details")
+    parser.add_argument(
+        "candidate_directory", 
+        help="Directory containing the candidate's original resume/context"
+    )
+    parser.add_argument("--scores-only", action="store_true",
+                        help="Compute fit_percentage and recommendation locally and skip the Markdown narrative")
+    parser.add_argument("--stream", action="store_true", help="Print the narrative as it is generated")
+    parser.add_argument("--weights", default=None, help="JSON file overriding scoring.DEFAULT_WEIGHTS")
+    args = parser.parse_args()
+
+    try:
+        run(args.posting_directory, args.candidate_directory, narrative=not args.scores_only,
+            stream=args.stream, weights_path=args.weights)
+    except AgentError as e:
+        print(e)
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
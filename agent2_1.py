@@ -2,11 +2,16 @@ import sys
 import os
 import json
 import argparse
+import dataclasses
 import re
-from google import genai
 from pydantic import BaseModel, Field
 from typing import Literal
 
+import evidence
+import model_routing
+import results_store
+from common import PROMPTS_DIR, AgentError, ModelRequest, agenerate, generate, load_prompt, read_json, read_text
+
 class Evaluation(BaseModel):
     question: str
     requirement: str
@@ -15,15 +20,11 @@ class Evaluation(BaseModel):
     evidence_strength: Literal["Strong", "Moderate", "Weak", "None"]
     justification: str
 
-def main():
-    parser = argparse.ArgumentParser(description="Agent 2_1: Experience-Enhanced Evaluator")
-    parser.add_argument("posting_directory", help="Directory containing posting.txt")
-    parser.add_argument("candidate_directory", help="Directory containing resume.md and experiences.md")
-    args = parser.parse_args()
-
+def alignment_path(posting_directory, candidate_directory):
+    """Return (job_slug, path) of the role alignment file for a (posting, candidate) pair."""
     # Absolute paths
-    base_posting_dir = os.path.normpath(os.path.abspath(args.posting_directory))
-    base_candidate_dir = os.path.normpath(os.path.abspath(args.candidate_directory))
+    base_posting_dir = os.path.normpath(os.path.abspath(posting_directory))
+    base_candidate_dir = os.path.normpath(os.path.abspath(candidate_directory))
     postings_root = os.path.abspath("postings")
 
     # --- SANITIZED UNIQUE FILENAME LOGIC ---
@@ -36,72 +37,162 @@ def main():
     # Example: 'VLS/Dept-Name/Senior Eng!' -> 'vls_dept_name_senior_eng_'
     job_slug = re.sub(r'[^a-zA-Z0-9]', '_', rel_job_path).lower()
     
-    # Setup the output directory: candidate_dir/role_alignments/
+    # Output lives in candidate_dir/role_alignments/
     alignment_dir = os.path.join(base_candidate_dir, "role_alignments")
-    os.makedirs(alignment_dir, exist_ok=True)
-
     candidate_name = os.path.basename(base_candidate_dir).lower()
     final_filename = f"{candidate_name}_{job_slug}_role_alignment.json"
-    final_path = os.path.join(alignment_dir, final_filename)
     # ---------------------------------------
+    return job_slug, os.path.join(alignment_dir, final_filename)
 
-    # --- SKIP LOGIC ---
-    if os.path.exists(final_path):
-        print(f"Agent 2_1: Skip - {final_path} already exists.")
-        return 
-    # ------------------
+def build_contents(prompt_template, requirements, resume_text, experiences_text, posting_text,
+                   shared_prefix=False, evidence_top_n=None):
+    """Return (prefix, contents) for an alignment call over requirements."""
+    questions_json = json.dumps(requirements, indent=4)
+    experiences_heading = "### DETAILED STAR EXPERIENCES:"
+    if evidence_top_n:
+        # Only the STAR entries that rank in the top N for some requirement
+        experiences_text, kept, total = evidence.evidence_pack(experiences_text, requirements, evidence_top_n)
+        experiences_heading = "### DETAILED STAR EXPERIENCES (most relevant entries; R<n> is the n-th requirement):"
+        print(f"Agent 2_1: Evidence pack keeps {kept} of {total} STAR entries.")
+
+    if shared_prefix:
+        # Everything identical across candidates goes first so it can be cached once per posting
+        prefix = (
+            f"{prompt_template}\n\n"
+            f"### REQUIREMENTS:\n{questions_json}\n\n"
+            f"### POSTING CONTEXT:\n{posting_text}"
+        )
+        return prefix, (
+            f"### RESUME:\n{resume_text}\n\n"
+            f"{experiences_heading}\n{experiences_text}"
+        )
+    return None, (
+        f"{prompt_template}\n\n"
+        f"### REQUIREMENTS:\n{questions_json}\n\n"
+        f"### RESUME:\n{resume_text}\n\n"
+        f"{experiences_heading}\n{experiences_text}\n\n"
+        f"### POSTING CONTEXT:\n{posting_text}"
+    )
+
+def prepare(posting_directory, candidate_directory, shared_prefix=False, evidence_top_n=None, stream=False,
+            cascade=False):
+    # Absolute paths
+    base_posting_dir = os.path.normpath(os.path.abspath(posting_directory))
+    base_candidate_dir = os.path.normpath(os.path.abspath(candidate_directory))
+
+    # Setup the output directory: candidate_dir/role_alignments/
+    job_slug, final_path = alignment_path(base_posting_dir, base_candidate_dir)
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
 
-    client = genai.Client()
-    
     # File paths
     questions_path = os.path.join(base_posting_dir, "questions.json")
     posting_path = os.path.join(base_posting_dir, "posting.txt")
     resume_path = os.path.join(base_candidate_dir, "resume.md")
     experiences_path = os.path.join(base_candidate_dir, "experiences.md")
-    prompt_path = "prompts/candidate-evaluator-prompt.txt"
+    prompt_path = os.path.join(PROMPTS_DIR, "candidate-evaluator-prompt.txt")
 
     # Validation
     for p in [questions_path, posting_path, resume_path, experiences_path, prompt_path]:
         if not os.path.exists(p):
-            print(f"Error: Required file not found: {p}")
-            sys.exit(1)
+            raise AgentError(f"Error: Required file not found: {p}")
 
     # Load All Inputs
-    with open(questions_path, "r") as f: questions_json = f.read()
+    requirements = read_json(questions_path)
     with open(resume_path, "r") as f: resume_text = f.read()
     with open(experiences_path, "r") as f: experiences_text = f.read()
-    with open(posting_path, "r") as f: posting_text = f.read()
-    with open(prompt_path, "r") as f: prompt_template = f.read()
+    posting_text = read_text(posting_path)
+    prompt_template = load_prompt("candidate-evaluator-prompt.txt")
 
     print(f"Agent 2_1: Auditing alignment for {job_slug}...")
 
-    full_request = (
-        f"{prompt_template}\n\n"
-        f"### REQUIREMENTS:\n{questions_json}\n\n"
-        f"### RESUME:\n{resume_text}\n\n"
-        f"### DETAILED STAR EXPERIENCES:\n{experiences_text}\n\n"
-        f"### POSTING CONTEXT:\n{posting_text}"
+    prefix, full_request = build_contents(prompt_template, requirements, resume_text, experiences_text,
+                                          posting_text, shared_prefix, evidence_top_n)
+
+    return ModelRequest(
+        agent="agent2_1",
+        model=model_routing.cascade()["cheap"] if cascade else model_routing.model_for("agent2_1"),
+        contents=full_request,
+        schema=list[Evaluation],
+        output_path=final_path,
+        prefix=prefix,
+        stream=stream,
+        state={"posting": base_posting_dir, "candidate": base_candidate_dir, "requirements": requirements,
+               "prompt_template": prompt_template, "resume_text": resume_text,
+               "experiences_text": experiences_text, "posting_text": posting_text,
+               "shared_prefix": shared_prefix, "evidence_top_n": evidence_top_n, "cascade": cascade}
     )
 
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            #model="gemini-3-flash-preview",
-            contents=full_request,
-            config={
-                'response_mime_type': 'application/json', 
-                'response_schema': list[Evaluation]
-            }
-        )
-        
-        with open(final_path, "w") as f:
-            json.dump(json.loads(response.text), f, indent=4)
+# --- MODEL CASCADE ---
+# Same policy as Agent 1_2: the cheap model aligns every requirement, then one
+# strong-model call re-asks only the verdicts model_routing flags as uncertain.
+
+def escalation_request(request, fresh):
+    """(strong-model request or None, escalated indexes into state["requirements"])."""
+    state = request.state
+    escalated = model_routing.escalations(state["requirements"], fresh)
+    if not escalated:
+        return None, []
+    strong = model_routing.cascade()["strong"]
+    print(f"Agent 2_1: Escalating {len(escalated)} of {len(state['requirements'])} verdicts to {strong}...")
+    prefix, contents = build_contents(state["prompt_template"], [state["requirements"][i] for i in escalated],
+                                      state["resume_text"], state["experiences_text"], state["posting_text"],
+                                      state["shared_prefix"], state["evidence_top_n"])
+    return dataclasses.replace(request, model=strong, prefix=prefix, contents=contents,
+                               output_path=f"{request.output_path}.escalation"), escalated
+
+def evaluate(request):
+    fresh = generate(request)
+    if not request.state["cascade"]:
+        return fresh
+    strong, escalated = escalation_request(request, fresh)
+    if strong is None:
+        return fresh
+    return model_routing.merge(request.state["requirements"], fresh, escalated, generate(strong))
+
+async def aevaluate(request):
+    fresh = await agenerate(request)
+    if not request.state["cascade"]:
+        return fresh
+    strong, escalated = escalation_request(request, fresh)
+    if strong is None:
+        return fresh
+    return model_routing.merge(request.state["requirements"], fresh, escalated, await agenerate(strong))
 
-        print(f"Success! Alignment saved: {final_path}")
+def save(request, result):
+    with open(request.output_path, "w") as f:
+        json.dump(result, f, indent=4)
+    results_store.record_evaluations(request.state["posting"], request.state["candidate"], result, source="alignment")
 
-    except Exception as e:
-        print(f"Error: {e}")
+    print(f"Success! Alignment saved: {request.output_path}")
+
+def run(posting_directory, candidate_directory, shared_prefix=False, evidence_top_n=None, stream=False,
+        cascade=False):
+    request = prepare(posting_directory, candidate_directory, shared_prefix, evidence_top_n, stream, cascade)
+    save(request, evaluate(request))
+
+async def run_async(posting_directory, candidate_directory, shared_prefix=False, evidence_top_n=None, stream=False,
+                    cascade=False):
+    request = prepare(posting_directory, candidate_directory, shared_prefix, evidence_top_n, stream, cascade)
+    save(request, await aevaluate(request))
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent 2_1: Experience-Enhanced Evaluator")
+    parser.add_argument("posting_directory", help="Directory containing posting.txt")
+    parser.add_argument("candidate_directory", help="Directory containing resume.md and experiences.md")
+    parser.add_argument("--evidence-top-n", type=int, default=None,
+                        help="Send only the N most relevant STAR entries per requirement instead of all of experiences.md")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream the response and write each item to <output>.partial.jsonl as it arrives")
+    parser.add_argument("--cascade", action="store_true",
+                        help="Align with the cheap model and re-ask only uncertain verdicts of the strong one")
+    args = parser.parse_args()
+
+    try:
+        run(args.posting_directory, args.candidate_directory, evidence_top_n=args.evidence_top_n, stream=args.stream,
+            cascade=args.cascade)
+    except AgentError as e:
+        print(e)
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,114 @@
+import sys
+import os
+import time
+import socket
+import resource
+import argparse
+import tempfile
+import subprocess
+
+import synthetic_corpus
+import telemetry
+
+# End-to-end orchestrator benchmark against mock_gemini.py: no quota is spent.
+# Generates (or reuses) a synthetic corpus in a scratch directory, starts the mock
+# server, runs orchestrate.py there with the response cache off and reports
+# throughput, per-stage latency from the telemetry trace and the orchestrator's
+# peak memory.
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_for_port(port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise SystemExit(f"Error: mock server did not start on port {port}")
+
+def scored_pairs(workdir, since):
+    """Pairs whose score file Agent 1_3 wrote after since; written with or without a narrative."""
+    count = 0
+    for dirpath, _, filenames in os.walk(os.path.join(workdir, "postings")):
+        if os.path.basename(dirpath) != "summaries":
+            continue
+        count += sum(1 for name in filenames if name.endswith("_score.json")
+                     and os.path.getmtime(os.path.join(dirpath, name)) >= since)
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark orchestrate.py against the local mock Gemini server.",
+        epilog="Arguments after -- are passed to orchestrate.py, e.g. -- --async --concurrency 32")
+    parser.add_argument("--workdir", default=None, help="Scratch directory (default: a new temp dir)")
+    parser.add_argument("--postings", type=int, default=5, help="Synthetic postings to generate")
+    parser.add_argument("--candidates", type=int, default=50, help="Synthetic candidates to generate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", default="lognormal:0.5,0.4", help="Mock latency distribution (see mock_gemini.py)")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-500", type=float, default=0.0)
+    parser.add_argument("orchestrate_args", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="screening-bench-"))
+    if not os.path.isdir(os.path.join(workdir, "postings")):
+        print(f"Generating {args.postings} postings x {args.candidates} candidates in {workdir}...")
+        synthetic_corpus.generate(workdir, args.postings, args.candidates, seed=args.seed)
+    if not os.path.exists(os.path.join(workdir, "prompts")):
+        os.symlink(os.path.join(REPO_DIR, "prompts"), os.path.join(workdir, "prompts"))
+
+    trace_path = os.path.join(workdir, ".index", "llm_trace.jsonl")
+    if os.path.exists(trace_path):
+        os.remove(trace_path)
+
+    port = free_port()
+    server = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, "mock_gemini.py"), "--port", str(port),
+                               "--latency", args.latency, "--rate-429", str(args.rate_429),
+                               "--rate-500", str(args.rate_500)],
+                              stdout=subprocess.DEVNULL)
+    env = {**os.environ, "GOOGLE_GEMINI_BASE_URL": f"http://127.0.0.1:{port}", "GEMINI_API_KEY": "mock",
+           "LLM_CACHE": "off", "LLM_TRACE": "on", "LLM_TRACE_PATH": trace_path}
+    orchestrate_args = [a for a in args.orchestrate_args if a != "--"]
+    log_path = os.path.join(workdir, "orchestrate.log")
+    try:
+        wait_for_port(port)
+        print(f"Running orchestrate.py {' '.join(orchestrate_args)} (log: {log_path})...")
+        started_at = time.time()
+        start = time.perf_counter()
+        with open(log_path, "w") as log:
+            result = subprocess.run([sys.executable, os.path.join(REPO_DIR, "orchestrate.py"),
+                                     "--skip-startup-probe", *orchestrate_args],
+                                    cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+        elapsed = time.perf_counter() - start
+        # Only the orchestrator has been waited for so far, so this is its high-water mark
+        peak_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    finally:
+        server.terminate()
+        server.wait()
+
+    if result.returncode:
+        print(f"Warning: orchestrate.py exited with {result.returncode}; see {log_path}")
+    try:
+        records = telemetry.load(trace_path)
+    except FileNotFoundError:
+        raise SystemExit("Error: no model calls were traced.")
+
+    # Counted from the files written, not traced agent1_3 calls, which --scores-only never makes
+    pairs = scored_pairs(workdir, started_at)
+    retries = sum(r["retries"] for r in records)
+    errors = sum(1 for r in records if r["error"])
+    print()
+    telemetry.print_table(telemetry.aggregate(records, "agent"), "agent")
+    print()
+    print(f"⏱️  {elapsed:.1f}s wall, {len(records)} model calls ({len(records) / elapsed:.1f}/s), "
+          f"{pairs} pairs scored ({pairs / elapsed:.2f}/s)")
+    print(f"   {retries} retries, {errors} failed calls, peak orchestrator RSS {peak_mb:.0f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import sys
+import os
+import json
+import hashlib
+import argparse
+
+import agent0_1
+import agent0_2
+import agent0_3
+import agent1_1
+import agent1_2
+import agent1_3
+import agent2_1
+from common import PROMPTS_DIR, AgentError
+from orchestrate import find_dirs
+
+# Make-style incremental build over the agent stages.
+# Every node declares the files it reads and writes. The manifest remembers the
+# content hash of each input at the time the node last succeeded, so a node only
+# re-runs when one of its inputs changed, an output is missing, or a node it
+# depends on re-ran.
+MANIFEST_PATH = ".build_manifest.json"
+
+def file_hash(path):
+    """sha256 of a file's bytes, or None when it does not exist (optional inputs)."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+def prompt(name):
+    return os.path.join(PROMPTS_DIR, name)
+
+class Node:
+    def __init__(self, agent, args, inputs, outputs):
+        self.agent = agent
+        self.args = args
+        self.inputs = [os.path.normpath(p) for p in inputs]
+        self.outputs = [os.path.normpath(p) for p in outputs]
+        self.id = " ".join([agent.__name__, *args])
+        self.deps = []
+
+    def input_hashes(self):
+        return {p: file_hash(p) for p in self.inputs}
+
+def posting_nodes(job_dir, product_profile):
+    def p(name):
+        return os.path.join(job_dir, name)
+
+    nodes = [
+        Node(agent0_1, (job_dir,),
+             [p("posting.txt"), prompt("job-screening-prompt.txt"), prompt("screening_questions_master.json")],
+             [p("screening_report.json")]),
+        Node(agent0_2, (job_dir,),
+             [p("screening_report.json"), prompt("screening-summary-prompt.txt")],
+             [p("screening_summary.md")]),
+    ]
+    if product_profile:
+        nodes.append(Node(agent0_3, (job_dir,),
+                          [p("posting.txt"), p("product_info.txt"), prompt("product-profiler-prompt.txt")],
+                          [p("product_profile.json")]))
+    nodes.append(Node(agent1_1, (job_dir,),
+                      [p("posting.txt"), prompt("job-requirement-analyzer-prompt.txt")],
+                      [p("questions.json")]))
+    return nodes
+
+def pair_nodes(job_dir, candidate_dir, deep_alignment):
+    name = os.path.basename(os.path.normpath(candidate_dir))
+    evaluation = os.path.join(job_dir, "evaluations", f"{name}_evaluation.json")
+    resume = os.path.join(candidate_dir, "resume.md")
+    nodes = [
+        Node(agent1_2, (job_dir, candidate_dir),
+             [os.path.join(job_dir, "questions.json"), os.path.join(job_dir, "posting.txt"), resume,
+              prompt("candidate-evaluator-prompt.txt")],
+             [evaluation]),
+        Node(agent1_3, (job_dir, candidate_dir),
+             [evaluation, prompt("executive-summary-prompt.txt")],
+             [os.path.join(job_dir, "summaries", f"{name}_summary.md"),
+              os.path.join(job_dir, "summaries", f"{name}_score.json")]),
+    ]
+    experiences = os.path.join(candidate_dir, "experiences.md")
+    if deep_alignment and os.path.exists(experiences):
+        _, alignment = agent2_1.alignment_path(job_dir, candidate_dir)
+        nodes.append(Node(agent2_1, (job_dir, candidate_dir),
+                          [os.path.join(job_dir, "questions.json"), os.path.join(job_dir, "posting.txt"), resume,
+                           experiences, prompt("candidate-evaluator-prompt.txt")],
+                          [os.path.relpath(alignment)]))
+    return nodes
+
+def build_graph(job_dirs, candidate_dirs, product_profile=False, deep_alignment=False):
+    """Return every node in a valid execution order, with deps wired from output -> input paths."""
+    nodes = []
+    for job_dir in job_dirs:
+        nodes.extend(posting_nodes(job_dir, product_profile))
+        for candidate_dir in candidate_dirs:
+            nodes.extend(pair_nodes(job_dir, candidate_dir, deep_alignment))
+
+    producers = {out: node for node in nodes for out in node.outputs}
+    for node in nodes:
+        node.deps = [producers[p] for p in node.inputs if p in producers]
+    return nodes
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def stale_reason(node, manifest, hashes):
+    """Why node must run given its current input hashes, or None if it is up to date."""
+    entry = manifest.get(node.id)
+    if entry is None:
+        return "never built"
+    missing = [p for p in node.outputs if not os.path.exists(p)]
+    if missing:
+        return f"missing {', '.join(missing)}"
+    changed = [p for p, h in hashes.items() if entry["inputs"].get(p) != h]
+    if changed:
+        return f"changed {', '.join(changed)}"
+    return None
+
+def plan(nodes, manifest):
+    """Dry run: every stale node plus everything downstream of it, with the reason."""
+    scheduled = {}
+    for node in nodes:
+        reason = stale_reason(node, manifest, node.input_hashes())
+        if reason is None:
+            upstream = [d.id for d in node.deps if d.id in scheduled]
+            if upstream:
+                reason = f"upstream {upstream[0]}"
+        if reason is not None:
+            scheduled[node.id] = reason
+    return scheduled
+
+def run(nodes, manifest, manifest_path=MANIFEST_PATH, force=False):
+    """Execute stale nodes in order. Staleness is re-checked against the files as they
+    are now, so a dependent whose upstream rewrote identical output is left alone."""
+    failed = set()
+    ran = 0
+    for node in nodes:
+        if any(d.id in failed for d in node.deps):
+            print(f"⏭️  {node.id}: skipped, upstream failed")
+            failed.add(node.id)
+            continue
+
+        hashes = node.input_hashes()
+        reason = "forced" if force else stale_reason(node, manifest, hashes)
+        if reason is None:
+            continue
+
+        print(f"🔨 {node.id} ({reason})")
+        ran += 1
+        try:
+            node.agent.run(*node.args)
+        except AgentError as e:
+            print(e)
+            failed.add(node.id)
+            continue
+        except Exception as e:
+            # Like an AgentError: this node and its dependents fail, independent nodes still build
+            print(f"Error: {node.id} failed unexpectedly: {type(e).__name__}: {e}")
+            failed.add(node.id)
+            continue
+
+        manifest[node.id] = {"inputs": hashes, "outputs": {p: file_hash(p) for p in node.outputs}}
+        save_manifest(manifest, manifest_path)
+    return ran, failed
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally rebuild only the stale agent outputs.")
+    parser.add_argument("--postings", default="postings", help="Root directory searched for posting.txt")
+    parser.add_argument("--candidates", default="candidates", help="Root directory searched for resume.md")
+    parser.add_argument("--product-profile", action="store_true", help="Include Agent 0_3 nodes")
+    parser.add_argument("--deep-alignment", action="store_true", help="Include Agent 2_1 nodes")
+    parser.add_argument("--dry-run", action="store_true", help="Print what would run and why, then exit")
+    parser.add_argument("--force", action="store_true", help="Run every node regardless of the manifest")
+    parser.add_argument("--manifest", default=MANIFEST_PATH, help=f"Manifest file (default: {MANIFEST_PATH})")
+    args = parser.parse_args()
+
+    nodes = build_graph(find_dirs(args.postings, "posting.txt"), find_dirs(args.candidates, "resume.md"),
+                        product_profile=args.product_profile, deep_alignment=args.deep_alignment)
+    manifest = load_manifest(args.manifest)
+
+    if args.dry_run:
+        scheduled = {n.id: "forced" for n in nodes} if args.force else plan(nodes, manifest)
+        for node_id, reason in scheduled.items():
+            print(f"would run: {node_id} ({reason})")
+        print(f"{len(scheduled)} of {len(nodes)} nodes would run.")
+        return
+
+    if not os.environ.get("GEMINI_API_KEY"):
+        print("❌ Error: GEMINI_API_KEY is not set.")
+        sys.exit(1)
+
+    ran, failed = run(nodes, manifest, args.manifest, force=args.force)
+    print(f"✅ Build complete: {ran} of {len(nodes)} nodes ran, {len(failed)} failed or skipped.")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+import os
+import json
+import time
+import threading
+import dataclasses
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from google import genai
+from pydantic import ValidationError
+
+import context_cache
+import llm_cache
+import rate_limit
+import telemetry
+import validation
+from json_stream import JsonArrayStream
+
+# Prompts are resolved relative to the working directory, same as the agents always did
+PROMPTS_DIR = "prompts"
+
+_client = None
+
+class AgentError(Exception):
+    """Raised by an agent's run() when it cannot finish. main() turns it into exit code 1."""
+
+def get_client():
+    """Return the process-wide genai client so every agent shares one connection pool."""
+    global _client
+    if _client is None:
+        _client = genai.Client()
+    return _client
+
+FILE_CACHE_ENTRIES = 512    # files kept warm; the least recently read are dropped first
+
+_file_cache = OrderedDict()     # path -> ((mtime_ns, size), text, parsed JSON or _UNPARSED)
+_file_lock = threading.Lock()
+_UNPARSED = object()
+
+def load_prompt(name):
+    """Read prompts/<name>, re-reading it only after the file changes (see read_text)."""
+    return read_text(os.path.join(PROMPTS_DIR, name))
+
+def _cached_file(path):
+    """The cache entry for path, (re)reading the file when its size or mtime changed."""
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _file_lock:
+        cached = _file_cache.get(path)
+        if cached and cached[0] == stamp:
+            _file_cache.move_to_end(path)
+            return cached
+    with open(path, "r") as f:
+        entry = (stamp, f.read(), _UNPARSED)
+    with _file_lock:
+        _file_cache[path] = entry
+        _file_cache.move_to_end(path)
+        while len(_file_cache) > FILE_CACHE_ENTRIES:
+            _file_cache.popitem(last=False)
+    return entry
+
+def read_text(path):
+    """Read a per-posting input (questions.json, posting.txt), reusing the text while the
+    file's size and mtime are unchanged. Saves the re-read when one process serves many
+    candidates for the same posting."""
+    return _cached_file(path)[1]
+
+def read_json(path):
+    """Parsed JSON of a per-posting input, kept warm like read_text(). The value is shared
+    between callers, so treat it as read-only."""
+    stamp, text, parsed = _cached_file(path)
+    if parsed is _UNPARSED:
+        parsed = json.loads(text)
+        with _file_lock:
+            if path in _file_cache and _file_cache[path][0] == stamp:
+                _file_cache[path] = (stamp, text, parsed)
+    return parsed
+
+@dataclass
+class ModelRequest:
+    """One structured-output model call, as built by an agent's prepare()."""
+    agent: str
+    model: str
+    contents: str
+    schema: Any
+    output_path: str
+    # Content shared by many requests (e.g. one posting across all candidates).
+    # When set, it is registered once with the model's context cache and only
+    # contents is sent per call.
+    prefix: Optional[str] = None
+    # Stream list responses element by element (see _ItemSink)
+    stream: bool = False
+    # Agent-specific values prepare() hands over to save()
+    state: dict = field(default_factory=dict)
+
+    def full_contents(self):
+        if self.prefix is None:
+            return self.contents
+        return f"{self.prefix}\n\n{self.contents}"
+
+def _config(request, cached_content=None):
+    # schema=None asks for plain text (e.g. Markdown prose)
+    config = {}
+    if request.schema is not None:
+        config = {
+            'response_mime_type': 'application/json',
+            'response_schema': request.schema
+        }
+    if cached_content:
+        config['cached_content'] = cached_content
+    return config
+
+def _parse(request, text):
+    """validation.Parsed for the response text: repaired, enum-normalized and validated."""
+    parsed = validation.parse(request.schema, text)
+    if parsed.repaired:
+        count = len(parsed.value) + len(parsed.invalid)
+        kept = f" ({count} complete elements kept)" if isinstance(parsed.value, list) else ""
+        print(f"{_label(request)}: Repaired malformed JSON locally{kept}.")
+    return parsed
+
+def _contents(request, cached_content):
+    # Without a usable context cache the prefix has to travel inline
+    return request.contents if cached_content else request.full_contents()
+
+def _label(request):
+    return f"Agent {request.agent[len('agent'):]}"
+
+def _streams_items(request):
+    return request.stream and request.schema is not None and validation.validator(request.schema).is_list
+
+class _ItemSink:
+    """Validates array elements as they stream in and appends each to a JSONL sidecar.
+
+    The sidecar (<output>.partial.jsonl) survives a call that dies mid-stream and
+    is removed once the full array has arrived.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.validator = validation.validator(request.schema)
+        self.parser = JsonArrayStream()
+        self.items = []
+        self.invalid = []
+        self.seen = 0
+        self.started_at = time.perf_counter()
+        self.sidecar_path = f"{request.output_path}.partial.jsonl"
+        os.makedirs(os.path.dirname(os.path.abspath(self.sidecar_path)), exist_ok=True)
+        self.sidecar = open(self.sidecar_path, "w")
+
+    def feed(self, text):
+        for raw in self.parser.feed(text):
+            index, self.seen = self.seen, self.seen + 1
+            try:
+                item = self.validator.validate(raw)
+            except ValidationError as e:
+                # Kept out of the sidecar; generate() re-asks for it once the stream is done
+                print(f"Warning: streamed item {index + 1} failed validation: {e.errors()[0]['msg']}")
+                self.invalid.append((index, raw, str(e.errors()[0]["msg"])))
+                continue
+            if not self.items:
+                print(f"{_label(self.request)}: first item after "
+                      f"{time.perf_counter() - self.started_at:.1f}s.")
+            self.items.append(item)
+            self.sidecar.write(json.dumps(item) + "\n")
+            self.sidecar.flush()
+
+    def finish(self):
+        self.sidecar.close()
+        parsed = validation.Parsed(self.items, self.invalid)
+        if not self.parser.finished:
+            # A malformed element stalls the stream parser; pick up what follows it
+            rest = validation.parse(self.request.schema, "[" + self.parser.pending)
+            if not rest.value and not rest.invalid:
+                raise ValueError(f"stream ended before the array was complete; "
+                                 f"{len(self.items)} items kept in {self.sidecar_path}")
+            parsed.value += rest.value
+            parsed.invalid += [(self.seen + i, raw, error) for i, raw, error in rest.invalid]
+            parsed.repaired, parsed.complete = True, rest.complete
+        os.remove(self.sidecar_path)
+        return parsed
+
+    def abort(self):
+        self.sidecar.close()
+
+def _reask(request, parsed):
+    """A follow-up request for only the elements of parsed that failed validation, or None.
+
+    Corrections are asked for once; a follow-up's own failures are not re-asked."""
+    if not parsed.invalid or request.state.get("reask"):
+        return None
+    print(f"{_label(request)}: {len(parsed.invalid)} element(s) failed validation; re-asking for those only...")
+    return dataclasses.replace(
+        request, contents=validation.reask_contents(request.contents, parsed.invalid),
+        output_path=f"{request.output_path}.reask", stream=False, state={**request.state, "reask": True})
+
+def _continuation(request, parsed):
+    """A follow-up request for the elements after the cut in a truncated list response, or None.
+
+    Like corrections, the missing tail is asked for once."""
+    if parsed.complete or not isinstance(parsed.value, list) or request.state.get("reask") \
+            or request.state.get("continuation"):
+        return None
+    print(f"{_label(request)}: response was cut off after {len(parsed.value) + len(parsed.invalid)} "
+          f"element(s); asking for the rest...")
+    return dataclasses.replace(
+        request, contents=validation.continuation_contents(request.contents, parsed),
+        output_path=f"{request.output_path}.continued", stream=False,
+        state={**request.state, "continuation": True})
+
+def _followup_failed(what, e):
+    print(f"Warning: {what} request failed ({e}); keeping the valid elements only.")
+    return [], False
+
+def _ask(followup, what):
+    """(result, complete) for a follow-up request; (None, True) when there is none."""
+    if followup is None:
+        return None, True
+    try:
+        return _generate(followup)
+    except AgentError as e:
+        return _followup_failed(what, e)
+
+async def _aask(followup, what):
+    """Async twin of _ask()."""
+    if followup is None:
+        return None, True
+    try:
+        return await _agenerate(followup)
+    except AgentError as e:
+        return _followup_failed(what, e)
+
+def _result(request, parsed, fixed=None):
+    if request.state.get("reask"):
+        # None marks a correction that is still invalid, so the rest stay aligned with what was asked
+        return validation.positional(parsed)
+    if fixed is None:
+        return parsed.value
+    return validation.merge(parsed, fixed)
+
+def _finish(request, key, parsed, fixed, rest, complete):
+    """Assemble the result and cache it, unless elements were lost along the way.
+
+    An incomplete result (a cut-off response whose tail never came back, or invalid
+    elements left uncorrected) is returned but not cached, so the next run asks again."""
+    result = _result(request, parsed, fixed)
+    if fixed is None and parsed.invalid:
+        complete = False    # a follow-up's own failures, returned as None for the caller to report
+    elif fixed is not None and len(result) < len(parsed.value) + len(parsed.invalid):
+        complete = False
+    if rest is not None:
+        result = result + rest
+    elif not parsed.complete:
+        complete = False
+    if complete:
+        llm_cache.put(key, result)
+    else:
+        print(f"{_label(request)}: result is incomplete; not caching it.")
+    return result, complete
+
+def _cached(request):
+    """Look the request up in the response cache. Returns (key, result or None)."""
+    key = llm_cache.cache_key(request.model, request.schema, request.full_contents())
+    result = llm_cache.get(key)
+    if result is not None:
+        print(f"{_label(request)}: Cache hit - inputs unchanged since the last run.")
+    return key, result
+
+def _call(client, request, cached_content):
+    """One attempt at the model call. Returns (result, usage_metadata)."""
+    if _streams_items(request):
+        sink = _ItemSink(request)
+        usage = None
+        try:
+            for chunk in client.models.generate_content_stream(
+                model=request.model,
+                contents=_contents(request, cached_content),
+                config=_config(request, cached_content)
+            ):
+                sink.feed(chunk.text or "")
+                usage = chunk.usage_metadata or usage
+        finally:
+            sink.abort()
+        return sink.finish(), usage
+    response = client.models.generate_content(
+        model=request.model,
+        contents=_contents(request, cached_content),
+        config=_config(request, cached_content)
+    )
+    return _parse(request, response.text), response.usage_metadata
+
+async def _acall(client, request, cached_content):
+    """Async twin of _call()."""
+    if _streams_items(request):
+        sink = _ItemSink(request)
+        usage = None
+        try:
+            async for chunk in await client.aio.models.generate_content_stream(
+                model=request.model,
+                contents=_contents(request, cached_content),
+                config=_config(request, cached_content)
+            ):
+                sink.feed(chunk.text or "")
+                usage = chunk.usage_metadata or usage
+        finally:
+            sink.abort()
+        return sink.finish(), usage
+    response = await client.aio.models.generate_content(
+        model=request.model,
+        contents=_contents(request, cached_content),
+        config=_config(request, cached_content)
+    )
+    return _parse(request, response.text), response.usage_metadata
+
+def _send(client, request, trace):
+    """Run the call through the scheduler, with the prefix in a context cache when there is one.
+
+    A cache the server no longer has is forgotten and the call is retried once inline."""
+    cached_content = None
+    if request.prefix is not None:
+        cached_content = context_cache.get_or_create(client, request.model, request.prefix)
+    scheduler, estimate = rate_limit.get_scheduler(), rate_limit.estimate_tokens(request.full_contents())
+    try:
+        return scheduler.run(lambda: _call(client, request, cached_content), estimate, _label(request), trace)
+    except Exception as e:
+        if not cached_content or not context_cache.is_missing(e):
+            raise
+        print(f"{_label(request)}: context cache {cached_content} is gone ({e}); retrying with the prefix inline.")
+        context_cache.forget(request.model, request.prefix)
+        return scheduler.run(lambda: _call(client, request, None), estimate, _label(request), trace)
+
+async def _asend(client, request, trace):
+    """Async twin of _send()."""
+    cached_content = None
+    if request.prefix is not None:
+        cached_content = await context_cache.aget_or_create(client, request.model, request.prefix)
+    scheduler, estimate = rate_limit.get_scheduler(), rate_limit.estimate_tokens(request.full_contents())
+    try:
+        return await scheduler.arun(lambda: _acall(client, request, cached_content), estimate, _label(request), trace)
+    except Exception as e:
+        if not cached_content or not context_cache.is_missing(e):
+            raise
+        print(f"{_label(request)}: context cache {cached_content} is gone ({e}); retrying with the prefix inline.")
+        context_cache.forget(request.model, request.prefix)
+        return await scheduler.arun(lambda: _acall(client, request, None), estimate, _label(request), trace)
+
+def _generate(request):
+    """generate() returning (result, complete); complete is False when elements were lost."""
+    trace = telemetry.Call(request)
+    key, result = _cached(request)
+    if result is not None:
+        trace.finish(cache_hit=True)
+        return result, True
+    client = get_client()
+    try:
+        parsed, usage = _send(client, request, trace)
+        if request.prefix is not None:
+            context_cache.record(request.agent, usage)
+    except Exception as e:
+        trace.finish(error=e)
+        raise AgentError(f"Error during API call: {e}") from e
+    trace.finish(usage)
+    fixed, fixed_complete = _ask(_reask(request, parsed), "correction")
+    rest, rest_complete = _ask(_continuation(request, parsed), "continuation")
+    return _finish(request, key, parsed, fixed, rest, fixed_complete and rest_complete)
+
+def generate(request):
+    """Send the request and return the parsed JSON response."""
+    return _generate(request)[0]
+
+async def _agenerate(request):
+    """Async twin of _generate()."""
+    trace = telemetry.Call(request)
+    key, result = _cached(request)
+    if result is not None:
+        trace.finish(cache_hit=True)
+        return result, True
+    client = get_client()
+    try:
+        parsed, usage = await _asend(client, request, trace)
+        if request.prefix is not None:
+            context_cache.record(request.agent, usage)
+    except Exception as e:
+        trace.finish(error=e)
+        raise AgentError(f"Error during API call: {e}") from e
+    trace.finish(usage)
+    fixed, fixed_complete = await _aask(_reask(request, parsed), "correction")
+    rest, rest_complete = await _aask(_continuation(request, parsed), "continuation")
+    return _finish(request, key, parsed, fixed, rest, fixed_complete and rest_complete)
+
+async def agenerate(request):
+    """Async twin of generate() on the client's aio surface."""
+    return (await _agenerate(request))[0]
+
+def generate_stream(request, on_text):
+    """Like generate(), but hands each text chunk to on_text as it arrives.
+
+    A cache hit is delivered as a single chunk.
+    """
+    trace = telemetry.Call(request)
+    key, result = _cached(request)
+    if result is not None:
+        trace.finish(cache_hit=True)
+        on_text(result if request.schema is None else json.dumps(result))
+        return result
+    def call():
+        chunks, usage = [], None
+        for chunk in get_client().models.generate_content_stream(
+            model=request.model,
+            contents=request.full_contents(),
+            config=_config(request)
+        ):
+            if chunk.text:
+                chunks.append(chunk.text)
+                on_text(chunk.text)
+            usage = chunk.usage_metadata or usage
+        return _parse(request, "".join(chunks)), usage
+
+    try:
+        parsed, usage = rate_limit.get_scheduler().run(
+            call, rate_limit.estimate_tokens(request.full_contents()), _label(request), trace)
+    except Exception as e:
+        trace.finish(error=e)
+        raise AgentError(f"Error during API call: {e}") from e
+    trace.finish(usage)
+    fixed, fixed_complete = _ask(_reask(request, parsed), "correction")
+    rest, rest_complete = _ask(_continuation(request, parsed), "continuation")
+    return _finish(request, key, parsed, fixed, rest, fixed_complete and rest_complete)[0]
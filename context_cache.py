@@ -0,0 +1,127 @@
+import os
+import time
+import asyncio
+import hashlib
+import threading
+
+# Registry of server-side context caches for shared request prefixes.
+# Agents that evaluate many candidates against one posting put everything
+# posting-specific (prompt, requirements, posting text) into ModelRequest.prefix.
+# The first call registers that prefix with the model's context cache; every
+# later call for the same posting sends only the candidate's documents.
+# A cache is recreated once its TTL has (nearly) run out, and a call whose cache
+# the server no longer has is retried once with the prefix inline.
+TTL = os.environ.get("CONTEXT_CACHE_TTL", "3600s")
+EXPIRY_MARGIN_SECONDS = 60  # recreate this long before the server drops the cache
+
+_lock = threading.Lock()         # guards the dicts below; never held across a network call
+_names = {}      # (model, prefix hash) -> (cache name or None when caching was refused, expiry)
+_key_locks = {}  # (model, prefix hash) -> threading.Lock serializing that key's creation
+_pending = {}    # (model, prefix hash) -> asyncio.Task creating the cache
+_usage = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0}
+
+def _key(model, prefix):
+    return model, hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+
+def _ttl_seconds():
+    return float(TTL.rstrip("s"))
+
+def _lookup(key):
+    """(found, name): the registered name while it is still fresh."""
+    with _lock:
+        entry = _names.get(key)
+    if entry is None or entry[1] <= time.monotonic():
+        return False, None
+    return True, entry[0]
+
+def _store(key, name):
+    # A refusal is remembered for a full TTL too, so it is retried now and then
+    with _lock:
+        _names[key] = (name, time.monotonic() + _ttl_seconds() - EXPIRY_MARGIN_SECONDS)
+    return name
+
+def _create_config(prefix, key):
+    return {"contents": prefix, "ttl": TTL, "display_name": f"prefix-{key[1][:16]}"}
+
+def _refused(model, e):
+    # Usually the prefix is below the model's minimum cacheable size; fall back to inline
+    print(f"Context cache unavailable for {model} ({e}); sending the prefix inline.")
+    return None
+
+def get_or_create(client, model, prefix):
+    """Return the cache name holding prefix for model, creating it on first use or after expiry.
+
+    Threads asking for the same prefix wait for one creation; other prefixes are not held up."""
+    key = _key(model, prefix)
+    found, name = _lookup(key)
+    if found:
+        return name
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+    with key_lock:
+        found, name = _lookup(key)
+        if found:
+            return name
+        try:
+            cache = client.caches.create(model=model, config=_create_config(prefix, key))
+            return _store(key, cache.name)
+        except Exception as e:
+            return _store(key, _refused(model, e))
+
+async def aget_or_create(client, model, prefix):
+    """Async twin of get_or_create(); concurrent callers share one creation request."""
+    key = _key(model, prefix)
+    found, name = _lookup(key)
+    if found:
+        return name
+    if key not in _pending:
+        async def create():
+            try:
+                cache = await client.aio.caches.create(model=model, config=_create_config(prefix, key))
+                return _store(key, cache.name)
+            except Exception as e:
+                return _store(key, _refused(model, e))
+            finally:
+                _pending.pop(key, None)
+        _pending[key] = asyncio.ensure_future(create())
+    return await _pending[key]
+
+def is_missing(e):
+    """Whether a call failed because the server no longer has its context cache."""
+    return getattr(e, "code", None) in (403, 404) and "cache" in str(e).lower()
+
+def forget(model, prefix):
+    """Drop a cache the server reported missing, so the next call creates a fresh one."""
+    with _lock:
+        _names.pop(_key(model, prefix), None)
+
+def record(agent, usage):
+    """Print and accumulate how much of a call's prompt was served from the context cache."""
+    if usage is None:
+        return
+    prompt_tokens = usage.prompt_token_count or 0
+    cached_tokens = usage.cached_content_token_count or 0
+    with _lock:
+        _usage["calls"] += 1
+        _usage["prompt_tokens"] += prompt_tokens
+        _usage["cached_tokens"] += cached_tokens
+    print(f"Agent {agent[len('agent'):]}: {cached_tokens} of {prompt_tokens} prompt tokens served from context cache.")
+
+def report():
+    if not _usage["calls"]:
+        return
+    share = 100 * _usage["cached_tokens"] / max(_usage["prompt_tokens"], 1)
+    print(f"🧠 Context cache: {_usage['cached_tokens']} of {_usage['prompt_tokens']} prompt tokens "
+          f"({share:.0f}%) across {_usage['calls']} calls were cached.")
+
+def release_all(client):
+    """Delete every cache this process created; they are billed for storage until the TTL runs out."""
+    with _lock:
+        names = [n for n, _ in _names.values() if n]
+        _names.clear()
+        _pending.clear()
+    for name in names:
+        try:
+            client.caches.delete(name=name)
+        except Exception as e:
+            print(f"Warning: could not delete context cache {name}: {e}")
@@ -0,0 +1,131 @@
+import os
+import csv
+import json
+import time
+import argparse
+
+import numpy as np
+from scipy import sparse
+
+from orchestrate import find_dirs
+from resume_index import candidate_text, tokenize
+
+# Batch triage: every BinaryRequirement across all postings against every candidate
+# document in a handful of sparse matrix products, no per-pair Python loops.
+#
+# A requirement's score against a candidate is the IDF-weighted share of its terms
+# that appear in the candidate's documents (L1-normalised requirement TF-IDF times
+# candidate term presence), so 1.0 means every distinctive term was found.
+# A requirement counts as covered when that share reaches --threshold.
+DEFAULT_THRESHOLD = 0.35
+CORE_WEIGHT = 2.0
+
+def count_matrix(texts, vocab):
+    """Sparse term-count matrix (len(texts) x len(vocab)); vocab grows as new terms appear."""
+    indptr, indices, data = [0], [], []
+    for text in texts:
+        counts = {}
+        for term in tokenize(text):
+            col = vocab.setdefault(term, len(vocab))
+            counts[col] = counts.get(col, 0) + 1
+        indices.extend(counts)
+        data.extend(counts.values())
+        indptr.append(len(indices))
+    return indptr, indices, data
+
+def to_csr(parts, n_cols):
+    indptr, indices, data = parts
+    return sparse.csr_matrix((np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32),
+                              np.asarray(indptr, dtype=np.int64)), shape=(len(indptr) - 1, n_cols))
+
+def load_requirements(job_dirs):
+    """Flatten every questions.json into (posting index, requirement text, is_core) rows."""
+    posting_ids, texts, core = [], [], []
+    postings = []
+    for job_dir in job_dirs:
+        path = os.path.join(job_dir, "questions.json")
+        if not os.path.exists(path):
+            continue
+        with open(path, "r") as f:
+            requirements = json.load(f)
+        postings.append(job_dir)
+        for req in requirements:
+            posting_ids.append(len(postings) - 1)
+            texts.append(f"{req.get('requirement', '')} {req.get('question', '')}")
+            core.append(req.get("priority") == "Core")
+    return postings, np.asarray(posting_ids, dtype=np.int64), texts, np.asarray(core, dtype=bool)
+
+def coverage(job_dirs, candidate_dirs, threshold=DEFAULT_THRESHOLD):
+    """Return (postings, candidates, core_cov, preferred_cov, fit), each matrix postings x candidates."""
+    postings, posting_ids, req_texts, is_core = load_requirements(job_dirs)
+    vocab = {}
+    cand_parts = count_matrix([candidate_text(d) for d in candidate_dirs], vocab)
+    req_parts = count_matrix(req_texts, vocab)
+    C = to_csr(cand_parts, len(vocab))
+    R = to_csr(req_parts, len(vocab))
+
+    # IDF over the candidate corpus (smoothed like scikit-learn's)
+    presence = (C > 0).astype(np.float32)
+    df = np.asarray(presence.sum(axis=0)).ravel()
+    idf = np.log((1 + C.shape[0]) / (1 + df)) + 1
+
+    R = R.multiply(idf).tocsr()
+    row_sums = np.asarray(R.sum(axis=1)).ravel()
+    row_sums[row_sums == 0] = 1
+    R = sparse.diags(1 / row_sums) @ R
+
+    # requirements x candidates
+    scores = (R @ presence.T).tocsr()
+    met = (scores >= threshold).astype(np.float32)
+
+    # Sum covered requirements per posting with sparse indicator matrices
+    n_req = len(req_texts)
+    cols = np.arange(n_req)
+    P_core = sparse.csr_matrix((is_core.astype(np.float32), (posting_ids, cols)), shape=(len(postings), n_req))
+    P_pref = sparse.csr_matrix(((~is_core).astype(np.float32), (posting_ids, cols)), shape=(len(postings), n_req))
+    core_hits = (P_core @ met).toarray()
+    pref_hits = (P_pref @ met).toarray()
+    n_core = np.asarray(P_core.sum(axis=1))
+    n_pref = np.asarray(P_pref.sum(axis=1))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        core_cov = np.where(n_core > 0, core_hits / n_core, 1.0)
+        pref_cov = np.where(n_pref > 0, pref_hits / n_pref, 1.0)
+        fit = (CORE_WEIGHT * core_hits + pref_hits) / np.maximum(CORE_WEIGHT * n_core + n_pref, 1)
+    return postings, candidate_dirs, core_cov, pref_cov, fit
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate Core/Preferred coverage for every (posting, candidate) pair.")
+    parser.add_argument("--postings", default="postings", help="Root directory searched for posting.txt")
+    parser.add_argument("--candidates", default="candidates", help="Root directory searched for resume.md")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Share of a requirement's weighted terms needed to count it as covered (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--min-core", type=float, default=0.0, help="Only keep pairs with at least this Core coverage")
+    parser.add_argument("--top-k", type=int, default=None, help="Only keep the K best pairs per posting")
+    parser.add_argument("--output", default="coverage_matrix.csv")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    postings, candidates, core_cov, pref_cov, fit = coverage(
+        find_dirs(args.postings, "posting.txt"), find_dirs(args.candidates, "resume.md"), args.threshold)
+    elapsed = time.perf_counter() - start
+
+    keep = core_cov >= args.min_core
+    if args.top_k is not None and len(candidates) > args.top_k:
+        order = np.argsort(-fit, axis=1, kind="stable")
+        top = np.zeros_like(keep)
+        np.put_along_axis(top, order[:, :args.top_k], True, axis=1)
+        keep &= top
+
+    rows = np.argwhere(keep)
+    with open(args.output, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["posting", "candidate", "core_coverage", "preferred_coverage", "estimated_fit"])
+        for p, c in rows[np.lexsort((-fit[keep], rows[:, 0]))]:
+            writer.writerow([postings[p], candidates[c], f"{core_cov[p, c]:.3f}", f"{pref_cov[p, c]:.3f}", f"{fit[p, c]:.3f}"])
+
+    print(f"Scored {len(postings)} postings x {len(candidates)} candidates in {elapsed:.2f}s.")
+    print(f"{len(rows)} pairs written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import re
+
+from resume_index import BM25Index
+
+# Per-requirement evidence retrieval for experiences.md.
+# Instead of pasting every STAR entry into the prompt, each requirement pulls
+# its top-N entries from a small BM25 index and the union is sent once.
+
+def split_star_entries(text):
+    """Split experiences.md into entries at Markdown headings or horizontal rules.
+
+    Falls back to blank-line separated paragraphs when the file has no structure.
+    """
+    blocks = re.split(r"\n(?=#{1,6} )|\n\s*(?:---+|\*\*\*+)\s*\n", text)
+    entries = [b.strip() for b in blocks if b.strip()]
+    # A lone top-level title ("# My Experiences") is not an entry by itself
+    entries = [e for e in entries if len(e.splitlines()) > 1 or not e.startswith("#")]
+    if len(entries) <= 1:
+        entries = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    return entries
+
+def evidence_pack(experiences_text, requirements, top_n=3):
+    """Return (pack_text, kept, total): the deduplicated entries relevant to any requirement.
+
+    Entries keep their original order and are tagged with the requirement
+    numbers that retrieved them, so the model can still see why each is there.
+    """
+    entries = split_star_entries(experiences_text)
+    if len(entries) <= top_n:
+        return experiences_text, len(entries), len(entries)
+
+    index = BM25Index()
+    for i, entry in enumerate(entries):
+        index.add(i, entry)
+
+    relevant = {}
+    for number, req in enumerate(requirements, start=1):
+        scores = index.score(f"{req.get('requirement', '')} {req.get('question', '')}")
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_n]
+        for i, _ in best:
+            relevant.setdefault(i, []).append(number)
+
+    if not relevant:
+        return "No STAR entry matched any requirement.", 0, len(entries)
+
+    parts = []
+    for i in sorted(relevant):
+        tags = ", ".join(f"R{n}" for n in relevant[i])
+        parts.append(f"[Relevant to {tags}]\n{entries[i]}")
+    return "\n\n".join(parts), len(relevant), len(entries)
@@ -0,0 +1,56 @@
+import json
+
+class JsonArrayStream:
+    """Incremental parser for a top-level JSON array arriving in arbitrary chunks.
+
+    feed() returns every element completed by the new text, so callers can act on
+    each element long before the closing bracket arrives.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self.started = False
+        self.finished = False
+
+    @property
+    def pending(self):
+        """Text received but not yet parsed into an element."""
+        return self._buffer[self._pos:]
+
+    def _skip(self, chars):
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in chars:
+            self._pos += 1
+
+    def feed(self, text):
+        self._buffer += text
+        items = []
+        while not self.finished:
+            if not self.started:
+                self._skip(" \t\r\n")
+                if self._pos >= len(self._buffer):
+                    break
+                if self._buffer[self._pos] != "[":
+                    raise ValueError(f"Expected a JSON array, got {self._buffer[self._pos:self._pos + 20]!r}")
+                self._pos += 1
+                self.started = True
+
+            self._skip(" \t\r\n,")
+            if self._pos >= len(self._buffer):
+                break
+            if self._buffer[self._pos] == "]":
+                self._pos += 1
+                self.finished = True
+                break
+            try:
+                item, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                break  # Element still incomplete; wait for more text
+            items.append(item)
+            self._pos = end
+
+        # Drop what has been consumed so the buffer stays one element long
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        return items
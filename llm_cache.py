@@ -0,0 +1,125 @@
+import os
+import sys
+import json
+import hashlib
+import argparse
+import threading
+from functools import lru_cache
+from pydantic import TypeAdapter
+
+# Disk-backed, content-addressed cache of parsed model responses.
+# The key covers everything that can change an answer: model name, response schema
+# and the full request text (prompt template + every input file it was built from).
+# Entries are evicted least-recently-used first once the directory exceeds its size budget.
+CACHE_DIR = os.environ.get("LLM_CACHE_DIR", ".llm_cache")
+MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_MB", "512")) * 1024 * 1024
+ENABLED = os.environ.get("LLM_CACHE", "on").lower() not in ("off", "0", "false")
+
+_lock = threading.Lock()
+_total_bytes = None
+
+@lru_cache(maxsize=None)
+def schema_fingerprint(schema):
+    """Canonical JSON of the response schema, so a field change invalidates old entries."""
+    if schema is None:
+        return "text"
+    return json.dumps(TypeAdapter(schema).json_schema(), sort_keys=True)
+
+def cache_key(model, schema, contents):
+    payload = json.dumps([model, schema_fingerprint(schema), contents])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.json")
+
+def _entries():
+    """Yield (path, size, last_used) for every cached entry."""
+    if not os.path.isdir(CACHE_DIR):
+        return
+    for dirpath, _, filenames in os.walk(CACHE_DIR):
+        for name in filenames:
+            if name.endswith(".json"):
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+def get(key):
+    """Return the cached result for key, or None. A hit refreshes the entry's LRU position."""
+    if not ENABLED:
+        return None
+    path = _entry_path(key)
+    try:
+        with open(path, "r") as f:
+            result = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+    return result
+
+def put(key, result):
+    global _total_bytes
+    if not ENABLED:
+        return
+    path = _entry_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = json.dumps(result)
+    # Write-then-rename so a concurrent reader never sees half an entry
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(data)
+    try:
+        replaced = os.path.getsize(path)   # an overwritten entry's old size leaves the total
+    except FileNotFoundError:
+        replaced = 0
+    os.replace(tmp_path, path)
+
+    with _lock:
+        if _total_bytes is None:
+            _total_bytes = sum(size for _, size, _ in _entries())
+        else:
+            _total_bytes += len(data) - replaced
+        if _total_bytes > MAX_BYTES:
+            _total_bytes = _evict(MAX_BYTES)
+
+def _evict(budget):
+    """Delete least-recently-used entries until the cache fits in budget. Returns the new total."""
+    entries = sorted(_entries(), key=lambda e: e[2])
+    total = sum(size for _, size, _ in entries)
+    for path, size, _ in entries:
+        if total <= budget:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or prune the LLM response cache.")
+    parser.add_argument("command", choices=["stats", "prune", "clear"])
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        entries = list(_entries())
+        total = sum(size for _, size, _ in entries)
+        print(f"{CACHE_DIR}: {len(entries)} entries, {total / 1024 / 1024:.1f} MB "
+              f"(budget {MAX_BYTES / 1024 / 1024:.0f} MB)")
+    elif args.command == "prune":
+        total = _evict(MAX_BYTES)
+        print(f"Pruned {CACHE_DIR} to {total / 1024 / 1024:.1f} MB")
+    else:
+        total = _evict(0)
+        if total:
+            print(f"Error: could not remove every entry from {CACHE_DIR}")
+            sys.exit(1)
+        print(f"Cleared {CACHE_DIR}")
+
+if __name__ == "__main__":
+    main()
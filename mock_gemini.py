@@ -0,0 +1,217 @@
+import re
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Local stand-in for the Gemini REST API, for benchmarks that must not spend quota.
+# Point the SDK at it with GOOGLE_GEMINI_BASE_URL=http://127.0.0.1:<port>; any
+# GEMINI_API_KEY is accepted. generateContent / streamGenerateContent answer with
+# data generated from the request's responseSchema, so every agent's pydantic
+# model validates it. cachedContents create/delete are supported for --shared-prefix.
+
+# Prompt sections whose JSON list the response should mirror item for item, so
+# evaluations answer exactly the requirements they were asked about
+ECHO_HEADINGS = ["### REQUIREMENTS:", "### MASTER SCREENING QUESTIONS (JSON):"]
+# Postings packed into one fused Phase 0 request; the answer has one entry per id
+POSTING_HEADING = re.compile(r"^## POSTING (\w+)$", re.MULTILINE)
+DEFAULT_ITEMS = 8
+
+WORDS = ("candidate posting requirement experience python distributed systems team product "
+         "customer reliability delivery ownership roadmap platform mentoring migration latency").split()
+
+def parse_latency(spec):
+    """'fixed:0.5', 'uniform:0.2,1.5' or 'lognormal:<median>,<sigma>' -> sampler returning seconds."""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "lognormal":
+        median, sigma = values
+        return lambda: random.lognormvariate(0, sigma) * median
+    raise argparse.ArgumentTypeError(f"unknown latency distribution: {spec}")
+
+def _sentence(rng, n=8):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+def fake(schema, rng, template=None):
+    """A value valid for a Gemini responseSchema. template (an item from the prompt) supplies matching fields."""
+    kind = (schema.get("type") or "STRING").upper()
+    if "enum" in schema:
+        if isinstance(template, str) and template in schema["enum"]:
+            return template
+        return rng.choice(schema["enum"])
+    if kind == "OBJECT":
+        template = template if isinstance(template, dict) else {}
+        props = schema.get("properties", {})
+        order = schema.get("property_ordering") or schema.get("propertyOrdering") or list(props)
+        return {name: fake(props[name], rng, template.get(name)) for name in order if name in props}
+    if kind == "ARRAY":
+        templates = template if isinstance(template, list) else [None] * rng.randint(2, DEFAULT_ITEMS)
+        return [fake(schema.get("items", {}), rng, t) for t in templates]
+    if kind == "NUMBER":
+        return round(rng.uniform(0, 100), 1)
+    if kind == "INTEGER":
+        return rng.randint(0, 100)
+    if kind == "BOOLEAN":
+        return rng.random() < 0.5
+    if isinstance(template, str):
+        return template
+    return f"# Summary\n\n{_sentence(rng, 30)}" if "markdown" in schema.get("title", "").lower() else _sentence(rng)
+
+def echo_items(prompt):
+    """The JSON list following one of ECHO_HEADINGS in the prompt, or one
+    {"posting_id": ...} template per POSTING_HEADING, or None."""
+    decoder = json.JSONDecoder()
+    for heading in ECHO_HEADINGS:
+        at = prompt.find(heading)
+        if at < 0:
+            continue
+        start = prompt.find("[", at)
+        try:
+            items, _ = decoder.raw_decode(prompt, start)
+        except (ValueError, json.JSONDecodeError):
+            continue
+        if isinstance(items, list):
+            return items
+    ids = POSTING_HEADING.findall(prompt)
+    return [{"posting_id": i} for i in ids] if ids else None
+
+def respond(body, cached_prefix=""):
+    """Build (text, usageMetadata) for a generateContent request body."""
+    prompt = "\n".join(p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", []))
+    # Same prompt, same answer: runs are reproducible and comparable
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+    schema = body.get("generationConfig", {}).get("responseSchema")
+    if schema is None:
+        text = "# Executive Summary\n\n" + "\n\n".join(_sentence(rng, 25) for _ in range(4))
+    else:
+        template = echo_items(cached_prefix + "\n" + prompt) if schema.get("type", "").upper() == "ARRAY" else None
+        text = json.dumps(fake(schema, rng, template), indent=2)
+    cached = len(cached_prefix) // 4
+    usage = {"promptTokenCount": (len(prompt) + len(cached_prefix)) // 4 + 1,
+             "candidatesTokenCount": len(text) // 4 + 1, "cachedContentTokenCount": cached}
+    usage["totalTokenCount"] = usage["promptTokenCount"] + usage["candidatesTokenCount"]
+    return text, usage
+
+def _candidate(text, usage=None):
+    payload = {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP"}]}
+    if usage:
+        payload["usageMetadata"] = usage
+    return payload
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MockGemini/1.0"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _injected_error(self):
+        """Answer with a 429 or 500 at the configured rates. Returns True when it did."""
+        roll = random.random()
+        server = self.server
+        if roll < server.rate_429:
+            self._send(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED", "message": "Quota exceeded (mock).",
+                                       "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo",
+                                                    "retryDelay": f"{server.retry_delay}s"}]}})
+        elif roll < server.rate_429 + server.rate_500:
+            self._send(500, {"error": {"code": 500, "status": "INTERNAL", "message": "Internal error (mock)."}})
+        else:
+            return False
+        with server.lock:
+            server.stats["injected"] += 1
+        return True
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        path = self.path.split("?")[0]
+        server = self.server
+
+        if path.endswith("/cachedContents"):
+            name = f"cachedContents/mock-{hashlib.sha256(json.dumps(body).encode()).hexdigest()[:16]}"
+            prefix = "\n".join(p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", []))
+            with server.lock:
+                server.caches[name] = prefix
+            return self._send(200, {"name": name, "model": body.get("model"), "expireTime": "2099-01-01T00:00:00Z"})
+
+        match = re.search(r"/models/([^/:]+):(generateContent|streamGenerateContent)$", path)
+        if not match:
+            return self._send(404, {"error": {"code": 404, "status": "NOT_FOUND", "message": path}})
+
+        with server.lock:
+            server.stats["requests"] += 1
+        time.sleep(server.latency())
+        if self._injected_error():
+            return
+        text, usage = respond(body, server.caches.get(body.get("cachedContent"), ""))
+
+        if match.group(2) == "generateContent":
+            return self._send(200, _candidate(text, usage))
+
+        # Server-sent events: the text in a few chunks, usage on the last one
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        step = max(1, len(text) // 4)
+        pieces = [text[i:i + step] for i in range(0, len(text), step)]
+        for i, piece in enumerate(pieces):
+            event = _candidate(piece, usage if i == len(pieces) - 1 else None)
+            self.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(server.stream_gap)
+        self.close_connection = True
+
+    def do_DELETE(self):
+        with self.server.lock:
+            self.server.caches.pop(self.path.split("/v1beta/")[-1].split("?")[0], None)
+        self._send(200, {})
+
+def make_server(port=8765, latency="lognormal:1.0,0.4", rate_429=0.0, rate_500=0.0, retry_delay=1, stream_gap=0.05):
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    server.latency = parse_latency(latency)
+    server.rate_429 = rate_429
+    server.rate_500 = rate_500
+    server.retry_delay = retry_delay
+    server.stream_gap = stream_gap
+    server.caches = {}
+    server.lock = threading.Lock()
+    server.stats = {"requests": 0, "injected": 0}
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a schema-aware mock of the Gemini generateContent API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="lognormal:1.0,0.4",
+                        help="fixed:<s>, uniform:<lo>,<hi> or lognormal:<median s>,<sigma> (default: lognormal:1.0,0.4)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Share of calls answered with 429 RESOURCE_EXHAUSTED")
+    parser.add_argument("--rate-500", type=float, default=0.0, help="Share of calls answered with 500 INTERNAL")
+    parser.add_argument("--retry-delay", type=float, default=1, help="retryDelay (seconds) advertised on 429s")
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.latency, args.rate_429, args.rate_500, args.retry_delay)
+    print(f"Mock Gemini listening on http://127.0.0.1:{args.port} "
+          f"(export GOOGLE_GEMINI_BASE_URL=http://127.0.0.1:{args.port})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"Served {server.stats['requests']} requests ({server.stats['injected']} injected errors).")
+
+if __name__ == "__main__":
+    main()
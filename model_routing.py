@@ -0,0 +1,74 @@
+import os
+import json
+from functools import lru_cache
+
+import requirement_memo
+
+# Which model each agent calls, in one place: models.json (or the file named by
+# MODEL_CONFIG) instead of model lines commented in and out of every agent.
+# The "cascade" block drives --cascade for Agents 1_2 and 2_1: the cheap model
+# judges every requirement, and only verdicts it is unsure about (weak or
+# moderate evidence, or a "No" on a Core requirement) are asked again of the
+# strong model, whose answers replace the cheap ones.
+CONFIG_PATH = os.environ.get("MODEL_CONFIG", "models.json")
+
+DEFAULTS = {
+    "default": "gemini-3-flash-preview",
+    "agents": {"agent2_1": "gemini-2.5-flash"},
+    "cascade": {
+        "cheap": "gemini-2.5-flash-lite",
+        "strong": "gemini-3-flash-preview",
+        "escalate_strengths": ["Moderate", "Weak"],
+        "escalate_core_no": True,
+    },
+}
+
+@lru_cache(maxsize=None)
+def load(path=CONFIG_PATH):
+    """DEFAULTS overlaid with the config file, when there is one."""
+    config = {**DEFAULTS, "agents": dict(DEFAULTS["agents"]), "cascade": dict(DEFAULTS["cascade"])}
+    try:
+        with open(path, "r") as f:
+            overrides = json.load(f)
+    except FileNotFoundError:
+        return config
+    config["default"] = overrides.get("default", config["default"])
+    config["agents"].update(overrides.get("agents", {}))
+    config["cascade"].update(overrides.get("cascade", {}))
+    return config
+
+def model_for(agent):
+    config = load()
+    return config["agents"].get(agent, config["default"])
+
+def cascade():
+    return load()["cascade"]
+
+def needs_escalation(requirement, evaluation, policy=None):
+    """Whether the cheap model's verdict on requirement should be re-asked of the strong model."""
+    policy = policy or cascade()
+    if evaluation is None:
+        return True
+    if evaluation.get("evidence_strength") in policy["escalate_strengths"]:
+        return True
+    return (policy["escalate_core_no"] and requirement.get("priority") == "Core"
+            and evaluation.get("answer") == "No")
+
+def escalations(requirements, cheap):
+    """Indexes of the requirements whose cheap verdict is missing or uncertain."""
+    policy = cascade()
+    aligned = requirement_memo.align(requirements, cheap)
+    return [i for i, (req, e) in enumerate(zip(requirements, aligned)) if needs_escalation(req, e, policy)]
+
+def merge(requirements, cheap, escalated, strong):
+    """One verdict per requirement in order: the strong model's for the escalated
+    indexes it answered, the cheap model's everywhere else."""
+    # Strong answers are aligned against the escalated subset only, so a rephrased
+    # answer cannot land on a requirement that was never re-asked
+    upgraded = dict(zip(escalated, requirement_memo.align([requirements[i] for i in escalated], strong)))
+    merged = []
+    for i, c in enumerate(requirement_memo.align(requirements, cheap)):
+        evaluation = upgraded.get(i) or c
+        if evaluation is not None:
+            merged.append(evaluation)
+    return merged
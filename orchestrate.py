@@ -0,0 +1,302 @@
+import sys
+import os
+import csv
+import time
+import asyncio
+import argparse
+import subprocess
+
+import agent0_1
+import agent0_2
+import agent0_3
+import agent1_1
+import agent1_2
+import agent1_3
+import agent2_1
+import context_cache
+import phase0
+import posting_dedup
+import rate_limit
+import resume_index
+from common import AgentError, get_client
+
+# What orchestrate.sh pays before each agent does any work: a fresh interpreter,
+# the genai/pydantic imports and a new client.
+STARTUP_PROBE = "from google import genai; import pydantic; genai.Client()"
+
+def find_dirs(root, filename):
+    """Return every directory under root that contains filename, sorted for a stable run order."""
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        if filename in filenames:
+            found.append(dirpath)
+    return sorted(found)
+
+def measure_startup():
+    """Time one cold agent start the way orchestrate.sh would launch it."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", STARTUP_PROBE], check=True, capture_output=True)
+    return time.perf_counter() - start
+
+def load_pairs(path):
+    """Read (posting, candidate) pairs from a CSV with posting and candidate columns."""
+    with open(path, "r", newline="") as f:
+        return {(os.path.normpath(row["posting"]), os.path.normpath(row["candidate"])) for row in csv.DictReader(f)}
+
+class Pipeline:
+    def __init__(self, product_profile=False, deep_alignment=False, shared_prefix=False,
+                 top_k=None, min_score=None, evidence_top_n=None, memoize=False, scores_only=False,
+                 stream=False, shard_size=None, cascade=False, fused_phase0=False, batch_tokens=None):
+        self.product_profile = product_profile
+        self.deep_alignment = deep_alignment
+        self.shared_prefix = shared_prefix
+        self.top_k = top_k
+        self.min_score = min_score
+        self.evidence_top_n = evidence_top_n
+        self.memoize = memoize
+        self.scores_only = scores_only
+        self.stream = stream
+        self.shard_size = shard_size
+        self.cascade = cascade
+        self.fused_phase0 = fused_phase0
+        self.batch_tokens = batch_tokens
+        self.index = None
+        self.shortlists = {}
+        self.allowed_pairs = None
+        self.invocations = 0
+        self.failures = 0
+
+    def call(self, agent, *args, **kwargs):
+        """Run one agent in-process. A failing agent is reported and the run carries on, like the shell loop."""
+        self.invocations += 1
+        try:
+            agent.run(*args, **kwargs)
+        except AgentError as e:
+            self.failures += 1
+            print(e)
+        except Exception as e:
+            self.failures += 1
+            print(f"Error: {agent.__name__} failed unexpectedly: {type(e).__name__}: {e}")
+
+    def phase0_batches(self, job_dirs):
+        """Postings grouped for fused Phase 0 calls: packed under batch_tokens, else one per call."""
+        if self.batch_tokens:
+            return phase0.pack(job_dirs, self.batch_tokens)
+        return [[j] for j in job_dirs]
+
+    def run_all(self, job_dirs, candidate_dirs):
+        if self.fused_phase0:
+            # Screening, summary, profile and requirements for every posting up front, in as few calls as possible
+            for batch in self.phase0_batches(job_dirs):
+                self.call(phase0, batch, product_profile=self.product_profile)
+        for job_dir in job_dirs:
+            self.run_posting(job_dir, candidate_dirs)
+
+    def run_posting(self, job_dir, candidate_dirs):
+        print("------------------------------------------------")
+        print(f"📂 Processing Job: {job_dir}")
+        print("------------------------------------------------")
+
+        if not self.fused_phase0:
+            # Phase 0: Screening
+            self.call(agent0_1, job_dir, stream=self.stream)
+            self.call(agent0_2, job_dir)
+            if self.product_profile:
+                self.call(agent0_3, job_dir)
+
+            # Phase 1: Requirement Extraction
+            self.call(agent1_1, job_dir, stream=self.stream)
+
+        for candidate_dir in candidate_dirs:
+            if self.shortlisted(job_dir, candidate_dir):
+                self.run_pair(job_dir, candidate_dir)
+
+    def run_pair(self, job_dir, candidate_dir):
+        candidate_name = os.path.basename(candidate_dir)
+        print(f"  🔍 Auditing Candidate: {candidate_name}")
+
+        # Phase 1: Audit & Executive Summary
+        self.call(agent1_2, job_dir, candidate_dir, shared_prefix=self.shared_prefix, memoize=self.memoize,
+                  stream=self.stream, shard_size=self.shard_size, cascade=self.cascade)
+        self.call(agent1_3, job_dir, candidate_dir, narrative=not self.scores_only)
+
+        # Phase 2: Deep Alignment (only for candidates with STAR experiences)
+        if self.wants_alignment(candidate_dir):
+            self.call(agent2_1, job_dir, candidate_dir, shared_prefix=self.shared_prefix,
+                      evidence_top_n=self.evidence_top_n, stream=self.stream, cascade=self.cascade)
+
+    def shortlisted(self, job_dir, candidate_dir):
+        """Whether the pair survives --pairs triage and BM25 pre-ranking (true when neither is used)."""
+        if self.allowed_pairs is not None:
+            if (os.path.normpath(job_dir), os.path.normpath(candidate_dir)) not in self.allowed_pairs:
+                return False
+        if self.index is None:
+            return True
+        if job_dir not in self.shortlists:
+            try:
+                ranked = resume_index.shortlist(self.index, job_dir, self.top_k, self.min_score)
+            except FileNotFoundError:
+                # No questions.json means Agent 1_1 failed; there is nothing to evaluate against
+                ranked = []
+            self.shortlists[job_dir] = {d for d, _ in ranked}
+            print(f"🎯 Shortlist for {job_dir}: {len(ranked)} of {len(self.index.docs)} candidates.")
+        return os.path.normpath(candidate_dir) in self.shortlists[job_dir]
+
+    def wants_alignment(self, candidate_dir):
+        return self.deep_alignment and os.path.exists(os.path.join(candidate_dir, "experiences.md"))
+
+    # --- ASYNC MODE ---
+    # Same stages as above, but model calls overlap. The semaphore caps how many
+    # calls are in flight; within a pair the stages still run strictly in order.
+
+    async def acall(self, agent, *args, **kwargs):
+        self.invocations += 1
+        async with self.semaphore:
+            try:
+                await agent.run_async(*args, **kwargs)
+            except AgentError as e:
+                self.failures += 1
+                print(e)
+            except Exception as e:
+                self.failures += 1
+                print(f"Error: {agent.__name__} failed unexpectedly: {type(e).__name__}: {e}")
+
+    async def screen_posting_async(self, job_dir):
+        # Agent 0_2 reads the report written by Agent 0_1
+        await self.acall(agent0_1, job_dir, stream=self.stream)
+        await self.acall(agent0_2, job_dir)
+        if self.product_profile:
+            await self.acall(agent0_3, job_dir)
+
+    async def run_pair_async(self, job_dir, candidate_dir, requirements):
+        # The pair can only start once its posting has a questions.json
+        await requirements
+        if not self.shortlisted(job_dir, candidate_dir):
+            return
+        await self.acall(agent1_2, job_dir, candidate_dir, shared_prefix=self.shared_prefix,
+                         memoize=self.memoize, stream=self.stream, shard_size=self.shard_size,
+                         cascade=self.cascade)
+        await self.acall(agent1_3, job_dir, candidate_dir, narrative=not self.scores_only)
+        if self.wants_alignment(candidate_dir):
+            await self.acall(agent2_1, job_dir, candidate_dir, shared_prefix=self.shared_prefix,
+                             evidence_top_n=self.evidence_top_n, stream=self.stream, cascade=self.cascade)
+
+    async def run_all_async(self, job_dirs, candidate_dirs, concurrency):
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+        if self.fused_phase0:
+            # Each batch's single call also produces its postings' requirements
+            screening, requirements = [], {}
+            for batch in self.phase0_batches(job_dirs):
+                intake = asyncio.ensure_future(self.acall(phase0, batch, product_profile=self.product_profile))
+                requirements.update((j, intake) for j in batch)
+        else:
+            screening = [asyncio.ensure_future(self.screen_posting_async(j)) for j in job_dirs]
+            requirements = {j: asyncio.ensure_future(self.acall(agent1_1, j, stream=self.stream)) for j in job_dirs}
+
+        # A fixed pool of workers drains the pairs lazily, so 300 x 2k pairs
+        # never sit in memory as 600k pending coroutines.
+        pairs = ((j, c) for j in job_dirs for c in candidate_dirs)
+
+        async def worker():
+            for job_dir, candidate_dir in pairs:
+                await self.run_pair_async(job_dir, candidate_dir, requirements[job_dir])
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        await asyncio.gather(*screening, *set(requirements.values()))
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the full pipeline in a single Python process.")
+    parser.add_argument("--postings", default="postings", help="Root directory searched for posting.txt")
+    parser.add_argument("--candidates", default="candidates", help="Root directory searched for resume.md")
+    parser.add_argument("--product-profile", action="store_true", help="Also run Agent 0_3 for each posting")
+    parser.add_argument("--deep-alignment", action="store_true", help="Also run Agent 2_1 where experiences.md exists")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Evaluate (posting, candidate) pairs concurrently on the async client")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Maximum model calls in flight in --async mode (default: 8)")
+    parser.add_argument("--shared-prefix", action="store_true",
+                        help="Cache each posting's prompt, requirements and text once; send only resumes per call")
+    parser.add_argument("--top-k", type=int, default=None,
+                        help="Only evaluate the K best BM25-ranked candidates per posting")
+    parser.add_argument("--min-score", type=float, default=None,
+                        help="Only evaluate candidates whose BM25 pre-rank score (0-1) reaches this value")
+    parser.add_argument("--scores-only", action="store_true",
+                        help="Agent 1_3 computes fit scores locally and skips the Markdown narrative call")
+    parser.add_argument("--memoize", action="store_true",
+                        help="Agent 1_2 reuses per-requirement verdicts across postings for the same resume")
+    parser.add_argument("--evidence-top-n", type=int, default=None,
+                        help="Agent 2_1 sends only the N most relevant STAR entries per requirement")
+    parser.add_argument("--shard-size", type=int, default=None,
+                        help="Agent 1_2 evaluates long requirement lists in parallel shards of this size")
+    parser.add_argument("--fused-phase0", action="store_true",
+                        help="One call per posting returns screening, summary, product profile and requirements")
+    parser.add_argument("--batch-tokens", type=int, default=None,
+                        help="With --fused-phase0, pack postings into shared calls of up to this many posting tokens")
+    parser.add_argument("--cascade", action="store_true",
+                        help="Agents 1_2 and 2_1 use the cheap model first and escalate only uncertain verdicts")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream list responses; items land in <output>.partial.jsonl as they arrive")
+    parser.add_argument("--pairs", default=None,
+                        help="CSV with posting,candidate columns (e.g. from coverage_matrix.py); only those pairs are evaluated")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Run near-duplicate postings once and copy the outputs to the other copies")
+    parser.add_argument("--dedup-threshold", type=float, default=posting_dedup.DEFAULT_THRESHOLD,
+                        help=f"MinHash similarity for --dedup (default: {posting_dedup.DEFAULT_THRESHOLD})")
+    parser.add_argument("--skip-startup-probe", action="store_true",
+                        help="Do not time a cold interpreter start for the savings report")
+    args = parser.parse_args()
+
+    # Ensure we have the necessary API Key
+    if not os.environ.get("GEMINI_API_KEY"):
+        print("❌ Error: GEMINI_API_KEY is not set.")
+        print("Please run: export GEMINI_API_KEY='your_api_key_here'")
+        sys.exit(1)
+
+    print("🚀 Starting Resume Intelligence Pipeline...")
+    start = time.perf_counter()
+
+    pipeline = Pipeline(product_profile=args.product_profile, deep_alignment=args.deep_alignment,
+                        shared_prefix=args.shared_prefix, top_k=args.top_k, min_score=args.min_score,
+                        evidence_top_n=args.evidence_top_n, memoize=args.memoize,
+                        scores_only=args.scores_only, stream=args.stream,
+                        shard_size=args.shard_size, cascade=args.cascade,
+                        fused_phase0=args.fused_phase0 or bool(args.batch_tokens), batch_tokens=args.batch_tokens)
+    candidate_dirs = find_dirs(args.candidates, "resume.md")
+    if args.top_k is not None or args.min_score is not None:
+        pipeline.index = resume_index.refresh(candidate_dirs)
+    if args.pairs:
+        pipeline.allowed_pairs = load_pairs(args.pairs)
+    job_dirs = find_dirs(args.postings, "posting.txt")
+    duplicates = {}
+    if args.dedup:
+        duplicates = posting_dedup.canonical_map(posting_dedup.refresh(job_dirs), args.dedup_threshold)
+        job_dirs = [j for j in job_dirs if os.path.normpath(j) not in duplicates]
+        if duplicates:
+            print(f"♻️  {len(duplicates)} near-duplicate postings will reuse their canonical posting's outputs.")
+    try:
+        if args.use_async:
+            asyncio.run(pipeline.run_all_async(job_dirs, candidate_dirs, args.concurrency))
+        else:
+            pipeline.run_all(job_dirs, candidate_dirs)
+    finally:
+        if args.shared_prefix:
+            context_cache.release_all(get_client())
+
+    for duplicate, canonical in sorted(duplicates.items()):
+        placed = posting_dedup.reuse(canonical, duplicate, candidate_dirs)
+        print(f"♻️  {duplicate}: reused {placed} files from {canonical}")
+
+    elapsed = time.perf_counter() - start
+    print("✅ Pipeline Complete.")
+    print(f"⏱️  {pipeline.invocations} agent runs ({pipeline.failures} failed) in {elapsed:.1f}s.")
+    context_cache.report()
+    rate_limit.report()
+
+    if not args.skip_startup_probe and pipeline.invocations:
+        startup = measure_startup()
+        print(f"   orchestrate.sh would have started {pipeline.invocations} interpreters at "
+              f"~{startup:.2f}s each: ~{startup * pipeline.invocations:.1f}s saved.")
+
+if __name__ == "__main__":
+    main()
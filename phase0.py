@@ -0,0 +1,176 @@
+import sys
+import os
+import json
+import argparse
+from functools import lru_cache
+from pydantic import Field, create_model
+
+import agent0_1
+import model_routing
+import rate_limit
+from agent0_1 import ScreeningResult
+from agent0_2 import ScreeningSummary
+from agent0_3 import ProductProfile
+from agent1_1 import BinaryRequirement
+from common import AgentError, ModelRequest, agenerate, generate, load_prompt, read_text
+
+# Fused Phase 0: one model call per posting instead of four. Agents 0_1, 0_2,
+# 0_3 and 1_1 all send the same posting.txt; here their briefs are combined under
+# one schema and the response is split back into screening_report.json,
+# screening_summary.md, product_profile.json and questions.json, exactly as the
+# separate agents would have written them. With a token budget, several short
+# postings are packed into one request; any posting the model leaves out of a
+# batch is retried on its own.
+MAX_BATCH_POSTINGS = 8   # output grows with every posting, so batches stay small even under a big budget
+
+@lru_cache(maxsize=None)
+def analysis_schema(product_profile=False, batched=False):
+    """Combined response schema; batched responses are a list tagged with posting_id."""
+    fields = {}
+    if batched:
+        fields["posting_id"] = (str, Field(description="The id from the posting's heading, e.g. P1."))
+    fields["screening"] = (list[ScreeningResult], ...)
+    fields["summary"] = (ScreeningSummary, ...)
+    if product_profile:
+        fields["product_profile"] = (ProductProfile, ...)
+    fields["requirements"] = (list[BinaryRequirement], ...)
+    model = create_model("PostingAnalysis", **fields)
+    return list[model] if batched else model
+
+def posting_block(posting_id, screening, product_profile):
+    """The per-posting part of the prompt; screening is agent0_1's prepared request."""
+    job_dir = screening.state["posting"]
+    posting_text = read_text(os.path.join(job_dir, "posting.txt"))
+    block = (
+        f"## POSTING {posting_id}\n\n"
+        f"### SCREENING ANSWERS ALREADY KNOWN (JSON):\n{json.dumps(screening.state['local'], indent=2)}\n\n"
+        f"### JOB POSTING:\n{posting_text}"
+    )
+    if product_profile:
+        context_path = os.path.join(job_dir, "product_info.txt")
+        context = read_text(context_path) if os.path.exists(context_path) else "No additional context provided."
+        block += f"\n\n### USER-PROVIDED PRODUCT CONTEXT:\n{context}"
+    return block
+
+def pack(job_dirs, budget_tokens):
+    """Group postings, in order, into batches whose posting text stays under budget_tokens.
+
+    A posting larger than the budget gets a batch of its own.
+    """
+    batches, current, used = [], [], 0
+    for job_dir in job_dirs:
+        tokens = rate_limit.estimate_tokens(read_text(os.path.join(job_dir, "posting.txt")))
+        if current and (used + tokens > budget_tokens or len(current) >= MAX_BATCH_POSTINGS):
+            batches.append(current)
+            current, used = [], 0
+        current.append(job_dir)
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def prepare(job_dirs, local_rules=True, product_profile=False):
+    job_dirs = [os.path.abspath(d) for d in job_dirs]
+    try:
+        # agent0_1 answers the mechanical screening questions locally, per posting
+        screenings = [agent0_1.prepare(d, local_rules) for d in job_dirs]
+        briefs = {name: load_prompt(f"{name}.txt") for name in
+                  ("phase0-fused-prompt", "job-screening-prompt", "product-profiler-prompt",
+                   "job-requirement-analyzer-prompt")}
+        master_questions = load_prompt("screening_questions_master.json")
+    except FileNotFoundError as e:
+        raise AgentError(f"Error: Required file not found: {e}")
+
+    ids = [f"P{i + 1}" for i in range(len(job_dirs))]
+    print(f"Phase 0: Fused intake of {len(job_dirs)} posting(s): {', '.join(job_dirs)}")
+
+    sections = [
+        briefs["phase0-fused-prompt"],
+        f"### SCREENING BRIEF:\n{briefs['job-screening-prompt']}",
+        f"### MASTER SCREENING QUESTIONS (JSON, shared by all postings):\n{master_questions}",
+    ]
+    if product_profile:
+        sections.append(f"### PRODUCT PROFILE BRIEF:\n{briefs['product-profiler-prompt']}\n"
+                        "Use ONLY the provided Job Posting and Product Context. If details are missing, "
+                        "state 'Not specified' rather than hallucinating.")
+    sections.append(f"### REQUIREMENTS BRIEF:\n{briefs['job-requirement-analyzer-prompt']}")
+    sections += [posting_block(i, s, product_profile) for i, s in zip(ids, screenings)]
+
+    return ModelRequest(
+        agent="phase0",
+        model=model_routing.model_for("phase0"),
+        contents="\n\n".join(sections),
+        schema=analysis_schema(product_profile, batched=len(job_dirs) > 1),
+        output_path=os.path.join(job_dirs[0], "phase0.json"),
+        state={"posting": job_dirs[0] if len(job_dirs) == 1 else None,
+               "postings": dict(zip(ids, screenings)), "product_profile": product_profile}
+    )
+
+def save(request, result):
+    """Write the four artifacts for every posting the response covers; return the job dirs it missed."""
+    postings = request.state["postings"]
+    if not isinstance(result, list):
+        result = [{**result, "posting_id": next(iter(postings))}]
+    answered = {}
+    for entry in result:
+        if entry.get("posting_id") in postings and entry["posting_id"] not in answered:
+            answered[entry["posting_id"]] = entry
+
+    for posting_id, entry in answered.items():
+        screening = postings[posting_id]
+        job_dir = screening.state["posting"]
+        agent0_1.save(screening, entry["screening"])
+        with open(os.path.join(job_dir, "screening_summary.md"), "w") as f:
+            f.write(entry["summary"]["markdown_content"])
+        if request.state["product_profile"]:
+            with open(os.path.join(job_dir, "product_profile.json"), "w") as f:
+                json.dump(entry["product_profile"], f, indent=4)
+        with open(os.path.join(job_dir, "questions.json"), "w") as f:
+            json.dump(entry["requirements"], f, indent=4)
+        print(f"Success! Phase 0 artifacts written for {job_dir} ({len(entry['requirements'])} requirements).")
+
+    missed = [s.state["posting"] for i, s in postings.items() if i not in answered]
+    for job_dir in missed:
+        print(f"Warning: the batch response had no entry for {job_dir}")
+    return missed
+
+def run(job_dirs, local_rules=True, product_profile=False):
+    request = prepare(job_dirs, local_rules, product_profile)
+    missed = save(request, generate(request))
+    if len(job_dirs) > 1:
+        for job_dir in missed:
+            run([job_dir], local_rules, product_profile)
+
+async def run_async(job_dirs, local_rules=True, product_profile=False):
+    request = prepare(job_dirs, local_rules, product_profile)
+    missed = save(request, await agenerate(request))
+    if len(job_dirs) > 1:
+        for job_dir in missed:
+            await run_async([job_dir], local_rules, product_profile)
+
+def main():
+    parser = argparse.ArgumentParser(description="Phase 0 in one call: screening, summary, product profile and requirements.")
+    parser.add_argument("posting_directories", nargs="+")
+    parser.add_argument("--product-profile", action="store_true", help="Also write product_profile.json")
+    parser.add_argument("--no-local-rules", action="store_true",
+                        help="Send every master screening question to the model")
+    parser.add_argument("--batch-tokens", type=int, default=None,
+                        help="Pack postings into shared requests of up to this many posting tokens")
+    args = parser.parse_args()
+
+    if args.batch_tokens:
+        batches = pack(args.posting_directories, args.batch_tokens)
+    else:
+        batches = [[d] for d in args.posting_directories]
+    failed = False
+    for batch in batches:
+        try:
+            run(batch, local_rules=not args.no_local_rules, product_profile=args.product_profile)
+        except AgentError as e:
+            print(e)
+            failed = True
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
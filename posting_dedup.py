@@ -0,0 +1,176 @@
+import os
+import re
+import json
+import random
+import shutil
+import hashlib
+import argparse
+
+import results_store
+from agent2_1 import alignment_path
+
+# Near-duplicate posting detection with MinHash + LSH.
+# The same job often arrives twice with cosmetic edits (another folder, a
+# reworded intro). Each posting.txt is reduced to a MinHash signature of its
+# word 5-shingles; LSH banding finds candidate pairs without comparing every
+# posting to every other, and pairs whose estimated Jaccard similarity reaches
+# the threshold are clustered. Every posting in a cluster reuses the Phase 0/1
+# artifacts and evaluations of its canonical posting: the one with the most
+# outputs already on disk, then the first in sorted order.
+INDEX_PATH = os.path.join(".index", "posting_minhash.json")
+DEFAULT_THRESHOLD = 0.85
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 32          # 32 bands x 4 rows: pairs at ~0.42 similarity become candidates half the time
+
+# Posting-level outputs that are copied from the canonical posting
+POSTING_ARTIFACTS = ["screening_report.json", "screening_summary.md", "product_profile.json", "questions.json"]
+# Per-candidate output directories under the posting
+PAIR_DIRS = ["evaluations", "summaries"]
+
+# One 64-bit mask per permutation; min(h ^ mask) over a well-mixed hash acts as an independent min-hash
+_MASKS = [random.Random(i).getrandbits(64) for i in range(NUM_PERM)]
+
+def shingles(text, k=SHINGLE_SIZE):
+    words = re.findall(r"[a-z0-9+#]+", text.lower())
+    if len(words) < k:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+def signature(text):
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+              for s in shingles(text)]
+    return [min(h ^ mask for h in hashes) for mask in _MASKS]
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity: the share of permutations whose minima agree."""
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / len(sig_a)
+
+def load_index(path=INDEX_PATH):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def save_index(index, path=INDEX_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, path)
+
+def refresh(job_dirs, path=INDEX_PATH):
+    """Signatures for job_dirs, recomputing only postings whose text changed."""
+    index = load_index(path)
+    wanted = {os.path.normpath(d) for d in job_dirs}
+    changed = [d for d in index if d not in wanted]
+    for d in changed:
+        del index[d]
+    for job_dir in sorted(wanted):
+        with open(os.path.join(job_dir, "posting.txt"), "r") as f:
+            text = f.read()
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if index.get(job_dir, {}).get("hash") != content_hash:
+            index[job_dir] = {"hash": content_hash, "signature": signature(text)}
+            changed.append(job_dir)
+    if changed:
+        save_index(index, path)
+    return index
+
+def canonical_map(index, threshold=DEFAULT_THRESHOLD):
+    """Map every duplicate posting to its cluster's canonical posting (canonicals are not keys)."""
+    rows = NUM_PERM // BANDS
+    buckets = {}
+    for job_dir, entry in index.items():
+        sig = entry["signature"]
+        for band in range(BANDS):
+            key = (band, *sig[band * rows:(band + 1) * rows])
+            buckets.setdefault(key, []).append(job_dir)
+
+    # Union-find over verified candidate pairs; the best-ranked posting is the root
+    rank = {d: (-sum(os.path.exists(os.path.join(d, name)) for name in POSTING_ARTIFACTS), d) for d in index}
+    parent = {d: d for d in index}
+
+    def find(d):
+        while parent[d] != d:
+            parent[d] = parent[parent[d]]
+            d = parent[d]
+        return d
+
+    checked = set()
+    for members in buckets.values():
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                pair = (min(a, b), max(a, b))
+                if pair in checked:
+                    continue
+                checked.add(pair)
+                if similarity(index[a]["signature"], index[b]["signature"]) >= threshold:
+                    root_a, root_b = find(a), find(b)
+                    if root_a != root_b:
+                        root_a, root_b = sorted((root_a, root_b), key=rank.get)
+                        parent[root_b] = root_a
+    return {d: find(d) for d in index if find(d) != d}
+
+def _place(source, target, link):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if os.path.lexists(target):
+        os.remove(target)
+    if link:
+        os.symlink(os.path.relpath(source, os.path.dirname(target)), target)
+    else:
+        shutil.copy2(source, target)
+
+def reuse(canonical, duplicate, candidate_dirs=(), link=False):
+    """Copy (or symlink) the canonical posting's outputs into duplicate. Returns the files placed."""
+    placed = 0
+    for name in POSTING_ARTIFACTS:
+        source = os.path.join(canonical, name)
+        if os.path.exists(source):
+            _place(source, os.path.join(duplicate, name), link)
+            placed += 1
+    for sub in PAIR_DIRS:
+        source_dir = os.path.join(canonical, sub)
+        if os.path.isdir(source_dir):
+            for name in sorted(os.listdir(source_dir)):
+                _place(os.path.join(source_dir, name), os.path.join(duplicate, sub, name), link)
+                placed += 1
+    # Role alignments live with the candidate and are named after the posting
+    for candidate_dir in candidate_dirs:
+        source = alignment_path(canonical, candidate_dir)[1]
+        if os.path.exists(source):
+            _place(source, alignment_path(duplicate, candidate_dir)[1], link)
+            placed += 1
+    if placed:
+        # The copies are the duplicate's results too; leaderboard and gap queries should see them
+        results_store.record_posting(duplicate, candidate_dirs)
+    return placed
+
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate postings and reuse their outputs.")
+    parser.add_argument("command", choices=["scan", "apply"],
+                        help="scan: list duplicates; apply: copy canonical outputs into each duplicate")
+    parser.add_argument("--postings", default="postings", help="Root directory searched for posting.txt")
+    parser.add_argument("--candidates", default="candidates", help="Root directory searched for resume.md")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Minimum estimated Jaccard similarity (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--link", action="store_true", help="Symlink instead of copying")
+    args = parser.parse_args()
+
+    # orchestrate imports this module, so it is imported here rather than at the top
+    from orchestrate import find_dirs
+    job_dirs = find_dirs(args.postings, "posting.txt")
+    index = refresh(job_dirs)
+    duplicates = canonical_map(index, args.threshold)
+    candidate_dirs = find_dirs(args.candidates, "resume.md")
+    for duplicate, canonical in sorted(duplicates.items()):
+        sim = similarity(index[duplicate]["signature"], index[canonical]["signature"])
+        line = f"{duplicate} ~ {canonical} ({sim:.2f})"
+        if args.command == "apply":
+            line += f": reused {reuse(canonical, duplicate, candidate_dirs, args.link)} files"
+        print(line)
+    print(f"{len(duplicates)} of {len(job_dirs)} postings are near-duplicates.")
+
+if __name__ == "__main__":
+    main()
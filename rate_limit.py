@@ -0,0 +1,193 @@
+import os
+import re
+import time
+import random
+import asyncio
+import threading
+
+import httpx
+from google.genai import errors
+
+# Process-wide scheduler for model calls.
+# Requests-per-minute and tokens-per-minute buckets pace calls to just under the
+# quota instead of bursting into 429s. Retryable failures (429, transient 5xx and
+# dropped or timed-out connections) back off exponentially with full jitter, and a
+# circuit breaker pauses every caller at once when the quota is exhausted, so a
+# single 429 neither kills a candidate's run nor triggers a thundering herd of retries.
+RPM = float(os.environ.get("GEMINI_RPM", "0"))           # 0 = unlimited
+TPM = float(os.environ.get("GEMINI_TPM", "0"))           # 0 = unlimited
+MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "5"))
+BACKOFF_BASE = 2.0      # seconds before the first retry (upper bound of the jitter)
+BACKOFF_CAP = 60.0
+BREAKER_THRESHOLD = 3   # consecutive retryable failures that open the breaker
+BREAKER_COOLDOWN = 30.0
+
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+
+_stats = {"calls": 0, "retries": 0, "throttled_s": 0.0, "breaker_trips": 0}
+
+def estimate_tokens(text):
+    """Rough pre-call token count (~4 characters per token) used to draw from the TPM bucket."""
+    return len(text) // 4 + 1
+
+class TokenBucket:
+    """Continuous-refill bucket. reserve() may drive the balance negative and returns the
+    wait that makes the reservation good, so callers queue up fairly in arrival order."""
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount):
+        with self.lock:
+            self._refill(time.monotonic())
+            # A single request larger than the whole bucket still gets through, one at a time
+            self.tokens -= min(amount, self.capacity)
+            return max(0.0, -self.tokens / self.rate)
+
+    def adjust(self, amount):
+        """Correct an earlier reservation once the real usage is known (positive = charge more)."""
+        with self.lock:
+            self.tokens -= amount
+
+class CircuitBreaker:
+    """Open after repeated failures (or at once on quota exhaustion); every caller waits it out."""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+        self.lock = threading.Lock()
+
+    def wait_time(self):
+        return max(0.0, self.open_until - time.monotonic())
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+
+    def failure(self, pause=None):
+        """Count a retryable failure. pause forces the breaker open for that many seconds."""
+        with self.lock:
+            self.failures += 1
+            if pause is None and self.failures >= self.threshold:
+                pause = self.cooldown
+            if pause and time.monotonic() + pause > self.open_until:
+                self.open_until = time.monotonic() + pause
+                _stats["breaker_trips"] += 1
+                print(f"⏸️  Circuit open: pausing model calls for {pause:.1f}s.")
+
+def retry_delay(e):
+    """Server-suggested delay from a google.rpc.RetryInfo detail ("retryDelay": "37s"), if any."""
+    match = re.search(r"retryDelay'?\"?\s*:\s*'?\"?(\d+(?:\.\d+)?)s", str(getattr(e, "details", "")))
+    return float(match.group(1)) if match else None
+
+def is_retryable(e):
+    if isinstance(e, errors.APIError):
+        return e.code in RETRYABLE_CODES
+    # genai talks to the API through httpx, whose transport errors are not ConnectionError/TimeoutError
+    return isinstance(e, (ConnectionError, TimeoutError, httpx.TransportError))
+
+def backoff(attempt):
+    """Full jitter: uniform in [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+class Scheduler:
+    def __init__(self, rpm=RPM, tpm=TPM, max_retries=MAX_RETRIES):
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.breaker = CircuitBreaker()
+        self.max_retries = max_retries
+
+    def _admit(self, estimate, trace):
+        """Seconds to wait before the call may go out."""
+        wait = self.breaker.wait_time()
+        if self.requests:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens:
+            wait = max(wait, self.tokens.reserve(estimate))
+        _stats["calls"] += 1
+        _stats["throttled_s"] += wait
+        if trace is not None:
+            trace.queue_wait_s += wait
+        return wait
+
+    def _settle(self, estimate, usage):
+        if self.tokens and usage is not None and usage.total_token_count:
+            self.tokens.adjust(usage.total_token_count - estimate)
+        self.breaker.success()
+
+    def _on_error(self, e, attempt, label, trace):
+        """Return the sleep before the next attempt, or re-raise when the error is final."""
+        if not is_retryable(e) or attempt >= self.max_retries:
+            raise e
+        suggested = retry_delay(e)
+        # RESOURCE_EXHAUSTED means the quota, not this one request: stop everybody
+        quota = getattr(e, "code", None) == 429
+        self.breaker.failure(pause=(suggested or self.breaker.cooldown) if quota else None)
+        delay = max(backoff(attempt), suggested or 0)
+        _stats["retries"] += 1
+        if trace is not None:
+            trace.retries += 1
+            trace.queue_wait_s += delay
+        print(f"{label}: retryable error ({e.__class__.__name__} "
+              f"{getattr(e, 'code', '')}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s.")
+        return delay
+
+    def run(self, call, estimate, label="Model call", trace=None):
+        """Run call() -> (result, usage) under the rate limits, retrying transient failures.
+
+        trace (a telemetry.Call) accumulates the time spent waiting and the retry count.
+        """
+        attempt = 0
+        while True:
+            time.sleep(self._admit(estimate, trace))
+            try:
+                result, usage = call()
+            except Exception as e:
+                time.sleep(self._on_error(e, attempt, label, trace))
+                attempt += 1
+                continue
+            self._settle(estimate, usage)
+            return result, usage
+
+    async def arun(self, call, estimate, label="Model call", trace=None):
+        """Async twin of run(); call is a coroutine function returning (result, usage)."""
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._admit(estimate, trace))
+            try:
+                result, usage = await call()
+            except Exception as e:
+                await asyncio.sleep(self._on_error(e, attempt, label, trace))
+                attempt += 1
+                continue
+            self._settle(estimate, usage)
+            return result, usage
+
+_scheduler = None
+
+def get_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler()
+    return _scheduler
+
+def share_quota(parts):
+    """Give this process 1/parts of GEMINI_RPM/TPM, for running alongside parts-1 sibling workers."""
+    global _scheduler
+    _scheduler = Scheduler(rpm=RPM / parts, tpm=TPM / parts)
+
+def report():
+    if not _stats["retries"] and not _stats["throttled_s"]:
+        return
+    print(f"🚦 Rate limiter: {_stats['calls']} attempts, {_stats['retries']} retries, "
+          f"{_stats['throttled_s']:.1f}s spent pacing, circuit opened {_stats['breaker_trips']} times.")
@@ -0,0 +1,119 @@
+import os
+import time
+import sqlite3
+import hashlib
+
+from resume_index import tokenize
+
+# (resume hash, requirement fingerprint) -> Evaluation verdict, shared across postings.
+# Postings that ask "5+ years Python" in slightly different words map to the same
+# fingerprint, so a candidate matched against many similar postings is only judged
+# once per distinct requirement. Verdicts are also keyed by a context hash of the
+# model and evaluator prompt, so changing either starts a fresh set.
+MEMO_PATH = os.path.join(".index", "requirement_memo.sqlite")
+
+VERDICT_FIELDS = ["answer", "evidence_strength", "justification"]
+
+_NUMBER_WORDS = {"one": "1", "two": "2", "three": "3", "four": "4", "five": "5", "six": "6",
+                 "seven": "7", "eight": "8", "nine": "9", "ten": "10"}
+
+def normalize(text):
+    """Order-insensitive bag of meaningful terms: 'Five+ years of Python' == 'python, 5+ yrs'."""
+    terms = []
+    for term in tokenize(text):
+        base = term.rstrip("+")
+        term = _NUMBER_WORDS.get(base, base) + ("+" if term.endswith("+") else "")
+        if term not in ("yrs", "experienced", "proficiency", "proficient", "familiarity", "familiar"):
+            terms.append(term)
+    return " ".join(sorted(set(terms)))
+
+def fingerprint(requirement):
+    """Fingerprint of what is being judged. The question carries the skill; the posting
+    snippet in 'requirement' is only used when there is no question."""
+    text = requirement.get("question") or requirement.get("requirement", "")
+    return hashlib.sha1(normalize(text).encode("utf-8")).hexdigest()
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _connect(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS verdicts (
+            resume_hash TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            context TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            evidence_strength TEXT NOT NULL,
+            justification TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (resume_hash, fingerprint, context)
+        )
+    """)
+    return conn
+
+def lookup(resume_text, requirements, context, path=MEMO_PATH):
+    """Split requirements into memoized verdicts and the ones the model still has to judge.
+
+    Returns (cached, missing): cached maps requirement index -> full Evaluation dict
+    (question/requirement/priority taken from this posting), missing lists the
+    requirement dicts with no verdict yet.
+    """
+    resume_hash = text_hash(resume_text)
+    prints = [fingerprint(r) for r in requirements]
+    conn = _connect(path)
+    try:
+        rows = conn.execute(
+            f"SELECT fingerprint, answer, evidence_strength, justification FROM verdicts "
+            f"WHERE resume_hash = ? AND context = ? AND fingerprint IN ({','.join('?' * len(prints))})",
+            [resume_hash, context, *prints]).fetchall() if prints else []
+    finally:
+        conn.close()
+    known = {fp: dict(zip(VERDICT_FIELDS, rest)) for fp, *rest in rows}
+
+    cached, missing = {}, []
+    for i, (req, fp) in enumerate(zip(requirements, prints)):
+        if fp in known:
+            cached[i] = {"question": req["question"], "requirement": req["requirement"],
+                         "priority": req["priority"], **known[fp]}
+        else:
+            missing.append(req)
+    return cached, missing
+
+def store(resume_text, evaluations, context, path=MEMO_PATH):
+    resume_hash = text_hash(resume_text)
+    now = time.time()
+    conn = _connect(path)
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(resume_hash, fingerprint(e), context, e["answer"], e["evidence_strength"], e["justification"], now)
+                 for e in evaluations])
+    finally:
+        conn.close()
+
+def align(requirements, evaluations):
+    """Match model evaluations back to requirements.
+
+    Exact question text wins, then the normalized fingerprint. Returns a list parallel
+    to requirements with None where no answer matched; duplicate answers and answers
+    that match no requirement are dropped rather than guessed onto an open slot, so
+    they are re-asked or reported as missing instead of being stored against the
+    wrong requirement.
+    """
+    aligned = [None] * len(requirements)
+    by_question = {}
+    by_print = {}
+    for i, req in enumerate(requirements):
+        by_question.setdefault(req["question"], []).append(i)
+        by_print.setdefault(fingerprint(req), []).append(i)
+
+    for e in evaluations:
+        slots = [i for i in by_question.get(e.get("question"), []) if aligned[i] is None]
+        if not slots:
+            slots = [i for i in by_print.get(fingerprint(e), []) if aligned[i] is None]
+        if slots:
+            aligned[slots[0]] = e
+    return aligned
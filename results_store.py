@@ -0,0 +1,261 @@
+import sys
+import os
+import json
+import time
+import sqlite3
+import argparse
+
+import scoring
+
+# Indexed SQLite copy of every agent result, written by the agents alongside their
+# files. Leaderboards and requirement-gap reports become single index lookups
+# instead of walks over thousands of evaluations/, summaries/ and role_alignments/
+# files. `ingest` backfills the store from files written before it existed.
+STORE_PATH = os.environ.get("RESULTS_DB", os.path.join(".index", "results.sqlite"))
+ENABLED = os.environ.get("RESULTS_STORE", "on").lower() not in ("off", "0", "false")
+
+EVALUATION_FIELDS = ["question", "requirement", "priority", "answer", "evidence_strength", "justification"]
+SCORE_FIELDS = ["fit_percentage", "recommendation", "core_met", "core_total", "preferred_met", "preferred_total"]
+SCREENING_FIELDS = ["question", "answer", "evidence", "risk_level"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    posting TEXT NOT NULL,
+    candidate TEXT NOT NULL,
+    source TEXT NOT NULL,            -- 'evaluation' (Agent 1_2) or 'alignment' (Agent 2_1)
+    position INTEGER NOT NULL,
+    question TEXT, requirement TEXT, priority TEXT, answer TEXT, evidence_strength TEXT, justification TEXT,
+    PRIMARY KEY (posting, candidate, source, position)
+);
+CREATE INDEX IF NOT EXISTS evaluations_candidate_gaps ON evaluations (candidate, source, priority, answer);
+CREATE INDEX IF NOT EXISTS evaluations_posting_gaps ON evaluations (posting, source, priority, answer);
+
+CREATE TABLE IF NOT EXISTS scores (
+    posting TEXT NOT NULL,
+    candidate TEXT NOT NULL,
+    fit_percentage REAL, recommendation TEXT,
+    core_met INTEGER, core_total INTEGER, preferred_met INTEGER, preferred_total INTEGER,
+    updated_at REAL,
+    PRIMARY KEY (posting, candidate)
+);
+CREATE INDEX IF NOT EXISTS scores_leaderboard ON scores (posting, fit_percentage DESC);
+CREATE INDEX IF NOT EXISTS scores_candidate ON scores (candidate, fit_percentage DESC);
+
+CREATE TABLE IF NOT EXISTS summaries (
+    posting TEXT NOT NULL,
+    candidate TEXT NOT NULL,
+    markdown TEXT,
+    PRIMARY KEY (posting, candidate)
+);
+
+CREATE TABLE IF NOT EXISTS screening (
+    posting TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    question TEXT, answer TEXT, evidence TEXT, risk_level TEXT,
+    PRIMARY KEY (posting, position)
+);
+"""
+
+def posting_key(posting_directory):
+    """Postings are identified by their path relative to the working directory."""
+    return os.path.relpath(os.path.abspath(posting_directory))
+
+def candidate_key(candidate_directory):
+    """Candidates by folder name, the same name the per-candidate output files use."""
+    return os.path.basename(os.path.normpath(os.path.abspath(candidate_directory)))
+
+def connect(path=STORE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def _apply(conn, statements):
+    """Run [(sql, params)] pairs; a list of params means executemany."""
+    for sql, params in statements:
+        if isinstance(params, list):
+            conn.executemany(sql, params)
+        else:
+            conn.execute(sql, params)
+
+def _write(statements):
+    """Apply statements in one transaction; a no-op when the store is switched off."""
+    if not ENABLED:
+        return
+    conn = connect()
+    try:
+        with conn:
+            _apply(conn, statements)
+    finally:
+        conn.close()
+
+def _evaluation_statements(posting, candidate, evaluations, source):
+    rows = [(posting, candidate, source, i, *(e.get(f) for f in EVALUATION_FIELDS)) for i, e in enumerate(evaluations)]
+    return [("DELETE FROM evaluations WHERE posting = ? AND candidate = ? AND source = ?", (posting, candidate, source)),
+            ("INSERT INTO evaluations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)]
+
+def _score_statement(posting, candidate, scores):
+    return ("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (posting, candidate, *(scores[f] for f in SCORE_FIELDS), time.time()))
+
+def _screening_statements(posting, results):
+    rows = [(posting, i, *(r.get(f) for f in SCREENING_FIELDS)) for i, r in enumerate(results)]
+    return [("DELETE FROM screening WHERE posting = ?", (posting,)),
+            ("INSERT INTO screening VALUES (?, ?, ?, ?, ?, ?)", rows)]
+
+def record_evaluations(posting_directory, candidate_directory, evaluations, source="evaluation"):
+    _write(_evaluation_statements(posting_key(posting_directory), candidate_key(candidate_directory),
+                                  evaluations, source))
+
+def record_score(posting_directory, candidate_directory, scores, markdown=None):
+    posting, candidate = posting_key(posting_directory), candidate_key(candidate_directory)
+    statements = [_score_statement(posting, candidate, scores)]
+    if markdown is not None:
+        statements.append(("INSERT OR REPLACE INTO summaries VALUES (?, ?, ?)", (posting, candidate, markdown)))
+    _write(statements)
+
+def record_screening(posting_directory, results):
+    _write(_screening_statements(posting_key(posting_directory), results))
+
+def _read_json(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def _posting_statements(job_dir, candidate_dirs):
+    """(statements, evaluation count) loading one posting's result files as they are on disk."""
+    # Imported here: the agents import this module to record their results
+    from agent2_1 import alignment_path
+
+    posting = posting_key(job_dir)
+    statements, count = [], 0
+    screening = _read_json(os.path.join(job_dir, "screening_report.json"))
+    if screening is not None:
+        statements += _screening_statements(posting, screening)
+
+    eval_dir = os.path.join(job_dir, "evaluations")
+    summary_dir = os.path.join(job_dir, "summaries")
+    names = [n[:-len("_evaluation.json")] for n in sorted(os.listdir(eval_dir))
+             if n.endswith("_evaluation.json")] if os.path.isdir(eval_dir) else []
+    for candidate in names:
+        evaluations = _read_json(os.path.join(eval_dir, f"{candidate}_evaluation.json"))
+        if evaluations is None:
+            continue
+        statements += _evaluation_statements(posting, candidate, evaluations, "evaluation")
+        # Files written before Agent 1_3 kept _score.json are scored here
+        scores = _read_json(os.path.join(summary_dir, f"{candidate}_score.json")) or scoring.score(evaluations)
+        statements.append(_score_statement(posting, candidate, scores))
+        try:
+            with open(os.path.join(summary_dir, f"{candidate}_summary.md"), "r") as f:
+                statements.append(("INSERT OR REPLACE INTO summaries VALUES (?, ?, ?)",
+                                   (posting, candidate, f.read())))
+        except FileNotFoundError:
+            pass
+        count += len(evaluations)
+
+    for candidate_dir in candidate_dirs:
+        alignment = _read_json(alignment_path(job_dir, candidate_dir)[1])
+        if alignment is not None:
+            statements += _evaluation_statements(posting, candidate_key(candidate_dir), alignment, "alignment")
+            count += len(alignment)
+    return statements, count
+
+def record_posting(posting_directory, candidate_dirs=()):
+    """Load one posting's result files, e.g. outputs posting_dedup.py copied in from its canonical posting."""
+    _write(_posting_statements(posting_directory, candidate_dirs)[0])
+
+def ingest(conn, postings_root, candidates_root):
+    """Load every result file already on disk. Returns the number of evaluations stored."""
+    from orchestrate import find_dirs
+
+    candidate_dirs = find_dirs(candidates_root, "resume.md")
+    count = 0
+    with conn:
+        for job_dir in find_dirs(postings_root, "posting.txt"):
+            statements, stored = _posting_statements(job_dir, candidate_dirs)
+            _apply(conn, statements)
+            count += stored
+    return count
+
+def leaderboard(conn, posting, top=20):
+    return conn.execute(
+        f"SELECT candidate, {', '.join(SCORE_FIELDS)} FROM scores WHERE posting = ? "
+        "ORDER BY fit_percentage DESC, candidate LIMIT ?", (posting, top)).fetchall()
+
+def candidate_gaps(conn, candidate, priority="Core", source="evaluation"):
+    """Every (posting, question) where the candidate was judged "No" at the given priority."""
+    return conn.execute(
+        "SELECT posting, question, evidence_strength, justification FROM evaluations "
+        "WHERE candidate = ? AND source = ? AND priority = ? AND answer = 'No' ORDER BY posting, position",
+        (candidate, source, priority)).fetchall()
+
+def posting_gaps(conn, posting, priority="Core", source="evaluation"):
+    """Per requirement: how many evaluated candidates miss it, most-missed first."""
+    return conn.execute(
+        "SELECT question, SUM(answer = 'No') AS missing, COUNT(*) AS total FROM evaluations "
+        "WHERE posting = ? AND source = ? AND priority = ? GROUP BY question ORDER BY missing DESC, question",
+        (posting, source, priority)).fetchall()
+
+def export(conn, directory):
+    """Write each table to <directory>/<table>.parquet (needs pyarrow)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Error: the columnar export needs pyarrow (pip install pyarrow).")
+    os.makedirs(directory, exist_ok=True)
+    for table in ("evaluations", "scores", "summaries", "screening"):
+        cursor = conn.execute(f"SELECT * FROM {table}")
+        columns = [d[0] for d in cursor.description]
+        rows = cursor.fetchall()
+        pq.write_table(pa.table({c: [r[i] for r in rows] for i, c in enumerate(columns)}),
+                       os.path.join(directory, f"{table}.parquet"))
+        print(f"{table}: {len(rows)} rows -> {os.path.join(directory, table)}.parquet")
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the consolidated results store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("ingest", help="Backfill the store from result files on disk")
+    p.add_argument("--postings", default="postings")
+    p.add_argument("--candidates", default="candidates")
+    p = sub.add_parser("leaderboard", help="Best-scoring candidates for a posting")
+    p.add_argument("posting_directory")
+    p.add_argument("--top", type=int, default=20)
+    p = sub.add_parser("gaps", help="Requirement gaps for a candidate (or, with --posting, across a posting)")
+    p.add_argument("target", help="Candidate folder name, or a posting directory with --posting")
+    p.add_argument("--posting", action="store_true", help="Report how many candidates miss each requirement")
+    p.add_argument("--priority", choices=["Core", "Preferred"], default="Core")
+    p.add_argument("--alignment", action="store_true", help="Use Agent 2_1 role alignments instead of Agent 1_2")
+    p = sub.add_parser("export", help="Columnar (Parquet) export of every table")
+    p.add_argument("directory")
+    args = parser.parse_args()
+
+    conn = connect()
+    start = time.perf_counter()
+    if args.command == "ingest":
+        count = ingest(conn, args.postings, args.candidates)
+        print(f"Stored {count} evaluations in {STORE_PATH}.")
+    elif args.command == "leaderboard":
+        rows = leaderboard(conn, posting_key(args.posting_directory), args.top)
+        for rank, (candidate, fit, recommendation, core_met, core_total, *_rest) in enumerate(rows, start=1):
+            print(f"{rank:3}. {fit:6.1f}%  {recommendation:<13}  Core {core_met}/{core_total}  {candidate}")
+        if not rows:
+            print(f"No scores stored for {posting_key(args.posting_directory)}.")
+    elif args.command == "gaps":
+        source = "alignment" if args.alignment else "evaluation"
+        if args.posting:
+            for question, missing, total in posting_gaps(conn, posting_key(args.target), args.priority, source):
+                print(f"{missing:5}/{total:<5} {question}")
+        else:
+            for posting, question, strength, justification in candidate_gaps(conn, args.target, args.priority, source):
+                print(f"{posting}: {question}\n    {justification}")
+    else:
+        export(conn, args.directory)
+    conn.close()
+    print(f"({(time.perf_counter() - start) * 1000:.0f} ms)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import os
+import re
+import json
+import math
+import hashlib
+import argparse
+
+# BM25 inverted index over every candidate's resume.md (+ experiences.md).
+# It is refreshed incrementally (only documents whose content hash changed are
+# re-tokenized) and persisted to disk, then queried with a posting's requirement
+# strings to pre-rank candidates before any of them is sent to the LLM evaluator.
+INDEX_PATH = os.path.join(".index", "resume_index.json")
+CANDIDATE_FILES = ["resume.md", "experiences.md"]
+
+# Requirements weigh in by priority when a posting's per-requirement scores are combined
+PRIORITY_WEIGHTS = {"Core": 2.0, "Preferred": 1.0}
+
+STOPWORDS = set("""
+a an and are as at be by can candidate do does experience for from has have having in is it its
+of on or our the their this to using we will with you your years year plus strong ability knowledge
+""".split())
+
+def tokenize(text):
+    """Lowercased terms, keeping tech tokens like c++, c#, node.js intact."""
+    terms = re.findall(r"[a-z0-9][a-z0-9+#.]*", text.lower())
+    return [t.rstrip(".") for t in terms if t.rstrip(".") not in STOPWORDS]
+
+class BM25Index:
+    """Minimal Okapi BM25 over an inverted index (term -> {doc_id: tf})."""
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}
+        self.docs = {}      # doc_id -> {"hash": ..., "length": ..., "terms": [...]}
+
+    def add(self, doc_id, text, content_hash=None):
+        self.remove(doc_id)
+        tokens = tokenize(text)
+        counts = {}
+        for t in tokens:
+            counts[t] = counts.get(t, 0) + 1
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        self.docs[doc_id] = {"hash": content_hash, "length": len(tokens), "terms": sorted(counts)}
+
+    def remove(self, doc_id):
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return
+        for term in doc["terms"]:
+            docs = self.postings.get(term, {})
+            docs.pop(doc_id, None)
+            if not docs:
+                self.postings.pop(term, None)
+
+    def score(self, query):
+        """BM25 score of every document matching at least one query term."""
+        n = len(self.docs)
+        if not n:
+            return {}
+        avg_len = sum(d["length"] for d in self.docs.values()) / n
+        scores = {}
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                norm = tf + self.k1 * (1 - self.b + self.b * self.docs[doc_id]["length"] / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+        return scores
+
+    def to_dict(self):
+        return {"k1": self.k1, "b": self.b, "docs": self.docs, "postings": self.postings}
+
+    @classmethod
+    def from_dict(cls, data):
+        index = cls(data.get("k1", 1.5), data.get("b", 0.75))
+        index.docs = data["docs"]
+        index.postings = data["postings"]
+        return index
+
+def candidate_text(candidate_dir):
+    parts = []
+    for name in CANDIDATE_FILES:
+        path = os.path.join(candidate_dir, name)
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                parts.append(f.read())
+    return "\n\n".join(parts)
+
+def load_index(path=INDEX_PATH):
+    try:
+        with open(path, "r") as f:
+            return BM25Index.from_dict(json.load(f))
+    except FileNotFoundError:
+        return BM25Index()
+
+def save_index(index, path=INDEX_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index.to_dict(), f)
+    os.replace(tmp_path, path)
+
+def refresh(candidate_dirs, path=INDEX_PATH):
+    """Bring the persisted index in line with candidate_dirs, re-reading only changed documents."""
+    index = load_index(path)
+    wanted = {os.path.normpath(d) for d in candidate_dirs}
+    changed = 0
+    for doc_id in list(index.docs):
+        if doc_id not in wanted:
+            index.remove(doc_id)
+            changed += 1
+    for doc_id in sorted(wanted):
+        text = candidate_text(doc_id)
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if index.docs.get(doc_id, {}).get("hash") != content_hash:
+            index.add(doc_id, text, content_hash)
+            changed += 1
+    if changed:
+        save_index(index, path)
+    return index
+
+def load_requirements(posting_dir):
+    with open(os.path.join(posting_dir, "questions.json"), "r") as f:
+        return json.load(f)
+
+def rank(index, requirements):
+    """Score every candidate against a posting's requirements.
+
+    Each requirement's BM25 scores are scaled to [0, 1] by the best candidate for
+    that requirement, then averaged with priority weights, so one keyword-heavy
+    requirement cannot drown out the rest. Returns [(candidate_dir, score)] best first.
+    """
+    totals = {doc_id: 0.0 for doc_id in index.docs}
+    weight_sum = 0.0
+    for req in requirements:
+        weight = PRIORITY_WEIGHTS.get(req.get("priority"), 1.0)
+        weight_sum += weight
+        scores = index.score(f"{req.get('requirement', '')} {req.get('question', '')}")
+        best = max(scores.values(), default=0.0)
+        if best <= 0:
+            continue
+        for doc_id, s in scores.items():
+            totals[doc_id] += weight * s / best
+    if weight_sum:
+        totals = {d: s / weight_sum for d, s in totals.items()}
+    return sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+
+def shortlist(index, posting_dir, top_k=None, min_score=None):
+    """Candidates worth an LLM evaluation for this posting, best first."""
+    ranked = rank(index, load_requirements(posting_dir))
+    if min_score is not None:
+        ranked = [(d, s) for d, s in ranked if s >= min_score]
+    if top_k is not None:
+        ranked = ranked[:top_k]
+    return ranked
+
+def main():
+    from orchestrate import find_dirs
+
+    parser = argparse.ArgumentParser(description="Build or query the BM25 candidate index.")
+    parser.add_argument("command", choices=["build", "query"])
+    parser.add_argument("posting_directory", nargs="?", help="Posting with a questions.json (query only)")
+    parser.add_argument("--candidates", default="candidates", help="Root directory searched for resume.md")
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--min-score", type=float, default=None)
+    args = parser.parse_args()
+
+    index = refresh(find_dirs(args.candidates, "resume.md"))
+    if args.command == "build":
+        print(f"Indexed {len(index.docs)} candidates, {len(index.postings)} terms -> {INDEX_PATH}")
+        return
+
+    if not args.posting_directory:
+        parser.error("query needs a posting_directory")
+    for candidate_dir, score in shortlist(index, args.posting_directory, args.top_k, args.min_score):
+        print(f"{score:6.3f}  {candidate_dir}")
+
+if __name__ == "__main__":
+    main()
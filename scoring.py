@@ -0,0 +1,95 @@
+import os
+import json
+import argparse
+
+# Deterministic fit scoring from an evaluations/<candidate>_evaluation.json file.
+# Default points follow the "Scoring Logic" table the executive summary prompt used
+# before scoring moved here; a requirement only earns points when its answer is "Yes".
+DEFAULT_WEIGHTS = {
+    "points": {
+        "Core": {"Strong": 10, "Moderate": 7, "Weak": 0, "None": 0},
+        "Preferred": {"Strong": 5, "Moderate": 3.5, "Weak": 0, "None": 0},
+    },
+    # Minimum fit_percentage for each recommendation, checked in order
+    "thresholds": {"Strong Fit": 75, "Potential Fit": 50},
+    # A candidate missing any Core requirement is capped at "Potential Fit"
+    "strong_fit_requires_all_core": True,
+}
+
+def load_weights(path=None):
+    """DEFAULT_WEIGHTS, overlaid with a JSON file of the same shape when given."""
+    weights = json.loads(json.dumps(DEFAULT_WEIGHTS))
+    if path:
+        with open(path, "r") as f:
+            overrides = json.load(f)
+        for key, value in overrides.items():
+            if isinstance(value, dict) and isinstance(weights.get(key), dict):
+                for sub_key, sub_value in value.items():
+                    if isinstance(sub_value, dict) and isinstance(weights[key].get(sub_key), dict):
+                        weights[key][sub_key].update(sub_value)
+                    else:
+                        weights[key][sub_key] = sub_value
+            else:
+                weights[key] = value
+    return weights
+
+def score(evaluations, weights=DEFAULT_WEIGHTS):
+    """Return fit_percentage, recommendation and the Core/Preferred tallies behind them."""
+    points = weights["points"]
+    earned = possible = 0.0
+    tally = {"core_met": 0, "core_total": 0, "preferred_met": 0, "preferred_total": 0}
+    for e in evaluations:
+        table = points.get(e["priority"], points["Preferred"])
+        possible += max(table.values())
+        met = e["answer"] == "Yes"
+        if met:
+            earned += table.get(e["evidence_strength"], 0)
+        prefix = "core" if e["priority"] == "Core" else "preferred"
+        tally[f"{prefix}_total"] += 1
+        tally[f"{prefix}_met"] += int(met)
+
+    fit = round(100 * earned / possible, 1) if possible else 0.0
+    recommendation = "Not a Match"
+    for label in ("Strong Fit", "Potential Fit"):
+        if fit >= weights["thresholds"][label]:
+            recommendation = label
+            break
+    core_gaps = tally["core_total"] - tally["core_met"]
+    if recommendation == "Strong Fit" and core_gaps and weights.get("strong_fit_requires_all_core"):
+        recommendation = "Potential Fit"
+    return {"fit_percentage": fit, "recommendation": recommendation, **tally}
+
+def score_file(evaluation_path, weights=DEFAULT_WEIGHTS):
+    with open(evaluation_path, "r") as f:
+        return score(json.load(f), weights)
+
+def score_posting(posting_dir, weights=DEFAULT_WEIGHTS):
+    """Score every evaluation of a posting in one pass, best first."""
+    eval_dir = os.path.join(posting_dir, "evaluations")
+    results = []
+    if os.path.isdir(eval_dir):
+        for name in sorted(os.listdir(eval_dir)):
+            if name.endswith("_evaluation.json"):
+                candidate = name[:-len("_evaluation.json")]
+                results.append({"candidate": candidate, **score_file(os.path.join(eval_dir, name), weights)})
+    results.sort(key=lambda r: (-r["fit_percentage"], r["candidate"]))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Score every evaluation for a posting without calling the model.")
+    parser.add_argument("posting_directory", help="Directory containing evaluations/")
+    parser.add_argument("--weights", default=None, help="JSON file overriding DEFAULT_WEIGHTS")
+    args = parser.parse_args()
+
+    results = score_posting(args.posting_directory, load_weights(args.weights))
+    output_path = os.path.join(args.posting_directory, "scores.json")
+    with open(output_path, "w") as f:
+        json.dump(results, f, indent=4)
+
+    for r in results:
+        print(f"{r['fit_percentage']:6.1f}%  {r['recommendation']:<13}  "
+              f"Core {r['core_met']}/{r['core_total']}  {r['candidate']}")
+    print(f"Scores for {len(results)} candidates written to: {output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import re
+from datetime import datetime
+
+# Local evaluators for master screening questions that need no model.
+# Each rule is registered against the exact question text from
+# prompts/screening_questions_master.json and returns (answer, evidence),
+# or None when the posting is ambiguous and the model should decide.
+_RULES = {}
+
+SHORT_POSTING_WORDS = 150
+DEADLINE_WINDOW_DAYS = 7
+SALARY_SPREAD_LIMIT = 0.5
+PAY_CONTEXT_CHARS = 60
+
+def rule(question):
+    """Register fn as the local evaluator for a master question."""
+    def register(fn):
+        _RULES[question] = fn
+        return fn
+    return register
+
+def evaluate(master_questions, posting_text):
+    """Answer what the rules can.
+
+    Returns (results, remaining): ScreeningResult-shaped dicts for the questions
+    answered locally, and the master entries that still need the model.
+    """
+    results, remaining = [], []
+    for entry in master_questions:
+        fn = _RULES.get(entry["question"])
+        verdict = fn(posting_text) if fn else None
+        if verdict is None:
+            remaining.append(entry)
+            continue
+        answer, evidence = verdict
+        results.append({
+            "category": entry["category"],
+            "question": entry["question"],
+            "answer": answer,
+            "evidence": evidence,
+            "risk_level": entry["risk_level"],
+        })
+    return results, remaining
+
+# --- HELPERS ---
+
+def _line_with(text, match):
+    """The full line around a regex match, trimmed for use as evidence."""
+    start = text.rfind("\n", 0, match.start()) + 1
+    end = text.find("\n", match.end())
+    line = text[start:end if end != -1 else len(text)].strip()
+    return line if len(line) <= 200 else line[:197] + "..."
+
+_DATE_FORMATS = ["%Y-%m-%d", "%m/%d/%Y", "%B %d, %Y", "%b %d, %Y", "%B %d %Y", "%b %d %Y", "%d %B %Y", "%d %b %Y"]
+_DATE = r"(\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{4}|[A-Z][a-z]{2,8}\.? \d{1,2},? \d{4}|\d{1,2} [A-Z][a-z]{2,8} \d{4})"
+
+def _parse_date(value):
+    value = value.replace(".", "")
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+_AMOUNT = r"(?:\$|USD\s?|£|€)\s?(\d[\d,]*(?:\.\d+)?)\s?([kK])?"
+# A figure or range, with or without a currency sign: "$120k", "90k-120k", "95,000 to 130,000"
+_FIGURE = re.compile(
+    r"(?<![\w.,])(?P<currency>(?:\$|USD\s?|£|€)\s?)?(?P<low>\d[\d,]*(?:\.\d+)?)\s?(?P<low_k>[kK]\b)?"
+    r"(?:\s*(?:-|–|—|to)\s*(?:\$|USD\s?|£|€)?\s?(?P<high>\d[\d,]*(?:\.\d+)?)\s?(?P<high_k>[kK]\b)?)?")
+_PAY_WORDS = re.compile(r"salary|compensation|\bpay\b|\bwages?\b|\bbase\b|\bOTE\b|per (?:year|annum|hour|hr)|"
+                        r"/\s?(?:yr|year|hr|hour|annum)\b|\ban? (?:year|hour)\b|annually|hourly", re.IGNORECASE)
+_SALARY_MENTION = re.compile(r"salary|compensation|\bpay\b|\bwages?\b|\bOTE\b", re.IGNORECASE)
+_FINANCE_WORDS = re.compile(r"fund|raised|revenue|valuation|invest|series [a-f]\b|budget|price|cost", re.IGNORECASE)
+_MAGNITUDE = re.compile(r"\s?(?:[mb]n?\b|million|billion)", re.IGNORECASE)
+_RATE = re.compile(r"\s*(?:/\s?|per |an? )(?:hr|hour)\b", re.IGNORECASE)
+
+def _amount(number, thousands):
+    value = float(number.replace(",", ""))
+    return value * 1000 if thousands else value
+
+def _plausible_bare(text, match, high):
+    """Whether a figure without a currency sign looks like pay rather than years, counts or a 401k."""
+    if match["low"] in ("401", "403") and match["high"] is None:
+        return False
+    if match["low_k"] or match["high_k"] or _RATE.match(text, match.end()):
+        return True
+    grouped = re.fullmatch(r"\d{1,3}(?:,\d{3})+", (match["high"] or match["low"]))
+    return bool(grouped) or high is not None and high >= 10000
+
+def _pay_figures(text):
+    """(match, low, high) for every figure in text that reads as pay; high is None for a single figure.
+
+    Currency figures count with pay words near them, or as a range not about money raised;
+    bare figures only with pay words near them. Amounts in millions or billions never count."""
+    for match in _FIGURE.finditer(text):
+        if _MAGNITUDE.match(text, match.end()):
+            continue    # "$50M in funding", "$20-30 million"
+        # "$120-150k" puts the k only on the upper bound
+        high_k = bool(match["high_k"])
+        low = _amount(match["low"], match["low_k"] or (high_k and _amount(match["low"], False) < 1000))
+        high = _amount(match["high"], high_k) if match["high"] else None
+        window = text[max(0, match.start() - PAY_CONTEXT_CHARS):match.end() + PAY_CONTEXT_CHARS]
+        near_pay = bool(_PAY_WORDS.search(window))
+        if match["currency"]:
+            pay = near_pay or high is not None and not _FINANCE_WORDS.search(window)
+        else:
+            pay = near_pay and _plausible_bare(text, match, high)
+        if pay:
+            yield match, low, high
+
+def _pay_figure(text):
+    """The first salary range or figure in text as (match, low, high), or None."""
+    return next(_pay_figures(text), None)
+
+def _mentions_pay(text):
+    """Pay is talked about (a salary word or a currency amount) even though no figure was read."""
+    return bool(_SALARY_MENTION.search(text) or re.search(_AMOUNT, text))
+
+# --- RULES ---
+
+@rule("Is the job description unusually short (e.g., under 150 words)?")
+def short_description(text):
+    words = len(text.split())
+    if words < SHORT_POSTING_WORDS:
+        return "Yes", f"The posting is {words} words long (threshold: {SHORT_POSTING_WORDS})."
+    return "No", f"The posting is {words} words long."
+
+@rule("Is the application deadline less than 7 days from the posting date?")
+def short_deadline(text):
+    deadline = re.search(r"(?:deadline|apply by|closing date|closes(?: on)?|applications? (?:close|due))\W{0,3}" + _DATE,
+                         text, re.IGNORECASE)
+    if deadline is None:
+        if re.search(r"deadline|apply by|closing date", text, re.IGNORECASE):
+            return None  # Mentioned, but not in a form we can parse
+        return "No", "No application deadline is stated in the posting."
+    posted = re.search(r"(?:posted(?: on)?|posting date|date posted)\W{0,3}" + _DATE, text, re.IGNORECASE)
+    if posted is None:
+        return None
+    start, end = _parse_date(posted.group(1)), _parse_date(deadline.group(1))
+    if start is None or end is None:
+        return None
+    days = (end - start).days
+    evidence = f"Posted {posted.group(1)}, deadline {deadline.group(1)} ({days} days)."
+    return ("Yes" if days < DEADLINE_WINDOW_DAYS else "No"), evidence
+
+@rule("Does the posting lack a 'Company Culture' or 'About Us' section?")
+def missing_about_section(text):
+    match = re.search(r"about us|about the (?:company|team)|who we are|company culture|our culture|life at \w+|our mission",
+                      text, re.IGNORECASE)
+    if match:
+        return "No", _line_with(text, match)
+    return "Yes", "No 'About Us', company culture or mission section found."
+
+@rule("Is a salary range completely absent?")
+def missing_salary(text):
+    figure = _pay_figure(text)
+    if figure:
+        return "No", _line_with(text, figure[0])
+    if _mentions_pay(text):
+        return None  # Pay is mentioned, but no figure could be read
+    return "Yes", "No salary figure or range appears in the posting."
+
+@rule("Is the provided salary range wider than 50% of the minimum value?")
+def wide_salary_range(text):
+    match, low, high = next(((m, lo, hi) for m, lo, hi in _pay_figures(text) if hi is not None), (None, 0, None))
+    if match is None:
+        if _pay_figure(text) or _mentions_pay(text):
+            return None  # A single figure, an unusual format or pay without figures; let the model read it
+        return "No", "No salary range is provided."
+    if low <= 0 or high < low:
+        return None
+    spread = (high - low) / low
+    answer = "Yes" if spread > SALARY_SPREAD_LIMIT else "No"
+    return answer, f"{_line_with(text, match)} (spread {spread:.0%} of the minimum)"
+
+@rule("Does the posting use 'salary commensurate with experience' without a baseline?")
+def commensurate_without_baseline(text):
+    match = re.search(r"commensurate with (?:skills and )?experience|depending on experience|\bDOE\b", text, re.IGNORECASE)
+    if match is None:
+        return "No", "The posting does not use 'commensurate with experience' language."
+    if _pay_figure(text):
+        return "No", f"{_line_with(text, match)} (a salary figure is also given)"
+    if re.search(_AMOUNT, text):
+        return None  # Money is mentioned, but not clearly as pay
+    return "Yes", _line_with(text, match)
@@ -0,0 +1,187 @@
+import os
+import sys
+import json
+import argparse
+import threading
+from concurrent.futures import Future
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import agent0_1
+import agent0_2
+import agent1_1
+import agent1_2
+import agent1_3
+import results_store
+from common import PROMPTS_DIR, AgentError, get_client, load_prompt
+
+# Long-running HTTP service for ATS integrations. One warm process keeps the genai
+# client, prompts and per-posting inputs in memory, so an application costs one
+# model call instead of an interpreter start plus the call. Identical requests
+# that arrive while one is already running wait for it and share its result
+# instead of paying for a second upstream call.
+
+class Coalescer:
+    """Single-flight execution: concurrent calls with the same key share one run."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.stats = {"runs": 0, "coalesced": 0}
+
+    def run(self, key, fn):
+        """Return (result, coalesced). Waiters re-raise the leader's exception."""
+        with self.lock:
+            future = self.inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self.inflight[key] = Future()
+                self.stats["runs"] += 1
+            else:
+                self.stats["coalesced"] += 1
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.inflight[key]
+
+coalescer = Coalescer()
+
+# Directories a request may name; anything resolving outside them is refused (see main())
+ROOTS = {"posting": "postings", "candidate": "candidates"}
+
+def allowed(field, path):
+    """Whether path resolves (symlinks included) to somewhere below ROOTS[field]."""
+    root = os.path.realpath(ROOTS[field])
+    resolved = os.path.realpath(path)
+    return resolved != root and os.path.commonpath([resolved, root]) == root
+
+def _read_json(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+def _read_text(path):
+    try:
+        with open(path, "r") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def ensure_requirements(posting):
+    """Run Agent 1_1 once per posting; concurrent first evaluations share that run."""
+    if not os.path.exists(os.path.join(posting, "questions.json")):
+        coalescer.run(("requirements", posting), lambda: agent1_1.run(posting))
+
+def screen(posting):
+    agent0_1.run(posting)
+    agent0_2.run(posting)
+    return {"screening_report": _read_json(os.path.join(posting, "screening_report.json")),
+            "screening_summary": _read_text(os.path.join(posting, "screening_summary.md"))}
+
+def evaluate(posting, candidate, memoize=False, cascade=False):
+    ensure_requirements(posting)
+    agent1_2.run(posting, candidate, memoize=memoize, cascade=cascade)
+    name = results_store.candidate_key(candidate)
+    return {"evaluation": _read_json(os.path.join(posting, "evaluations", f"{name}_evaluation.json"))}
+
+def summarize(posting, candidate, narrative=True):
+    name = results_store.candidate_key(candidate)
+    if not os.path.exists(os.path.join(posting, "evaluations", f"{name}_evaluation.json")):
+        # Keyed like a POST /evaluate for the pair, so it shares a run with one already in flight
+        coalescer.run(("/evaluate", posting, candidate), lambda: evaluate(posting, candidate))
+    agent1_3.run(posting, candidate, narrative=narrative)
+    summaries = os.path.join(posting, "summaries")
+    return {"scores": _read_json(os.path.join(summaries, f"{name}_score.json")),
+            "markdown": _read_text(os.path.join(summaries, f"{name}_summary.md")) if narrative else None}
+
+# path -> (handler, boolean options taken from the JSON body); every handler but screen also needs a candidate
+ENDPOINTS = {
+    "/screen": (screen, []),
+    "/evaluate": (evaluate, ["memoize", "cascade"]),
+    "/summary": (summarize, ["narrative"]),
+}
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "CandidateScreening/1.0"
+
+    def _send(self, status, payload):
+        data = json.dumps(payload, indent=2).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path != "/health":
+            return self._send(404, {"error": f"unknown endpoint {self.path}"})
+        self._send(200, {"status": "ok", **coalescer.stats, "inflight": len(coalescer.inflight)})
+
+    def do_POST(self):
+        if self.path not in ENDPOINTS:
+            return self._send(404, {"error": f"unknown endpoint {self.path}"})
+        handler, options = ENDPOINTS[self.path]
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            fields = ["posting"] if handler is screen else ["posting", "candidate"]
+            args = [os.path.normpath(body[field]) for field in fields]
+        except (ValueError, KeyError, TypeError) as e:
+            return self._send(400, {"error": f"expected a JSON body with posting (and candidate): {e}"})
+        for field, path in zip(fields, args):
+            if not allowed(field, path):
+                return self._send(400, {"error": f"{field} must be a directory under {ROOTS[field]}/: {path}"})
+            if not os.path.isdir(path):
+                return self._send(404, {"error": f"no such directory: {path}"})
+
+        kwargs = {name: bool(body[name]) for name in options if name in body}
+        key = (self.path, *args, *sorted(kwargs.items()))
+        try:
+            result, coalesced = coalescer.run(key, lambda: handler(*args, **kwargs))
+        except AgentError as e:
+            return self._send(422, {"error": str(e)})
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            return self._send(500, {"error": f"agent finished without a readable output: {e}"})
+        except Exception as e:
+            print(f"Error: {self.path} failed unexpectedly: {type(e).__name__}: {e}")
+            return self._send(500, {"error": f"{type(e).__name__}: {e}"})
+        self._send(200, {**result, "coalesced": coalesced})
+
+def warm_up():
+    """Load every prompt and open the client before the first request arrives."""
+    for name in sorted(os.listdir(PROMPTS_DIR)):
+        load_prompt(name)
+    get_client()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve screening, evaluation and summaries over HTTP from one warm process.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--postings", default=ROOTS["posting"], help="Root that every requested posting must be under")
+    parser.add_argument("--candidates", default=ROOTS["candidate"],
+                        help="Root that every requested candidate must be under")
+    args = parser.parse_args()
+    ROOTS.update(posting=args.postings, candidate=args.candidates)
+
+    if not os.environ.get("GEMINI_API_KEY"):
+        print("❌ Error: GEMINI_API_KEY is not set.")
+        print("Please run: export GEMINI_API_KEY='your_api_key_here'")
+        sys.exit(1)
+
+    warm_up()
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    server.daemon_threads = True
+    print(f"🚀 Serving on http://{args.host}:{args.port} (POST /screen, /evaluate, /summary; GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"Stopped after {coalescer.stats['runs']} runs ({coalescer.stats['coalesced']} coalesced requests).")
+
+if __name__ == "__main__":
+    main()
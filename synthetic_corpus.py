@@ -0,0 +1,93 @@
+import os
+import random
+import argparse
+
+# Synthetic postings/ and candidates/ trees at benchmark scale (e.g. 1k x 10k).
+# Text is assembled from a fixed skill vocabulary so requirement/resume overlap,
+# and therefore BM25 and coverage scores, vary realistically between pairs.
+# The same --seed always produces the same tree.
+SKILLS = [
+    "Python", "Go", "Java", "TypeScript", "C++", "Rust", "SQL", "PostgreSQL", "Kafka", "Spark",
+    "AWS", "GCP", "Azure", "Kubernetes", "Docker", "Terraform", "React", "GraphQL", "gRPC",
+    "Airflow", "dbt", "Snowflake", "Redis", "Elasticsearch", "machine learning", "PyTorch",
+    "CI/CD", "observability", "microservices", "distributed systems", "data modeling", "security",
+]
+ROLES = ["Backend Engineer", "Data Engineer", "Platform Engineer", "ML Engineer", "Full-Stack Engineer", "SRE"]
+LEVELS = ["", "Senior ", "Staff ", "Lead "]
+COMPANIES = ["acme", "globex", "initech", "umbrella", "hooli", "vandelay", "stark", "wayne", "tyrell", "cyberdyne"]
+DOMAINS = ["FinTech", "healthcare", "e-commerce", "logistics", "ad tech", "gaming", "climate", "education"]
+
+def posting_text(rng, title, company):
+    core = rng.sample(SKILLS, rng.randint(4, 7))
+    preferred = rng.sample([s for s in SKILLS if s not in core], rng.randint(2, 4))
+    domain = rng.choice(DOMAINS)
+    salary = rng.choice(["", f"Salary: ${rng.randint(120, 180)},000 - ${rng.randint(185, 260)},000\n",
+                         "Compensation: commensurate with experience\n"])
+    return (
+        f"# {title} — {company.title()} [SYNTHETIC DATA]\n\n"
+        f"## About Us\n{company.title()} builds {domain} software used by {rng.randint(2, 900)} million people.\n\n"
+        f"## The Role\nWe are hiring a {title} to own {rng.choice(['our ingestion platform', 'core APIs', 'the data lake', 'model serving'])}.\n\n"
+        "## Requirements\n" + "".join(f"- {rng.randint(2, 8)}+ years of experience with {s}\n" for s in core) +
+        "\n## Nice to Have\n" + "".join(f"- Familiarity with {s}\n" for s in preferred) +
+        f"\n## Details\n{salary}Location: {rng.choice(['Remote', 'New York', 'Berlin', 'Austin'])}\n"
+    )
+
+def resume_text(rng, name):
+    skills = rng.sample(SKILLS, rng.randint(5, 12))
+    years = rng.randint(1, 20)
+    jobs = []
+    for i in range(rng.randint(2, 4)):
+        used = rng.sample(skills, min(len(skills), rng.randint(2, 4)))
+        jobs.append(f"### {rng.choice(COMPANIES).title()} | {rng.choice(ROLES)}\n"
+                    + "".join(f"- Built {rng.choice(['pipelines', 'services', 'tooling', 'models'])} with {s}, "
+                              f"cutting {rng.choice(['latency', 'cost', 'incidents'])} by {rng.randint(10, 80)}%.\n"
+                              for s in used))
+    return (
+        f"# {name} [SYNTHETIC DATA]\n\n"
+        f"## Professional Summary\nEngineer with {years} years of experience in {rng.choice(DOMAINS)}.\n\n"
+        f"## Skills\n{', '.join(skills)}\n\n## Experience\n" + "\n".join(jobs)
+    )
+
+def experiences_text(rng, skills):
+    entries = []
+    for s in rng.sample(skills, min(len(skills), rng.randint(3, 8))):
+        entries.append(f"## {s} at scale\n**Situation:** {rng.choice(DOMAINS)} platform under load.\n"
+                       f"**Task:** Own the {s} migration.\n**Action:** Designed and shipped it.\n"
+                       f"**Result:** {rng.randint(10, 90)}% improvement.\n")
+    return "# Experiences\n\n" + "\n---\n\n".join(entries)
+
+def generate(out_dir, n_postings, n_candidates, experiences_share=0.3, seed=0):
+    rng = random.Random(seed)
+    for i in range(n_postings):
+        company = COMPANIES[i % len(COMPANIES)]
+        title = f"{rng.choice(LEVELS)}{rng.choice(ROLES)}"
+        job_dir = os.path.join(out_dir, "postings", company, f"{title.lower().replace(' ', '-')}-{i:05d}")
+        os.makedirs(job_dir, exist_ok=True)
+        with open(os.path.join(job_dir, "posting.txt"), "w") as f:
+            f.write(posting_text(rng, title, company))
+
+    for i in range(n_candidates):
+        candidate_dir = os.path.join(out_dir, "candidates", f"candidate-{i:06d}")
+        os.makedirs(candidate_dir, exist_ok=True)
+        text = resume_text(rng, f"Candidate {i}")
+        with open(os.path.join(candidate_dir, "resume.md"), "w") as f:
+            f.write(text)
+        if rng.random() < experiences_share:
+            skills = [s for s in SKILLS if s in text]
+            with open(os.path.join(candidate_dir, "experiences.md"), "w") as f:
+                f.write(experiences_text(rng, skills))
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic postings/ and candidates/ trees for benchmarks.")
+    parser.add_argument("out_dir", help="Directory that receives postings/ and candidates/")
+    parser.add_argument("--postings", type=int, default=10)
+    parser.add_argument("--candidates", type=int, default=100)
+    parser.add_argument("--experiences", type=float, default=0.3, help="Share of candidates with experiences.md")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate(args.out_dir, args.postings, args.candidates, args.experiences, args.seed)
+    print(f"Wrote {args.postings} postings and {args.candidates} candidates under {args.out_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import os
+import json
+import math
+import time
+import argparse
+import threading
+
+# Per-call trace of every model call: one JSON line with wall time, time spent
+# waiting on the rate limiter, retries, token counts, response-cache hit/miss and
+# the estimated cost. `python telemetry.py report` aggregates the trace per agent,
+# posting and model.
+TRACE_PATH = os.environ.get("LLM_TRACE_PATH", os.path.join(".index", "llm_trace.jsonl"))
+ENABLED = os.environ.get("LLM_TRACE", "on").lower() not in ("off", "0", "false")
+
+# USD per 1M tokens: (input, output incl. thinking, cached input). Override with --prices.
+PRICES = {
+    "gemini-3-flash-preview": (0.50, 3.00, 0.05),
+    "gemini-2.5-flash": (0.30, 2.50, 0.03),
+    "gemini-2.5-flash-lite": (0.10, 0.40, 0.01),
+    "gemini-2.5-pro": (1.25, 10.00, 0.125),
+}
+
+_lock = threading.Lock()
+
+class Call:
+    """Collects one model call's measurements; the rate limiter adds queue_wait_s and retries."""
+
+    def __init__(self, request):
+        self.request = request
+        self.started = time.perf_counter()
+        self.queue_wait_s = 0.0
+        self.retries = 0
+
+    def finish(self, usage=None, cache_hit=False, error=None):
+        if not ENABLED:
+            return
+        request = self.request
+        posting = request.state.get("posting")
+        record = {
+            "ts": time.time(),
+            "agent": request.agent,
+            "model": request.model,
+            "posting": os.path.relpath(posting) if posting else None,
+            "output": os.path.relpath(request.output_path),
+            "wall_s": round(time.perf_counter() - self.started, 3),
+            "queue_wait_s": round(self.queue_wait_s, 3),
+            "retries": self.retries,
+            "cache": "hit" if cache_hit else "miss",
+            "stream": request.stream,
+            "prompt_tokens": getattr(usage, "prompt_token_count", None) or 0,
+            "output_tokens": getattr(usage, "candidates_token_count", None) or 0,
+            "thought_tokens": getattr(usage, "thoughts_token_count", None) or 0,
+            "cached_tokens": getattr(usage, "cached_content_token_count", None) or 0,
+            "error": str(error) if error else None,
+        }
+        line = json.dumps(record) + "\n"
+        with _lock:
+            os.makedirs(os.path.dirname(TRACE_PATH) or ".", exist_ok=True)
+            with open(TRACE_PATH, "a") as f:
+                f.write(line)
+
+def cost(record, prices=PRICES):
+    """Estimated USD for one trace record, or None when the model has no price."""
+    if record["model"] not in prices:
+        return None
+    input_rate, output_rate, cached_rate = prices[record["model"]]
+    fresh = record["prompt_tokens"] - record["cached_tokens"]
+    return (fresh * input_rate + record["cached_tokens"] * cached_rate
+            + (record["output_tokens"] + record["thought_tokens"]) * output_rate) / 1e6
+
+def percentile(values, q):
+    """Nearest-rank percentile of an unsorted list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+def load(path=TRACE_PATH):
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def aggregate(records, by, prices=PRICES):
+    """Per-group counts, p50/p95 latency of model calls (cache hits excluded), tokens and cost."""
+    groups = {}
+    for r in records:
+        groups.setdefault(r.get(by) or "-", []).append(r)
+    rows = []
+    for key, group in groups.items():
+        calls = [r for r in group if r["cache"] == "miss"]
+        latencies = [r["wall_s"] for r in calls if not r["error"]]
+        costs = [cost(r, prices) for r in calls]
+        rows.append({
+            by: key,
+            "calls": len(group),
+            "hits": len(group) - len(calls),
+            "errors": sum(1 for r in group if r["error"]),
+            "retries": sum(r["retries"] for r in group),
+            "p50_s": percentile(latencies, 50),
+            "p95_s": percentile(latencies, 95),
+            "queue_wait_s": sum(r["queue_wait_s"] for r in group),
+            "prompt_tokens": sum(r["prompt_tokens"] for r in calls),
+            "cached_tokens": sum(r["cached_tokens"] for r in calls),
+            "output_tokens": sum(r["output_tokens"] + r["thought_tokens"] for r in calls),
+            "cost_usd": None if None in costs else sum(costs),
+        })
+    rows.sort(key=lambda row: -(row["cost_usd"] or 0))
+    return rows
+
+def _fmt(value, spec):
+    return "n/a" if value is None else format(value, spec)
+
+def print_table(rows, by):
+    print(f"{by:<40} {'calls':>6} {'hits':>5} {'err':>4} {'p50 s':>7} {'p95 s':>7} "
+          f"{'prompt':>10} {'cached':>10} {'output':>9} {'cost $':>9}")
+    for row in rows:
+        print(f"{str(row[by])[-40:]:<40} {row['calls']:>6} {row['hits']:>5} {row['errors']:>4} "
+              f"{_fmt(row['p50_s'], '7.2f')} {_fmt(row['p95_s'], '7.2f')} {row['prompt_tokens']:>10} "
+              f"{row['cached_tokens']:>10} {row['output_tokens']:>9} {_fmt(row['cost_usd'], '9.4f')}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize the per-call model trace.")
+    parser.add_argument("command", choices=["report"])
+    parser.add_argument("--trace", default=TRACE_PATH, help=f"Trace file (default: {TRACE_PATH})")
+    parser.add_argument("--by", choices=["agent", "posting", "model"], action="append",
+                        help="Grouping (repeatable; default: all three)")
+    parser.add_argument("--prices", default=None,
+                        help='JSON file of {"model": [input, output, cached_input]} USD per 1M tokens')
+    args = parser.parse_args()
+
+    prices = dict(PRICES)
+    if args.prices:
+        with open(args.prices, "r") as f:
+            prices.update({model: tuple(rates) for model, rates in json.load(f).items()})
+
+    try:
+        records = load(args.trace)
+    except FileNotFoundError:
+        raise SystemExit(f"Error: no trace at {args.trace}; run an agent first.")
+
+    for by in args.by or ["agent", "posting", "model"]:
+        print_table(aggregate(records, by, prices), by)
+        print()
+    misses = [r for r in records if r["cache"] == "miss"]
+    total = [cost(r, prices) for r in misses]
+    print(f"{len(records)} calls ({len(records) - len(misses)} cache hits), "
+          f"estimated cost ${sum(c for c in total if c is not None):.4f}"
+          + (" (some models unpriced)" if None in total else ""))
+
+if __name__ == "__main__":
+    main()
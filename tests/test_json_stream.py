@@ -0,0 +1,20 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_stream import JsonArrayStream
+
+def test_elements_are_returned_as_soon_as_they_complete():
+    stream = JsonArrayStream()
+    assert stream.feed('[{"a": 1}, {"b"') == [{"a": 1}]
+    assert stream.feed(': "x, ]"}') == [{"b": "x, ]"}]
+    assert not stream.finished
+    assert stream.feed(" ]") == []
+    assert stream.finished
+
+def test_a_stalled_element_stays_pending():
+    stream = JsonArrayStream()
+    stream.feed('[{"a": 1}, {"b": oops}, {"c": 2}]')
+    assert not stream.finished
+    assert stream.pending.startswith('{"b": oops}')
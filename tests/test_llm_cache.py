@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import llm_cache
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(llm_cache, "ENABLED", True)
+    monkeypatch.setattr(llm_cache, "_total_bytes", None)
+    return llm_cache
+
+def _on_disk(cache):
+    return sum(size for _, size, _ in cache._entries())
+
+def test_overwriting_a_key_keeps_the_total_exact(cache):
+    cache.put("a" * 64, {"v": 1})
+    for n in range(5):
+        cache.put("a" * 64, {"v": "x" * n})
+    assert cache._total_bytes == _on_disk(cache)
+
+def test_least_recently_used_entries_are_evicted_first(cache, monkeypatch):
+    first, second, third = "1" * 64, "2" * 64, "3" * 64
+    cache.put(first, ["x" * 40])
+    cache.put(second, ["y" * 40])
+    os.utime(cache._entry_path(first), (1, 1))
+    os.utime(cache._entry_path(second), (2, 2))
+    monkeypatch.setattr(cache, "MAX_BYTES", _on_disk(cache) + 10)   # room for two entries, not three
+    cache.put(third, ["z" * 40])
+    assert cache.get(first) is None
+    assert cache.get(second) == ["y" * 40] and cache.get(third) == ["z" * 40]
+    assert cache._total_bytes == _on_disk(cache)
@@ -0,0 +1,21 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scoring
+
+def _e(priority, answer, strength):
+    return {"priority": priority, "answer": answer, "evidence_strength": strength}
+
+def test_points_follow_priority_and_evidence():
+    result = scoring.score([_e("Core", "Yes", "Strong"), _e("Core", "Yes", "Moderate"),
+                            _e("Preferred", "Yes", "Strong"), _e("Preferred", "No", "Strong")])
+    assert result["fit_percentage"] == round(100 * (10 + 7 + 5) / 30, 1)
+    assert (result["core_met"], result["preferred_met"], result["preferred_total"]) == (2, 1, 2)
+
+def test_a_core_gap_caps_the_recommendation():
+    evaluations = [_e("Core", "Yes", "Strong")] * 9 + [_e("Core", "No", "None")]
+    assert scoring.score(evaluations)["recommendation"] == "Potential Fit"
+    relaxed = {**scoring.DEFAULT_WEIGHTS, "strong_fit_requires_all_core": False}
+    assert scoring.score(evaluations, relaxed)["recommendation"] == "Strong Fit"
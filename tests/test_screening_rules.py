@@ -0,0 +1,34 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import screening_rules
+
+def test_bare_k_range_counts_as_salary():
+    assert screening_rules.missing_salary("Salary: 90k-120k")[0] == "No"
+    answer, evidence = screening_rules.wide_salary_range("Salary: 90k-120k")
+    assert answer == "No" and "33%" in evidence
+
+def test_plain_number_range_near_pay_words_counts_as_salary():
+    text = "Compensation: 95,000 to 130,000 per year"
+    assert screening_rules.missing_salary(text)[0] == "No"
+    assert screening_rules.wide_salary_range(text)[0] == "No"
+
+def test_currency_range_with_k_on_the_upper_bound():
+    answer, evidence = screening_rules.wide_salary_range("Base salary $100-160k")
+    assert answer == "Yes" and "60%" in evidence
+
+def test_funding_amounts_are_not_salary():
+    text = "We raised $20-30 million from investors. Pay: competitive"
+    assert screening_rules.missing_salary(text) is None
+    assert screening_rules.wide_salary_range(text) is None
+    assert screening_rules.missing_salary("We raised $50M in funding.") is None
+
+def test_pay_words_without_a_figure_go_to_the_model():
+    assert screening_rules.missing_salary("3-5 years of experience; competitive salary") is None
+
+def test_no_pay_mentioned_is_answered_locally():
+    text = "About us: we build developer tools. You will write Python."
+    assert screening_rules.missing_salary(text)[0] == "Yes"
+    assert screening_rules.wide_salary_range(text)[0] == "No"
@@ -0,0 +1,72 @@
+import os
+import sys
+from typing import Literal
+
+from pydantic import BaseModel
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import validation
+
+class Answer(BaseModel):
+    question: str
+    answer: str
+
+GOOD_1 = '{"question": "Remote?", "answer": "Yes"}'
+GOOD_2 = '{"question": "Salary listed?", "answer": "No"}'
+
+def test_malformed_element_in_the_middle_is_reasked():
+    text = f'[{GOOD_1}, {{"question": oops}}, {GOOD_2}]'
+    parsed = validation.parse(list[Answer], text)
+    assert parsed.repaired
+    assert [a["question"] for a in parsed.value] == ["Remote?", "Salary listed?"]
+    assert [(i, raw) for i, raw, _ in parsed.invalid] == [(1, '{"question": oops}')]
+    assert validation.positional(parsed)[1] is None
+
+def test_truncated_last_element_is_dropped():
+    parsed = validation.parse(list[Answer], f'[{GOOD_1}, {{"question": "Sal')
+    assert [a["question"] for a in parsed.value] == ["Remote?"]
+    assert parsed.invalid == []
+    assert not parsed.complete
+
+def _with_invalid(valid, invalid):
+    return validation.Parsed([dict(v) for v in valid], invalid)
+
+def test_merge_matches_corrections_by_question():
+    parsed = _with_invalid(
+        [{"question": "Remote?", "answer": "Yes"}],
+        [(1, {"question": "Visa?"}, "answer: missing"),
+         (2, '{"question": "Relocation?", answer}', "element is not valid JSON"),
+         (3, {"question": "Salary listed?"}, "answer: missing")])
+    # Only the correction for the last invalid element came back
+    merged = validation.merge(parsed, [{"question": "Salary listed?", "answer": "No"}])
+    assert merged == [{"question": "Remote?", "answer": "Yes"}, {"question": "Salary listed?", "answer": "No"}]
+
+def test_merge_reads_the_question_of_a_malformed_element():
+    parsed = _with_invalid([], [(0, '{"question": "Relocation?", answer}', "element is not valid JSON")])
+    merged = validation.merge(parsed, [{"question": "relocation? ", "answer": "No"}])
+    assert merged == [{"question": "relocation? ", "answer": "No"}]
+
+def test_merge_falls_back_to_position_without_a_question_field():
+    parsed = _with_invalid([{"name": "a"}], [(1, {"nme": "b"}, "name: missing")])
+    assert validation.merge(parsed, [{"name": "b"}]) == [{"name": "a"}, {"name": "b"}]
+
+class Verdict(BaseModel):
+    question: str
+    answer: Literal["Yes", "No"]
+    priority: Literal["Core", "Preferred"]
+
+def test_enum_values_are_matched_to_the_schema_spelling():
+    parsed = validation.parse(list[Verdict], '[{"question": "Go?", "answer": "yes.", "priority": " core"}]')
+    assert parsed.value == [{"question": "Go?", "answer": "Yes", "priority": "Core"}]
+    assert not parsed.repaired
+
+def test_truncated_object_is_closed_and_marked_incomplete():
+    parsed = validation.parse(Answer, '```json\n{"question": "Remote?", "answer": "Yes", "no')
+    assert parsed.value == {"question": "Remote?", "answer": "Yes"}
+    assert parsed.repaired and not parsed.complete
+
+def test_text_around_a_complete_array_is_dropped():
+    parsed = validation.parse(list[Answer], f'Here you go:\n```json\n[{GOOD_1}]\n```')
+    assert parsed.repaired and parsed.complete
+    assert len(parsed.value) == 1
@@ -0,0 +1,48 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import work_queue
+
+def _queue(tmp_path):
+    conn = work_queue.connect(str(tmp_path / "queue.sqlite"))
+    requirements = work_queue._add(conn, "agent1_1", "postings/p")
+    work_queue._add(conn, "agent1_2", "postings/p", "candidates/c", requirements)
+    return conn, requirements
+
+def _status(conn, task_id):
+    return conn.execute("SELECT status FROM tasks WHERE id = ?", (task_id,)).fetchone()[0]
+
+def test_complete_marks_the_leased_task_done(tmp_path):
+    conn, task_id = _queue(tmp_path)
+    assert work_queue.lease(conn, "w1")[0] == task_id
+    work_queue.complete(conn, task_id, "w1")
+    assert _status(conn, task_id) == "done"
+
+def test_complete_by_a_worker_that_lost_its_lease_changes_nothing(tmp_path):
+    conn, task_id = _queue(tmp_path)
+    work_queue.lease(conn, "w1")
+    conn.execute("UPDATE tasks SET lease_until = 0 WHERE id = ?", (task_id,))
+    assert work_queue.lease(conn, "w2")[0] == task_id     # lapsed lease handed to w2
+    work_queue.complete(conn, task_id, "w1")
+    assert _status(conn, task_id) == "leased"
+    work_queue.fail(conn, task_id, "boom", "w1")
+    assert _status(conn, task_id) == "leased"
+
+def test_rerun_of_a_leased_task_waits_for_its_lease(tmp_path):
+    conn, task_id = _queue(tmp_path)
+    work_queue.lease(conn, "w1")
+    work_queue._add(conn, "agent1_1", "postings/p", rerun=True)
+    assert _status(conn, task_id) == "leased"
+    assert work_queue.lease(conn, "w2") is None           # neither the re-run nor its dependent start
+    work_queue.complete(conn, task_id, "w1")
+    assert _status(conn, task_id) == "pending"
+    assert work_queue.lease(conn, "w2")[0] == task_id
+
+def test_failure_of_a_dirty_task_requeues_it(tmp_path):
+    conn, task_id = _queue(tmp_path)
+    work_queue.lease(conn, "w1")
+    work_queue._add(conn, "agent1_1", "postings/p", rerun=True)
+    work_queue.fail(conn, task_id, "boom", "w1")
+    assert _status(conn, task_id) == "pending"
@@ -0,0 +1,286 @@
+import re
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, get_args, get_origin
+
+from pydantic import TypeAdapter, ValidationError
+
+# Local checking and repair of structured responses, so a malformed answer does not
+# cost a whole new call. Text is parsed leniently (code fences and stray text around
+# the JSON are dropped, a truncated document is closed after its last complete
+# value), enum values are matched case-insensitively against the schema, and every
+# element of a list response is validated on its own with a compiled TypeAdapter.
+# Elements that are still invalid are the only thing re-asked (common._reask).
+
+class Malformed(str):
+    """Raw text of an array element that is not valid JSON; it is re-asked like an invalid one."""
+
+@dataclass
+class Parsed:
+    """A validated response. For list schemas, invalid holds (index, raw element, error)
+    for the elements that failed; value keeps only the valid ones, in order. complete is
+    False when the response was cut off, so whatever came after the cut is missing."""
+    value: Any
+    invalid: list = field(default_factory=list)
+    repaired: bool = False
+    complete: bool = True
+
+class Validator:
+    """Compiled adapters for one response schema."""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.is_list = get_origin(schema) is list and bool(get_args(schema))
+        self.adapter = TypeAdapter(get_args(schema)[0] if self.is_list else schema)
+        json_schema = self.adapter.json_schema()
+        self.defs = json_schema.get("$defs", {})
+        self.json_schema = json_schema
+
+    def coerce(self, value, schema=None):
+        """value with enum strings mapped onto the schema's spelling ('yes ' -> 'Yes')."""
+        schema = self.json_schema if schema is None else schema
+        if "$ref" in schema:
+            schema = self.defs.get(schema["$ref"].rsplit("/", 1)[-1], {})
+        if "enum" in schema and isinstance(value, str):
+            spelled = {str(e).strip().lower(): e for e in schema["enum"]}
+            return spelled.get(value.strip().strip(".").lower(), value)
+        for option in schema.get("anyOf", []):
+            coerced = self.coerce(value, option)
+            if coerced is not value:
+                return coerced
+        if isinstance(value, dict) and "properties" in schema:
+            props = schema["properties"]
+            return {k: self.coerce(v, props[k]) if k in props else v for k, v in value.items()}
+        if isinstance(value, list) and "items" in schema:
+            return [self.coerce(v, schema["items"]) for v in value]
+        return value
+
+    def validate(self, value):
+        """Validated JSON-ready copy of one element (or of the whole non-list value)."""
+        return self.adapter.dump_python(self.adapter.validate_python(self.coerce(value)), mode="json")
+
+    def check(self, value):
+        """Parsed for a decoded response; raises ValueError when a non-list response is invalid."""
+        if not self.is_list:
+            try:
+                return Parsed(self.validate(value))
+            except ValidationError as e:
+                raise ValueError(f"response does not match the schema: {_first_error(e)}") from e
+        if isinstance(value, dict):
+            value = [value]     # a lone element instead of a one-element array
+        if not isinstance(value, list):
+            raise ValueError(f"expected a JSON array, got {type(value).__name__}")
+        parsed = Parsed([])
+        for i, element in enumerate(value):
+            if isinstance(element, Malformed):
+                parsed.invalid.append((i, str(element), "element is not valid JSON"))
+                continue
+            try:
+                parsed.value.append(self.validate(element))
+            except ValidationError as e:
+                parsed.invalid.append((i, element, _first_error(e)))
+        return parsed
+
+@lru_cache(maxsize=None)
+def validator(schema):
+    return Validator(schema)
+
+def _first_error(e):
+    error = e.errors()[0]
+    location = ".".join(str(part) for part in error["loc"])
+    return f"{location}: {error['msg']}" if location else error["msg"]
+
+def close_truncated(text):
+    """text cut back to its last complete value, with the open brackets closed.
+
+    An array element that was still open is dropped whole rather than closed half-filled."""
+    stack = []          # (bracket, position) of every open bracket
+    safe = None         # (cut position, brackets still open there)
+    in_string = escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "[{":
+            stack.append((ch, i))
+            safe = (i + 1, list(stack))
+        elif ch in "]}":
+            if stack:
+                stack.pop()
+            safe = (i + 1, list(stack))
+        elif ch == ",":
+            safe = (i, list(stack))
+    if safe is None:
+        raise ValueError("no JSON value in the response")
+    cut, still_open = safe
+    for k in range(1, len(stack)):
+        if stack[k][0] == "{" and stack[k - 1][0] == "[":
+            cut, still_open = stack[k][1], stack[:k]
+            break
+    head = text[:cut].rstrip().rstrip(",")
+    return head + "".join("]" if b == "[" else "}" for b, _ in reversed(still_open))
+
+def _element_end(text, pos):
+    """Where the array element starting at pos ends: after its closing bracket, or at the
+    next top-level ',' or ']'. None when the text is cut off inside it."""
+    depth = 0
+    in_string = escaped = False
+    for i in range(pos, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "[{":
+            depth += 1
+        elif ch in "]}":
+            if depth == 0:
+                return i
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        elif ch == "," and depth == 0:
+            return i
+    return None
+
+def _load_array(text):
+    """(elements, complete) for the array text starts with. A malformed element becomes
+    Malformed and parsing resumes at the next one; an element cut off by truncation is
+    dropped and complete is False."""
+    decoder = json.JSONDecoder()
+    items, pos = [], 1
+    while True:
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(text) or text[pos] == "]":
+            return items, pos < len(text)
+        try:
+            item, pos = decoder.raw_decode(text, pos)
+            items.append(item)
+            continue
+        except json.JSONDecodeError:
+            pass
+        end = _element_end(text, pos)
+        if end is None:
+            return items, False
+        end = max(end, pos + 1)
+        items.append(Malformed(text[pos:end].strip()))
+        pos = end
+
+def loads(text):
+    """(value, repaired, complete): json.loads, falling back to trimming junk and closing truncation."""
+    try:
+        return json.loads(text), False, True
+    except json.JSONDecodeError:
+        pass
+    starts = [i for i in (text.find("["), text.find("{")) if i >= 0]
+    if not starts:
+        raise ValueError(f"no JSON in the response: {text[:80]!r}")
+    start = min(starts)
+    if text[start] == "[":
+        # Every complete element, whether the array was cut off or followed by junk
+        items, complete = _load_array(text[start:])
+        return items, True, complete
+    try:
+        # Trailing commentary or a closing code fence after a complete object
+        return json.JSONDecoder().raw_decode(text, start)[0], True, True
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(close_truncated(text[start:])), True, False
+    except json.JSONDecodeError as e:
+        raise ValueError(f"response is not repairable JSON: {e}") from e
+
+def parse(schema, text):
+    """Parsed for a model's response text. schema=None means plain text."""
+    if schema is None:
+        return Parsed(text)
+    value, repaired, complete = loads(text)
+    parsed = validator(schema).check(value)
+    parsed.repaired, parsed.complete = repaired, complete
+    return parsed
+
+REASK_NOTE = (
+    "### CORRECTION REQUEST:\n"
+    "Some elements of your previous answer did not match the response schema. Return a JSON array "
+    "with a corrected version of ONLY the elements below, in the same order. Each is shown with "
+    "the validation error it caused.\n"
+)
+
+def reask_contents(contents, invalid):
+    failed = [{"element": element, "error": error} for _, element, error in invalid]
+    return f"{contents}\n\n{REASK_NOTE}{json.dumps(failed, indent=2)}"
+
+CONTINUE_NOTE = (
+    "### CONTINUATION REQUEST:\n"
+    "Your previous answer was cut off. The elements below arrived complete. Return a JSON array "
+    "with ONLY the elements that should follow them, in order, without repeating any of these.\n"
+)
+
+def continuation_contents(contents, parsed):
+    received = list(positional(parsed))
+    for index, element, _ in parsed.invalid:
+        received[index] = element
+    return f"{contents}\n\n{CONTINUE_NOTE}{json.dumps(received, indent=2)}"
+
+def positional(parsed):
+    """parsed.value with None where each invalid element was."""
+    if not parsed.invalid:
+        return parsed.value
+    invalid_at = {index for index, _, _ in parsed.invalid}
+    valid = iter(parsed.value)
+    return [None if i in invalid_at else next(valid) for i in range(len(parsed.value) + len(parsed.invalid))]
+
+_QUESTION = re.compile(r'"question"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+def _question(element):
+    """The question an element answers, read from the raw text when it is Malformed; None without one."""
+    if isinstance(element, dict):
+        question = element.get("question")
+        return " ".join(question.split()).casefold() if isinstance(question, str) else None
+    match = _QUESTION.search(element) if isinstance(element, str) else None
+    if match is None:
+        return None
+    try:
+        return _question({"question": json.loads(f'"{match.group(1)}"')})
+    except json.JSONDecodeError:
+        return None
+
+def _match(invalid, fixed):
+    """The correction for each invalid element, or None. Corrections are matched by their
+    question text; only for schemas without a question field are they taken in order."""
+    corrections = [c for c in fixed if c is not None]
+    if not corrections or any(_question(c) is None for c in corrections):
+        return [fixed[n] if n < len(fixed) else None for n in range(len(invalid))]
+    by_question = {}
+    for correction in corrections:
+        by_question.setdefault(_question(correction), correction)
+    matched = []
+    for _, element, _ in invalid:
+        question = _question(element)
+        matched.append(by_question.pop(question, None) if question is not None else None)
+    return matched
+
+def merge(parsed, fixed):
+    """parsed.value with the validated corrections (a positional() list from the follow-up)
+    put back where the invalid elements were. The rest are dropped with a warning."""
+    merged = positional(parsed)
+    for (index, _, error), correction in zip(parsed.invalid, _match(parsed.invalid, fixed)):
+        if correction is None:
+            print(f"Warning: element {index + 1} dropped; no valid correction came back ({error}).")
+        merged[index] = correction
+    return [e for e in merged if e is not None]
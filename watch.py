@@ -0,0 +1,214 @@
+import os
+import time
+import errno
+import ctypes
+import ctypes.util
+import select
+import struct
+import hashlib
+import argparse
+
+import work_queue
+
+# Watch postings/ and candidates/ with inotify and queue only the stages a change
+# affects, instead of re-walking both trees: a new or edited posting.txt queues that
+# posting's stages x every candidate, a resume.md queues that candidate x every
+# posting, and an experiences.md re-queues its Agent 2_1 alignments. Tasks go into
+# work_queue.py's queue; run `python work_queue.py work --follow` next to this to
+# execute them. inotify is called through ctypes, so this is Linux only.
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+EVENT_HEADER = struct.Struct("iIII")   # wd, mask, cookie, len; the name follows, NUL-padded to len
+SETTLE_SECONDS = 1.0                   # editors save in several writes; act once a file has been quiet this long
+
+WATCHED_FILES = ("posting.txt", "resume.md", "experiences.md")
+
+class Inotify:
+    """Recursive directory watches over the inotify syscalls."""
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_init1: {os.strerror(ctypes.get_errno())}")
+        self.paths = {}     # watch descriptor -> directory
+
+    def add_tree(self, root):
+        """Watch root and every directory below it; return the files in WATCHED_FILES found there."""
+        found = []
+        for dirpath, _, filenames in os.walk(root):
+            dirpath = os.path.normpath(dirpath)
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, "inotify watch limit reached; raise fs.inotify.max_user_watches")
+                continue    # removed again before we got to it
+            self.paths[wd] = dirpath
+            found += [os.path.join(dirpath, name) for name in filenames if name in WATCHED_FILES]
+        return found
+
+    def read(self, timeout):
+        """Events as (mask, path) pairs; an empty list when nothing arrived within timeout."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        data = os.read(self.fd, 64 * 1024)
+        events, offset = [], 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_IGNORED:
+                self.paths.pop(wd, None)
+                continue
+            directory = self.paths.get(wd)
+            if directory is not None or mask & IN_Q_OVERFLOW:
+                events.append((mask, os.path.join(directory, name) if directory and name else directory))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+class Watcher:
+    def __init__(self, conn, postings_root, candidates_root, product_profile=False, deep_alignment=False):
+        self.conn = conn
+        self.roots = [postings_root, candidates_root]
+        self.product_profile = product_profile
+        self.deep_alignment = deep_alignment
+        self.inotify = Inotify()
+        self.job_dirs = set()
+        self.candidate_dirs = set()
+        self.hashes = {}        # path -> content hash of the version last queued
+        self.dirty = {}         # path -> settle deadline
+        self.rescan()
+
+    def rescan(self):
+        """(Re)build the watches and the known postings/candidates from a directory walk.
+
+        Only at startup and after an event-queue overflow; files seen here are not queued
+        (`work_queue.py populate` covers what existed before the watch began)."""
+        self.inotify.paths.clear()
+        for root in self.roots:
+            for path in self.inotify.add_tree(root):
+                self._track(path)
+
+    def _track(self, path):
+        directory, name = os.path.split(path)
+        if name == "posting.txt":
+            self.job_dirs.add(directory)
+        elif name == "resume.md":
+            self.candidate_dirs.add(directory)
+
+    def _forget(self, path):
+        directory, name = os.path.split(path)
+        if name == "posting.txt":
+            self.job_dirs.discard(directory)
+        elif name == "resume.md":
+            self.candidate_dirs.discard(directory)
+        self.hashes.pop(path, None)
+        self.dirty.pop(path, None)
+
+    def handle(self, mask, path, now):
+        if mask & IN_Q_OVERFLOW:
+            print("Warning: inotify queue overflowed; events were lost. Re-scanning the watched trees "
+                  "(run `python work_queue.py populate` to catch up on anything missed).")
+            self.rescan()
+            return
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                # Files can land in a new directory before its watch exists
+                for found in self.inotify.add_tree(path):
+                    self.dirty[found] = now + SETTLE_SECONDS
+            return
+        if os.path.basename(path) not in WATCHED_FILES:
+            return
+        if mask & (IN_DELETE | IN_MOVED_FROM):
+            self._forget(path)
+        elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+            self.dirty[path] = now + SETTLE_SECONDS
+
+    def flush(self, now):
+        """Queue the stages for every file that has settled and whose content changed."""
+        ready = [p for p, deadline in self.dirty.items() if deadline <= now]
+        if not ready:
+            return
+        self.conn.execute("BEGIN")
+        try:
+            for path in ready:
+                del self.dirty[path]
+                self._queue(path)
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _queue(self, path):
+        try:
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        except FileNotFoundError:
+            return self._forget(path)
+        if self.hashes.get(path) == digest:
+            return      # saved without changes
+        self.hashes[path] = digest
+        self._track(path)
+
+        directory, name = os.path.split(path)
+        candidates, postings = sorted(self.candidate_dirs), sorted(self.job_dirs)
+        if name == "posting.txt":
+            work_queue.queue_posting(self.conn, directory, candidates, self.product_profile,
+                                     self.deep_alignment, rerun=True)
+            print(f"📄 {path}: queued posting stages x {len(candidates)} candidates")
+        elif name == "resume.md":
+            work_queue.queue_candidate(self.conn, directory, postings, self.deep_alignment, rerun=True)
+            print(f"👤 {path}: queued {len(postings)} postings")
+        elif self.deep_alignment and directory in self.candidate_dirs:
+            work_queue.queue_candidate(self.conn, directory, postings, self.deep_alignment, rerun=True,
+                                       evaluation=False)
+            print(f"⭐ {path}: queued Agent 2_1 x {len(postings)} postings")
+
+    def run(self):
+        while True:
+            events = self.inotify.read(SETTLE_SECONDS / 2 if self.dirty else None)
+            now = time.monotonic()
+            for mask, path in events:
+                self.handle(mask, path, now)
+            self.flush(now)
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch postings/ and candidates/ and queue only the affected stages.")
+    parser.add_argument("--postings", default="postings", help="Root directory of postings (posting.txt)")
+    parser.add_argument("--candidates", default="candidates", help="Root directory of candidates (resume.md)")
+    parser.add_argument("--queue", default=work_queue.QUEUE_PATH, help=f"Queue database (default: {work_queue.QUEUE_PATH})")
+    parser.add_argument("--product-profile", action="store_true", help="Also queue Agent 0_3 for changed postings")
+    parser.add_argument("--deep-alignment", action="store_true",
+                        help="Also queue Agent 2_1 where experiences.md exists")
+    args = parser.parse_args()
+
+    conn = work_queue.connect(args.queue)
+    watcher = Watcher(conn, args.postings, args.candidates, args.product_profile, args.deep_alignment)
+    print(f"👀 Watching {args.postings}/ ({len(watcher.job_dirs)} postings) and {args.candidates}/ "
+          f"({len(watcher.candidate_dirs)} candidates); queueing into {args.queue}")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.inotify.close()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
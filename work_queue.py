@@ -0,0 +1,338 @@
+import sys
+import os
+import time
+import socket
+import sqlite3
+import argparse
+import threading
+import multiprocessing
+
+import agent0_1
+import agent0_2
+import agent0_3
+import agent1_1
+import agent1_2
+import agent1_3
+import agent2_1
+import rate_limit
+from common import AgentError
+from orchestrate import find_dirs, load_pairs
+
+# Persistent (stage, posting_dir, candidate_dir) task queue for multi-process runs.
+# `populate` does the postings x candidates discovery once; `work` starts N worker
+# processes that lease one runnable task at a time. A worker heartbeats its lease
+# while the agent runs, so a task whose worker crashed is handed out again once
+# the lease lapses, and a killed run resumes from the queue without re-scanning.
+QUEUE_PATH = os.path.join(".index", "work_queue.sqlite")
+LEASE_SECONDS = 60
+HEARTBEAT_SECONDS = 20
+MAX_ATTEMPTS = 3    # leases a task may lose (worker crash) before it is marked failed
+POLL_SECONDS = 2
+
+STAGES = {m.__name__: m for m in (agent0_1, agent0_2, agent0_3, agent1_1, agent1_2, agent1_3, agent2_1)}
+
+def connect(path=QUEUE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            stage TEXT NOT NULL,
+            posting TEXT NOT NULL,
+            candidate TEXT NOT NULL DEFAULT '',
+            parent INTEGER REFERENCES tasks(id),
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker TEXT,
+            lease_until REAL,
+            error TEXT,
+            updated_at REAL,
+            dirty INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (stage, posting, candidate)
+        )
+    """)
+    if "dirty" not in {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}:
+        try:
+            # Queues created before re-runs of leased tasks were deferred
+            conn.execute("ALTER TABLE tasks ADD COLUMN dirty INTEGER NOT NULL DEFAULT 0")
+        except sqlite3.OperationalError:
+            pass    # another worker added it first
+    conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, parent)")
+    return conn
+
+def _add(conn, stage, posting, candidate="", parent=None, rerun=False):
+    """Insert a task and return its id. An existing task is left alone, or with
+    rerun set, sent back to pending so it runs again against changed inputs. A task
+    that is running is only marked dirty; complete() re-queues it when its lease ends,
+    so two runs of one task never overlap."""
+    conn.execute("INSERT OR IGNORE INTO tasks (stage, posting, candidate, parent, updated_at) VALUES (?, ?, ?, ?, ?)",
+                 (stage, posting, candidate, parent, time.time()))
+    if rerun:
+        conn.execute("UPDATE tasks SET dirty = 1, updated_at = ? "
+                     "WHERE stage = ? AND posting = ? AND candidate = ? AND status = 'leased'",
+                     (time.time(), stage, posting, candidate))
+        conn.execute("UPDATE tasks SET status = 'pending', attempts = 0, worker = NULL, error = NULL, updated_at = ? "
+                     "WHERE stage = ? AND posting = ? AND candidate = ? AND status IN ('done', 'failed')",
+                     (time.time(), stage, posting, candidate))
+    return conn.execute("SELECT id FROM tasks WHERE stage = ? AND posting = ? AND candidate = ?",
+                        (stage, posting, candidate)).fetchone()[0]
+
+def _queue_pair(conn, job_dir, candidate_dir, requirements, deep_alignment, rerun, evaluation=True):
+    if evaluation:
+        evaluated = _add(conn, "agent1_2", job_dir, candidate_dir, requirements, rerun)
+        _add(conn, "agent1_3", job_dir, candidate_dir, evaluated, rerun)
+    if deep_alignment and os.path.exists(os.path.join(candidate_dir, "experiences.md")):
+        _add(conn, "agent2_1", job_dir, candidate_dir, requirements, rerun)
+
+def queue_posting(conn, job_dir, candidate_dirs, product_profile=False, deep_alignment=False, pairs=None,
+                  rerun=False):
+    """Queue a posting's stages and its pairs with every candidate, with the same
+    ordering as orchestrate.py: 0_1 -> 0_2, 1_1 -> 1_2 -> 1_3, 1_1 -> 2_1."""
+    screening = _add(conn, "agent0_1", job_dir, rerun=rerun)
+    _add(conn, "agent0_2", job_dir, parent=screening, rerun=rerun)
+    if product_profile:
+        _add(conn, "agent0_3", job_dir, rerun=rerun)
+    requirements = _add(conn, "agent1_1", job_dir, rerun=rerun)
+    for candidate_dir in candidate_dirs:
+        if pairs is not None and (os.path.normpath(job_dir), os.path.normpath(candidate_dir)) not in pairs:
+            continue
+        _queue_pair(conn, job_dir, candidate_dir, requirements, deep_alignment, rerun)
+
+def queue_candidate(conn, candidate_dir, job_dirs, deep_alignment=False, rerun=False, evaluation=True):
+    """Queue a candidate's pairs with every posting. Posting stages are only added when
+    missing; evaluation=False limits the pairs to Agent 2_1 (experiences.md changed)."""
+    for job_dir in job_dirs:
+        requirements = _add(conn, "agent1_1", job_dir)
+        _queue_pair(conn, job_dir, candidate_dir, requirements, deep_alignment, rerun, evaluation)
+
+def populate(conn, postings_root, candidates_root, product_profile=False, deep_alignment=False, pairs=None):
+    """Queue every stage for every posting and (posting, candidate) pair."""
+    job_dirs = find_dirs(postings_root, "posting.txt")
+    candidate_dirs = find_dirs(candidates_root, "resume.md")
+    before = conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+    conn.execute("BEGIN")
+    for job_dir in job_dirs:
+        queue_posting(conn, job_dir, candidate_dirs, product_profile, deep_alignment, pairs)
+    conn.execute("COMMIT")
+    return conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] - before
+
+def lease(conn, worker):
+    """Claim the oldest runnable task. Returns (id, stage, posting, candidate) or None."""
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Leases that lapsed belong to dead workers; hand them out again
+        conn.execute("UPDATE tasks SET status = 'pending', worker = NULL, dirty = 0 "
+                     "WHERE status = 'leased' AND lease_until < ?", (now,))
+        for (task_id,) in conn.execute("SELECT id FROM tasks WHERE status = 'pending' AND attempts >= ?",
+                                       (MAX_ATTEMPTS,)).fetchall():
+            _fail(conn, task_id, f"lease lost {MAX_ATTEMPTS} times")
+        row = conn.execute("""
+            SELECT t.id, t.stage, t.posting, t.candidate FROM tasks t
+            LEFT JOIN tasks p ON p.id = t.parent
+            WHERE t.status = 'pending' AND (t.parent IS NULL OR p.status = 'done')
+            ORDER BY t.id LIMIT 1
+        """).fetchone()
+        if row:
+            conn.execute("UPDATE tasks SET status = 'leased', worker = ?, lease_until = ?, "
+                         "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                         (worker, now + LEASE_SECONDS, now, row[0]))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return row
+
+def heartbeat(conn, task_id, worker):
+    conn.execute("UPDATE tasks SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                 (time.time() + LEASE_SECONDS, task_id, worker))
+
+_REQUEUE_DIRTY = ("UPDATE tasks SET status = 'pending', attempts = 0, worker = NULL, error = NULL, dirty = 0, "
+                  "updated_at = ? WHERE id = ? AND status = 'leased' AND worker = ? AND dirty = 1")
+
+def complete(conn, task_id, worker):
+    """Mark worker's task done, or pending again when its inputs changed while it ran.
+    A worker whose lease lapsed (the task may be running elsewhere) changes nothing."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(_REQUEUE_DIRTY, (time.time(), task_id, worker))
+        conn.execute("UPDATE tasks SET status = 'done', worker = NULL, error = NULL, updated_at = ? "
+                     "WHERE id = ? AND status = 'leased' AND worker = ?", (time.time(), task_id, worker))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+def _fail(conn, task_id, error):
+    """Mark a task failed along with everything downstream of it, which can no longer run."""
+    conn.execute("""
+        WITH RECURSIVE doomed(id) AS (
+            SELECT id FROM tasks WHERE parent = ?
+            UNION SELECT t.id FROM tasks t JOIN doomed d ON t.parent = d.id
+        )
+        UPDATE tasks SET status = 'failed', error = 'upstream task failed', updated_at = ?
+        WHERE id IN (SELECT id FROM doomed) AND status = 'pending'
+    """, (task_id, time.time()))
+    conn.execute("UPDATE tasks SET status = 'failed', worker = NULL, error = ?, updated_at = ? WHERE id = ?",
+                 (error, time.time(), task_id))
+
+def fail(conn, task_id, error, worker):
+    """Mark worker's task failed, unless its lease lapsed or its inputs changed while it ran
+    (then it is pending again, since the re-run may well succeed)."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(_REQUEUE_DIRTY, (time.time(), task_id, worker))
+        if conn.execute("SELECT 1 FROM tasks WHERE id = ? AND status = 'leased' AND worker = ?",
+                        (task_id, worker)).fetchone():
+            _fail(conn, task_id, error)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+def release(conn, task_id, worker):
+    """Give an interrupted task back without counting the attempt."""
+    conn.execute("UPDATE tasks SET status = 'pending', worker = NULL, dirty = 0, attempts = attempts - 1 "
+                 "WHERE id = ? AND status = 'leased' AND worker = ?", (task_id, worker))
+
+def outstanding(conn):
+    return conn.execute("SELECT COUNT(*) FROM tasks WHERE status IN ('pending', 'leased')").fetchone()[0]
+
+def run_task(stage, posting, candidate, options):
+    args = (posting, candidate) if candidate else (posting,)
+    STAGES[stage].run(*args, **options.get(stage, {}))
+
+def _heartbeat_loop(path, task_id, worker, stop):
+    conn = connect(path)
+    try:
+        while not stop.wait(HEARTBEAT_SECONDS):
+            heartbeat(conn, task_id, worker)
+    finally:
+        conn.close()
+
+def worker_loop(path, options, workers, follow=False):
+    """Lease and run tasks until nothing is pending or leased anywhere in the queue,
+    or with follow set, keep polling for tasks queued later (watch.py)."""
+    rate_limit.share_quota(workers)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    conn = connect(path)
+    done = failed = 0
+    try:
+        while True:
+            task = lease(conn, worker)
+            if task is None:
+                if not follow and not outstanding(conn):
+                    break
+                # Everything left is waiting on another worker's task (or a lapsed lease)
+                time.sleep(POLL_SECONDS)
+                continue
+
+            task_id, stage, posting, candidate = task
+            print(f"[{worker}] {stage} {posting} {candidate}".rstrip())
+            stop = threading.Event()
+            beat = threading.Thread(target=_heartbeat_loop, args=(path, task_id, worker, stop), daemon=True)
+            beat.start()
+            try:
+                run_task(stage, posting, candidate, options)
+            except AgentError as e:
+                print(e)
+                fail(conn, task_id, str(e), worker)
+                failed += 1
+            except KeyboardInterrupt:
+                release(conn, task_id, worker)
+                raise
+            except Exception as e:
+                # An unexpected error fails this task only; the worker moves on to the next
+                error = f"{type(e).__name__}: {e}"
+                print(f"Error: {stage} failed unexpectedly: {error}")
+                fail(conn, task_id, error, worker)
+                failed += 1
+            else:
+                complete(conn, task_id, worker)
+                done += 1
+            finally:
+                stop.set()
+                beat.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.close()
+    print(f"[{worker}] finished: {done} done, {failed} failed.")
+
+def status(conn):
+    rows = conn.execute("SELECT stage, status, COUNT(*) FROM tasks GROUP BY stage, status ORDER BY stage").fetchall()
+    by_stage = {}
+    for stage, state, count in rows:
+        by_stage.setdefault(stage, {})[state] = count
+    for stage, counts in by_stage.items():
+        print(f"{stage}: " + ", ".join(f"{count} {state}" for state, count in sorted(counts.items())))
+    for task_id, stage, posting, candidate, error in conn.execute(
+            "SELECT id, stage, posting, candidate, error FROM tasks WHERE status = 'failed' "
+            "AND error != 'upstream task failed' ORDER BY id"):
+        print(f"  failed #{task_id} {stage} {posting} {candidate}: {error}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the pipeline from a persistent SQLite task queue.")
+    parser.add_argument("command", choices=["populate", "work", "status", "retry-failed"])
+    parser.add_argument("--queue", default=QUEUE_PATH, help=f"Queue database (default: {QUEUE_PATH})")
+    parser.add_argument("--postings", default="postings", help="Root directory searched for posting.txt")
+    parser.add_argument("--candidates", default="candidates", help="Root directory searched for resume.md")
+    parser.add_argument("--product-profile", action="store_true", help="populate: also queue Agent 0_3")
+    parser.add_argument("--deep-alignment", action="store_true",
+                        help="populate: also queue Agent 2_1 where experiences.md exists")
+    parser.add_argument("--pairs", default=None, help="populate: only queue the pairs listed in this CSV")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="work: number of worker processes (default: one per core)")
+    parser.add_argument("--scores-only", action="store_true", help="work: Agent 1_3 skips the narrative call")
+    parser.add_argument("--memoize", action="store_true", help="work: Agent 1_2 reuses memoized verdicts")
+    parser.add_argument("--follow", action="store_true",
+                        help="work: keep waiting for new tasks once the queue drains (e.g. queued by watch.py)")
+    parser.add_argument("--cascade", action="store_true",
+                        help="work: Agents 1_2 and 2_1 escalate only uncertain cheap-model verdicts")
+    parser.add_argument("--evidence-top-n", type=int, default=None,
+                        help="work: Agent 2_1 sends only the N most relevant STAR entries per requirement")
+    args = parser.parse_args()
+
+    conn = connect(args.queue)
+    if args.command == "populate":
+        pairs = load_pairs(args.pairs) if args.pairs else None
+        added = populate(conn, args.postings, args.candidates, args.product_profile, args.deep_alignment, pairs)
+        print(f"Queued {added} new tasks in {args.queue}.")
+    elif args.command == "status":
+        status(conn)
+    elif args.command == "retry-failed":
+        count = conn.execute("UPDATE tasks SET status = 'pending', attempts = 0, error = NULL "
+                             "WHERE status = 'failed'").rowcount
+        print(f"Re-queued {count} failed tasks.")
+    else:
+        if not os.environ.get("GEMINI_API_KEY"):
+            print("❌ Error: GEMINI_API_KEY is not set.")
+            print("Please run: export GEMINI_API_KEY='your_api_key_here'")
+            sys.exit(1)
+        if not args.follow and not conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]:
+            print(f"Queue {args.queue} is empty; run `python work_queue.py populate` first.")
+            sys.exit(1)
+        options = {
+            "agent1_2": {"memoize": args.memoize, "cascade": args.cascade},
+            "agent1_3": {"narrative": not args.scores_only},
+            "agent2_1": {"evidence_top_n": args.evidence_top_n, "cascade": args.cascade},
+        }
+        start = time.perf_counter()
+        processes = [multiprocessing.Process(target=worker_loop, args=(args.queue, options, args.workers, args.follow))
+                     for _ in range(args.workers)]
+        for p in processes:
+            p.start()
+        try:
+            for p in processes:
+                p.join()
+        except KeyboardInterrupt:
+            # Workers see the same Ctrl-C and hand their current task back
+            for p in processes:
+                p.join()
+        print(f"✅ Workers stopped after {time.perf_counter() - start:.1f}s.")
+        status(conn)
+    conn.close()
+
+if __name__ == "__main__":
+    main()